@@ -0,0 +1,8 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')  # Must match manage.py and wsgi.py
+
+application = get_asgi_application()
+
+app = application
@@ -0,0 +1,115 @@
+"""
+Benchmark: answering GA5 log questions over a multi-million-line access log.
+
+Writes a synthetic gzipped combined log, then times parsing it into columns
+and answering a filter/count question and a top-IP-by-bytes question with
+the vectorized engine, against a plain line-by-line regex loop for the
+count. With --workers, the log is also re-framed into a GzipIndex and
+parsed frame by frame on thread and process pools of that size.
+
+Usage (from the assignment_solver directory):
+    python benchmarks/bench_access_log.py --lines 2000000 --workers 4
+"""
+
+import argparse
+import gzip
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+from solver.services.processors.log_processor import LogQuery
+from solver.utils.access_log import LINE, read_access_log, read_indexed_log
+from solver.utils.gzip_index import open_or_build
+
+COUNT_QUESTION = ("What is the number of successful GET requests for pages under /telugu/ "
+                  "from 12:00 until before 21:00 on Sundays during May 2024?")
+TOP_QUESTION = "Across all requests under kannada/ on 2024-05-04, how many bytes did the top IP address download?"
+
+
+def make_log(lines, seed=1):
+    """Build a gzipped synthetic log of the given number of lines."""
+    rng = random.Random(seed)
+    start = datetime(2024, 5, 1)
+    paths = [f"/{section}/{page}.html" for section in ('telugu', 'kannada', 'hindi', 'tamil') for page in range(50)]
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=1) as out:
+        batch = []
+        for _ in range(lines):
+            when = start + timedelta(seconds=rng.randrange(31 * 24 * 3600))
+            batch.append(
+                f"10.{rng.randrange(4)}.{rng.randrange(256)}.{rng.randrange(256)} - - "
+                f"[{when.strftime('%d/%b/%Y:%H:%M:%S')} -0500] \"{rng.choice(('GET', 'GET', 'POST'))} "
+                f"{rng.choice(paths)} HTTP/1.1\" {rng.choice((200, 200, 304, 404))} {rng.randrange(100000)} "
+                f"\"-\" \"Mozilla/5.0\"\n"
+            )
+            if len(batch) == 100000:
+                out.write(''.join(batch).encode())
+                batch = []
+        out.write(''.join(batch).encode())
+    return buffer.getvalue()
+
+
+def regex_count(data):
+    """The obvious per-line implementation of COUNT_QUESTION."""
+    count = 0
+    for line in gzip.decompress(data).decode().splitlines():
+        match = LINE.match(line)
+        if match is None:
+            continue
+        method, path = match.group(3).split(' ')[:2]
+        when = datetime.strptime(match.group(2)[:20], '%d/%b/%Y:%H:%M:%S')
+        if (method == 'GET' and path.startswith('/telugu/') and match.group(4).startswith('2')
+                and when.weekday() == 6 and 12 <= when.hour < 21 and when.month == 5):
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--lines', type=int, default=2000000)
+    parser.add_argument('--workers', type=int, default=0, help='Also time indexed parsing with this many workers')
+    args = parser.parse_args()
+    
+    data = make_log(args.lines)
+    print(f"{args.lines} lines, {len(data) / 1e6:.1f} MB gzipped")
+    
+    start = time.perf_counter()
+    log = read_access_log(gzip.GzipFile(fileobj=io.BytesIO(data)))
+    parsed = time.perf_counter()
+    count = LogQuery.parse(COUNT_QUESTION).run(log)
+    counted = time.perf_counter()
+    top = LogQuery.parse(TOP_QUESTION).run(log)
+    done = time.perf_counter()
+    print(f"{'parse to columns':<28} {parsed - start:8.2f}s")
+    print(f"{'count query':<28} {(counted - parsed) * 1000:8.1f} ms  -> {count}")
+    print(f"{'top IP by bytes query':<28} {(done - counted) * 1000:8.1f} ms  -> {top}")
+    
+    start = time.perf_counter()
+    expected = regex_count(data)
+    print(f"{'line-by-line regex count':<28} {time.perf_counter() - start:8.2f}s  -> {expected}")
+    assert str(expected) == count
+    
+    if args.workers:
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            index = open_or_build('bench', lambda: gzip.GzipFile(fileobj=io.BytesIO(data)), directory)
+            print(f"{'build index (once/digest)':<28} {time.perf_counter() - start:8.2f}s  ({len(index.frames)} frames)")
+            for label, pool in (('thread', ThreadPoolExecutor), ('process', ProcessPoolExecutor)):
+                with pool(max_workers=args.workers) as executor:
+                    start = time.perf_counter()
+                    log = read_indexed_log(index, index.frames, executor)
+                    answer = LogQuery.parse(COUNT_QUESTION).run(log)
+                    print(f"{f'indexed parse, {label} x{args.workers}':<28} {time.perf_counter() - start:8.2f}s  -> {answer}")
+                assert answer == count
+
+
+if __name__ == '__main__':
+    main()
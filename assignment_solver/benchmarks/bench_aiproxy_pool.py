@@ -0,0 +1,118 @@
+"""
+Benchmark: per-request connections vs the shared AI Proxy connection pool.
+
+Starts a local stub of the chat completions endpoint (HTTPS with a throwaway
+self-signed certificate when openssl is available, plain HTTP otherwise) and
+times N sequential calls made the old way (a fresh connection per call, as
+module-level requests.post did) against the shared keep-alive client from
+solver.services.aiproxy_client.
+
+Usage (from the assignment_solver directory):
+    python benchmarks/bench_aiproxy_pool.py --requests 200
+"""
+
+import argparse
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import httpx
+from solver.services import aiproxy_client
+
+RESPONSE = json.dumps({"choices": [{"message": {"content": "42"}}]}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every POST with a canned chat completion, keeping the connection open."""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(cert_dir=None):
+    """Start the stub server in a background thread and return (server, base_url)."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    scheme = 'http'
+    if cert_dir:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(os.path.join(cert_dir, 'cert.pem'), os.path.join(cert_dir, 'key.pem'))
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = 'https'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://127.0.0.1:{server.server_address[1]}/openai/v1/chat/completions"
+
+
+def make_cert(cert_dir):
+    """Create a self-signed certificate with openssl; return False if unavailable."""
+    if not shutil.which('openssl'):
+        return False
+    result = subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=127.0.0.1', '-addext', 'subjectAltName=IP:127.0.0.1',
+         '-keyout', os.path.join(cert_dir, 'key.pem'), '-out', os.path.join(cert_dir, 'cert.pem')],
+        capture_output=True,
+    )
+    return result.returncode == 0
+
+
+def run(label, n, post):
+    """Time n sequential calls to post() and print per-request latency."""
+    start = time.perf_counter()
+    for _ in range(n):
+        response = post()
+        response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000 / n:8.3f} ms/request  ({n} requests, {elapsed:.2f}s)")
+    return elapsed / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--plain', action='store_true', help='Use plain HTTP (TCP handshake only)')
+    args = parser.parse_args()
+    
+    payload = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "ping"}]}
+    
+    with tempfile.TemporaryDirectory() as cert_dir:
+        use_tls = not args.plain and make_cert(cert_dir)
+        server, url = start_stub(cert_dir if use_tls else None)
+        verify = os.path.join(cert_dir, 'cert.pem') if use_tls else True
+        print(f"Stub AI Proxy at {url}")
+        
+        def fresh_connection():
+            with httpx.Client(verify=verify) as client:
+                return client.post(url, json=payload)
+        
+        pooled = httpx.Client(verify=verify, **aiproxy_client.client_options(1))
+        
+        fresh = run('new connection per request', args.requests, fresh_connection)
+        shared = run('shared keep-alive pool', args.requests, lambda: pooled.post(url, json=payload))
+        print(f"Handshake savings: {(fresh - shared) * 1000:.3f} ms/request ({fresh / shared:.1f}x)")
+        
+        pooled.close()
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
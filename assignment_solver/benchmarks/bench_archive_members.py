@@ -0,0 +1,82 @@
+"""
+Benchmark: serial vs pooled parsing of every member in a large archive.
+
+Builds a synthetic zip with thousands of small CSV and text members, then
+runs the two solvers that need every member (encodings sum and the IITM
+replacement hash) with members parsed serially, on a thread pool and on a
+process pool. Answers must match across modes, since members are merged
+in archive order.
+
+Usage (from the assignment_solver directory):
+    python benchmarks/bench_archive_members.py --members 4000 --workers 4
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+from solver.services.processors.archive_processor import EncodingsSumProcessor, ReplacementHashProcessor
+from solver.services.processors.file_processor import FileProcessor, parse_member
+from solver.utils.upload import Upload
+
+
+def make_archive(members, rows):
+    """Return zip bytes with alternating CSV and text members."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for i in range(members):
+            if i % 2:
+                body = 'symbol,value\n' + ''.join(f"{'›œ—x'[(i + r) % 4]},{r}\n" for r in range(rows))
+                archive.writestr(f'data/part{i:05d}.csv', body)
+            else:
+                body = ''.join(f"Line {r} of note {i} mentions IITM and iitm\n" for r in range(rows))
+                archive.writestr(f'notes/note{i:05d}.txt', body)
+    return buffer.getvalue()
+
+
+def run(label, data, executor=None, remote=False):
+    """Extract the archive and answer both questions, parsing members on executor."""
+    start = time.perf_counter()
+    with Upload('synthetic.zip', data) as upload:
+        info = FileProcessor().extract_file_info(upload)
+        members = info['extracted_content']
+        members.executor = executor
+        members._remote_parse = parse_member if remote else None
+        answers = (
+            EncodingsSumProcessor().solve("sum of values across different encodings", info),
+            ReplacementHashProcessor().solve("replace iitm and run sha256sum", info),
+        )
+    elapsed = time.perf_counter() - start
+    print(f"{label:<20} {elapsed:7.2f}s  sum={answers[0]} sha256={answers[1][:12]}")
+    return answers, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--members', type=int, default=4000)
+    parser.add_argument('--rows', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=min(8, os.cpu_count() or 1))
+    args = parser.parse_args()
+    
+    data = make_archive(args.members, args.rows)
+    print(f"{args.members} members, {len(data) / 1e6:.1f} MB compressed, {args.workers} workers, {os.cpu_count()} CPUs")
+    
+    baseline, serial = run('serial', data)
+    with ThreadPoolExecutor(args.workers) as pool:
+        threaded, thread_time = run(f'thread pool x{args.workers}', data, pool)
+    with ProcessPoolExecutor(args.workers) as pool:
+        processed, process_time = run(f'process pool x{args.workers}', data, pool, remote=True)
+    
+    assert threaded == baseline and processed == baseline, "answers differ between modes"
+    print(f"Speedup: threads {serial / thread_time:.2f}x, processes {serial / process_time:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: parsing a CSV upload vs loading it from the artifact cache.
+
+Builds a synthetic CSV in memory, extracts it with FileProcessor once with
+an empty artifact cache (a full parse, stored on the way out) and then
+repeatedly as a re-upload of the same bytes, checking that every cached
+frame equals the parsed one.
+
+Usage (from the assignment_solver directory):
+    python benchmarks/bench_artifact_cache.py --rows 1000000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import django
+django.setup()
+
+import pandas as pd
+from django.test import override_settings
+from solver.services.processors.file_processor import FileProcessor
+from solver.utils.upload import Upload
+
+
+def make_csv(rows, seed=1):
+    """Return the bytes of a synthetic CSV of the given number of rows."""
+    rng = random.Random(seed)
+    cities = ['Chennai', 'Delhi', 'Mumbai', 'Pune', 'Kolkata']
+    lines = ['id,city,amount,score,date']
+    for i in range(rows):
+        lines.append(f"{i},{rng.choice(cities)},{rng.randrange(10000)},{rng.random():.6f},2024-01-{rng.randrange(1, 29):02d}")
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def extract(data):
+    """Extract one upload of data and return (seconds, frame)."""
+    start = time.perf_counter()
+    info = FileProcessor().extract_file_info(Upload('bench.csv', data))
+    return time.perf_counter() - start, info['data']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    data = make_csv(args.rows)
+    print(f"{args.rows} rows, {len(data) / 1e6:.1f} MB")
+    
+    with tempfile.TemporaryDirectory() as directory, \
+            override_settings(ARTIFACT_CACHE_DIR=directory, ARTIFACT_CACHE_MIN_BYTES=0, CSV_WORKERS=1):
+        parsed, expected = extract(data)
+        print(f"{'parse and store':<24} {parsed * 1000:9.1f} ms")
+        
+        best = None
+        for _ in range(args.repeat):
+            elapsed, frame = extract(data)
+            pd.testing.assert_frame_equal(frame, expected)
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{'cached re-upload':<24} {best * 1000:9.1f} ms  ({parsed / best:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: serial vs byte-range parallel CSV parsing.
+
+Writes a synthetic CSV (numbers, repeated labels and quoted text with
+embedded commas and newlines) to a temporary file, parses it once with
+pd.read_csv and then with read_parallel on process pools of 1, 2, 4 and
+8 workers, checking every result against the serial frame.
+
+Usage (from the assignment_solver directory):
+    python benchmarks/bench_csv_parallel.py --rows 2000000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import pandas as pd
+from solver.utils.csv_loader import read_parallel
+
+
+def make_csv(path, rows, seed=1):
+    """Write a synthetic CSV of the given number of rows."""
+    rng = random.Random(seed)
+    cities = ['Chennai', 'Delhi', 'Mumbai', 'Pune', 'Kolkata']
+    notes = ['ok', '"late, again"', '"two\nlines"', '"said ""hi"""']
+    with open(path, 'w', newline='') as f:
+        f.write('id,city,amount,score,note\n')
+        for i in range(rows):
+            f.write(f"{i},{rng.choice(cities)},{rng.randrange(10000)},{rng.random():.6f},{rng.choice(notes)}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.csv')
+        make_csv(path, args.rows)
+        print(f"{args.rows} rows, {os.path.getsize(path) / 1e6:.1f} MB, {os.cpu_count()} CPUs")
+        
+        start = time.perf_counter()
+        serial = pd.read_csv(path)
+        baseline = time.perf_counter() - start
+        print(f"{'serial pd.read_csv':<24} {baseline:8.2f}s")
+        expected = serial.astype({'city': object, 'note': object})
+        
+        for workers in args.workers:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # Start the workers before timing
+                list(executor.map(abs, range(workers)))
+                start = time.perf_counter()
+                parallel = read_parallel(path, executor, workers)
+                elapsed = time.perf_counter() - start
+            pd.testing.assert_frame_equal(parallel.astype({'city': object, 'note': object}), expected, check_dtype=False)
+            print(f"{f'parallel, {workers} workers':<24} {elapsed:8.2f}s  ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
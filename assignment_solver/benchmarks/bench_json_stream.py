@@ -0,0 +1,78 @@
+"""
+Benchmark: json.load vs the streaming tokenizer on a large nested file.
+
+Writes a synthetic log (a top-level array, or NDJSON with --ndjson) to a
+temporary file, then counts a key with json.load plus a tree walk and
+with count_keys over a streamed JSONSource, reporting time and the peak
+Python heap (tracemalloc, on a separate run) of each.
+
+Usage (from the assignment_solver directory):
+    python benchmarks/bench_json_stream.py --records 500000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solver.utils.json_stream import JSONSource, count_keys, object_events
+
+
+def make_log(path, records, ndjson=False, seed=1):
+    """Write records nested log entries, some carrying the DX key."""
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        f.write('' if ndjson else '[')
+        for i in range(records):
+            entry = {
+                "id": i,
+                "user": {"name": f"user{i % 100}", "tags": ["a", "DX"]},
+                "event": {"type": "DX", "details": {"DX": rng.random()}} if i % 3 == 0 else None,
+            }
+            if i:
+                f.write('\n' if ndjson else ',')
+            f.write(json.dumps(entry))
+        f.write('\n' if ndjson else ']')
+
+
+def measure(label, function):
+    """Run function, printing its time and, from a second run, its peak traced memory."""
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    # tracemalloc slows allocation down, so memory is measured separately
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<24} {elapsed:8.2f}s  peak heap {peak / 1e6:8.1f} MB  -> {result}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=500000)
+    parser.add_argument('--ndjson', action='store_true')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.json')
+        make_log(path, args.records, args.ndjson)
+        print(f"{args.records} records, {os.path.getsize(path) / 1e6:.1f} MB")
+        
+        def loaded():
+            with open(path) as f:
+                data = [json.loads(line) for line in f] if args.ndjson else json.load(f)
+            return count_keys(object_events(data, multiple=args.ndjson), 'DX')
+        
+        measure('json.load + walk', loaded)
+        measure('streamed count_keys', lambda: count_keys(JSONSource(path=path).events(), 'DX'))
+
+
+if __name__ == '__main__':
+    main()
@@ -62,6 +62,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'wsgi.application'
+ASGI_APPLICATION = 'asgi.application'
 
 # Database
 DATABASES = {
@@ -101,12 +102,84 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # OpenAI Configuration
 AIPROXY_TOKEN = os.environ.get("AIPROXY_TOKEN", "")
+AIPROXY_URL = os.environ.get("AIPROXY_URL", "https://aiproxy.sanand.workers.dev/openai/v1/chat/completions")
+AIPROXY_POOL_SIZE = int(os.environ.get("AIPROXY_POOL_SIZE", 20))  # Sync client pool, per worker
+AIPROXY_MAX_CONNECTIONS = int(os.environ.get("AIPROXY_MAX_CONNECTIONS", 256))  # Async client pool
+AIPROXY_KEEPALIVE_EXPIRY = float(os.environ.get("AIPROXY_KEEPALIVE_EXPIRY", 60))  # Seconds
+AIPROXY_HTTP2 = os.environ.get("AIPROXY_HTTP2", "0") == "1"  # Requires the h2 package
+AIPROXY_CONNECT_TIMEOUT = float(os.environ.get("AIPROXY_CONNECT_TIMEOUT", 10))  # Seconds
+AIPROXY_READ_TIMEOUT = float(os.environ.get("AIPROXY_READ_TIMEOUT", 60))  # Seconds
+AIPROXY_CONTEXT_TOKENS = int(os.environ.get("AIPROXY_CONTEXT_TOKENS", 128000))  # gpt-4o-mini context window
+PROMPT_TOKEN_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", 12000))  # Max tokens per user prompt
+AIPROXY_MAX_RETRIES = int(os.environ.get("AIPROXY_MAX_RETRIES", 3))  # On 429/5xx/transport errors
+AIPROXY_BACKOFF_BASE = float(os.environ.get("AIPROXY_BACKOFF_BASE", 0.5))  # Seconds, doubled per retry (full jitter)
+AIPROXY_BACKOFF_CAP = float(os.environ.get("AIPROXY_BACKOFF_CAP", 8))  # Seconds
+AIPROXY_BREAKER_THRESHOLD = int(os.environ.get("AIPROXY_BREAKER_THRESHOLD", 5))  # Consecutive failures to open
+AIPROXY_BREAKER_RESET = float(os.environ.get("AIPROXY_BREAKER_RESET", 30))  # Seconds before a trial call
+
+# Outbound admission control for AI Proxy (0 disables a per-minute limit)
+AIPROXY_MAX_IN_FLIGHT = int(os.environ.get("AIPROXY_MAX_IN_FLIGHT", 32))  # Concurrent calls per worker
+AIPROXY_REQUESTS_PER_MINUTE = int(os.environ.get("AIPROXY_REQUESTS_PER_MINUTE", 0))
+AIPROXY_TOKENS_PER_MINUTE = int(os.environ.get("AIPROXY_TOKENS_PER_MINUTE", 0))
+AIPROXY_COMPLETION_TOKENS = int(os.environ.get("AIPROXY_COMPLETION_TOKENS", 512))  # Assumed answer size when budgeting
+AIPROXY_RATE_LIMIT_PATH = os.environ.get("AIPROXY_RATE_LIMIT_PATH", "")  # SQLite file to share buckets across workers
+
+# Per-request deadline, carried from the view through file processing into the LLM call
+REQUEST_DEADLINE = float(os.environ.get("REQUEST_DEADLINE", 55))  # Seconds
+
+# Answer cache (in-process LRU in front of a persistent SQLite tier)
+ANSWER_CACHE_ENABLED = os.environ.get("ANSWER_CACHE_ENABLED", "1") == "1"
+ANSWER_CACHE_MAX_ENTRIES = int(os.environ.get("ANSWER_CACHE_MAX_ENTRIES", 1024))
+ANSWER_CACHE_TTL = int(os.environ.get("ANSWER_CACHE_TTL", 3600))  # Seconds, memory tier
+ANSWER_CACHE_PATH = os.environ.get("ANSWER_CACHE_PATH", os.path.join(BASE_DIR, '.cache', 'answer_cache.sqlite3'))  # Empty disables the disk tier
+ANSWER_CACHE_MAX_BYTES = int(os.environ.get("ANSWER_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Archive members parsed concurrently when a solver needs many of them
+ARCHIVE_WORKERS = int(os.environ.get("ARCHIVE_WORKERS", min(8, os.cpu_count() or 1)))  # Below 2 parses serially
+ARCHIVE_POOL = os.environ.get("ARCHIVE_POOL", "thread")  # "thread" or "process"
+ARCHIVE_PARALLEL_MIN_MEMBERS = int(os.environ.get("ARCHIVE_PARALLEL_MIN_MEMBERS", 8))
+
+# Decompression limits per upload, shared by nested archives
+ARCHIVE_MAX_BYTES = int(os.environ.get("ARCHIVE_MAX_BYTES", 512 * 1024 * 1024))  # Total inflated bytes
+ARCHIVE_MAX_RATIO = float(os.environ.get("ARCHIVE_MAX_RATIO", 100))  # Per member, for members of 1MB or more
+ARCHIVE_MAX_MEMBERS = int(os.environ.get("ARCHIVE_MAX_MEMBERS", 10000))
+ARCHIVE_MAX_DEPTH = int(os.environ.get("ARCHIVE_MAX_DEPTH", 3))  # Levels of zip inside zip
+
+# Large gzipped access logs are re-framed once per digest into a seekable copy,
+# in a directory private to the server's user
+GZIP_INDEX_DIR = os.environ.get("GZIP_INDEX_DIR", os.path.join(BASE_DIR, '.cache', 'gzip_index'))  # Empty disables
+GZIP_INDEX_CACHE_BYTES = int(os.environ.get("GZIP_INDEX_CACHE_BYTES", 8 * 1024 ** 3))  # Least recently used evicted above this
+GZIP_INDEX_MIN_BYTES = int(os.environ.get("GZIP_INDEX_MIN_BYTES", 32 * 1024 * 1024))  # Compressed size
+GZIP_INDEX_SPAN = int(os.environ.get("GZIP_INDEX_SPAN", 8 * 1024 * 1024))  # Uncompressed bytes per frame
+GZIP_INDEX_MAX_BYTES = int(os.environ.get("GZIP_INDEX_MAX_BYTES", 64 * 1024 ** 3))  # Inflate ceiling for indexed logs
+LOG_WORKERS = int(os.environ.get("LOG_WORKERS", min(8, os.cpu_count() or 1)))  # Below 2 parses serially
+LOG_POOL = os.environ.get("LOG_POOL", "thread")  # "thread" or "process"
+
+# CSV loading: pyarrow engine when installed, chunked above CSV_CHUNK_BYTES
+CSV_ENGINE = os.environ.get("CSV_ENGINE", "auto")  # "auto", "pyarrow" or "c"
+CSV_CHUNK_BYTES = int(os.environ.get("CSV_CHUNK_BYTES", 64 * 1024 * 1024))
+CSV_CHUNK_ROWS = int(os.environ.get("CSV_CHUNK_ROWS", 250000))
+CSV_CATEGORY_RATIO = float(os.environ.get("CSV_CATEGORY_RATIO", 0.5))  # Max distinct/rows share for categoricals
+CSV_WORKERS = int(os.environ.get("CSV_WORKERS", min(8, os.cpu_count() or 1)))  # Processes; below 2 parses serially
+CSV_PARALLEL_BYTES = int(os.environ.get("CSV_PARALLEL_BYTES", 128 * 1024 * 1024))  # On-disk UTF-8 CSVs above this
+
+# Parsed uploads (CSV frames, JSON, access logs) are kept on disk by digest,
+# in a directory private to the server's user
+ARTIFACT_CACHE_DIR = os.environ.get("ARTIFACT_CACHE_DIR", os.path.join(BASE_DIR, '.cache', 'artifacts'))  # Empty disables
+ARTIFACT_CACHE_MAX_BYTES = int(os.environ.get("ARTIFACT_CACHE_MAX_BYTES", 1024 ** 3))  # Least recently used evicted above this
+ARTIFACT_CACHE_MIN_BYTES = int(os.environ.get("ARTIFACT_CACHE_MIN_BYTES", 256 * 1024))  # Smaller uploads are simply reparsed
+
+# JSON above this is never loaded whole; previews and queries stream it
+JSON_STREAM_BYTES = int(os.environ.get("JSON_STREAM_BYTES", 64 * 1024 * 1024))
 
 # File Upload Settings
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
-FILE_UPLOAD_MAX_MEMORY_SIZE = 104857600  # 100MB
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440  # 2.5MB held in memory; larger uploads spool to a temporary file
 DATA_UPLOAD_MAX_MEMORY_SIZE = 104857600  # 100MB
+FILE_UPLOAD_HANDLERS = [
+    "solver.upload_handlers.StreamingUploadHandler",  # Hashes, sniffs and pre-parses uploads as they arrive
+]
 
 # REST Framework settings
 REST_FRAMEWORK = {
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import httpx
+from django.conf import settings
+from .prompt_builder import estimate_tokens
+from .rate_limiter import get_outbound_limiter
+from .resilience import CircuitBreaker, DeadlineExceeded, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+AIPROXY_URL = "https://aiproxy.sanand.workers.dev/openai/v1/chat/completions"
+
+# Responses worth retrying: rate limiting and transient upstream failures
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+_async_client = None
+_async_client_loop = None
+
+_circuit_breaker = None
+
+
+def _http2_enabled():
+    """Return True if HTTP/2 is requested and the h2 package is available."""
+    if not getattr(settings, 'AIPROXY_HTTP2', False):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("AIPROXY_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def client_options(max_connections):
+    """
+    Build the connection pool and timeout options shared by both clients.
+    
+    Args:
+        max_connections (int): Upper bound on open connections in the pool
+    
+    Returns:
+        dict: Keyword arguments for httpx.Client / httpx.AsyncClient
+    """
+    return {
+        'limits': httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=getattr(settings, 'AIPROXY_KEEPALIVE_EXPIRY', 60),
+        ),
+        'timeout': httpx.Timeout(
+            getattr(settings, 'AIPROXY_READ_TIMEOUT', 60),
+            connect=getattr(settings, 'AIPROXY_CONNECT_TIMEOUT', 10),
+        ),
+        'http2': _http2_enabled(),
+    }
+
+
+def get_client():
+    """
+    Return the process-wide sync HTTP client used for AI Proxy calls.
+    
+    The client keeps connections alive between requests, so only the first
+    call in a worker pays for the TCP and TLS handshake. It is created lazily
+    and rebuilt after a fork, giving one pool per worker process.
+    
+    Returns:
+        httpx.Client: Shared, thread-safe client
+    """
+    global _client, _client_pid
+    
+    pid = os.getpid()
+    if _client is None or _client.is_closed or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client.is_closed or _client_pid != pid:
+                _client = httpx.Client(**client_options(getattr(settings, 'AIPROXY_POOL_SIZE', 20)))
+                _client_pid = pid
+    
+    return _client
+
+
+def get_async_client():
+    """
+    Return the process-wide async HTTP client used for AI Proxy calls.
+    
+    httpx clients are bound to the event loop that created them, so a new
+    client is built whenever the running loop changes (e.g. between test runs).
+    Under uvicorn there is one loop per worker and the client lives as long
+    as the worker does.
+    
+    Returns:
+        httpx.AsyncClient: Shared client with a bounded connection pool
+    """
+    global _async_client, _async_client_loop
+    
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(**client_options(getattr(settings, 'AIPROXY_MAX_CONNECTIONS', 256)))
+        _async_client_loop = loop
+    
+    return _async_client
+
+
+def get_circuit_breaker():
+    """
+    Return the process-wide circuit breaker guarding AI Proxy.
+    """
+    global _circuit_breaker
+    
+    if _circuit_breaker is None:
+        with _client_lock:
+            if _circuit_breaker is None:
+                _circuit_breaker = CircuitBreaker(
+                    failure_threshold=getattr(settings, 'AIPROXY_BREAKER_THRESHOLD', 5),
+                    reset_timeout=getattr(settings, 'AIPROXY_BREAKER_RESET', 30),
+                )
+    return _circuit_breaker
+
+
+def _attempt_timeout(deadline):
+    """Per-attempt timeout: the configured timeouts, capped by the time left."""
+    if deadline is None:
+        return httpx.USE_CLIENT_DEFAULT
+    return httpx.Timeout(
+        deadline.timeout(getattr(settings, 'AIPROXY_READ_TIMEOUT', 60)),
+        connect=deadline.timeout(getattr(settings, 'AIPROXY_CONNECT_TIMEOUT', 10)),
+    )
+
+
+def estimate_cost(payload):
+    """Estimate the tokens a chat completion will consume, prompt plus answer."""
+    prompt = sum(estimate_tokens(message.get('content') or '') for message in payload.get('messages', []))
+    return prompt + payload.get('max_tokens', getattr(settings, 'AIPROXY_COMPLETION_TOKENS', 512))
+
+
+def _retry_delay(attempt, response, deadline):
+    """
+    Return how long to wait before retrying, or None to give up.
+    
+    A Retry-After header wins over the jittered backoff. Retries stop when
+    the attempts are used up or the wait would run past the deadline.
+    """
+    if attempt >= getattr(settings, 'AIPROXY_MAX_RETRIES', 3):
+        return None
+    delay = backoff_delay(
+        attempt,
+        base=getattr(settings, 'AIPROXY_BACKOFF_BASE', 0.5),
+        cap=getattr(settings, 'AIPROXY_BACKOFF_CAP', 8),
+    )
+    if response is not None:
+        try:
+            delay = float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            pass
+    if deadline is not None and delay >= deadline.remaining():
+        return None
+    return delay
+
+
+def post_chat(headers, payload, deadline=None, breaker=None, limiter=None):
+    """
+    POST a chat completion to AI Proxy with retries and a circuit breaker.
+    
+    Rate limiting (429), 5xx responses and transport errors are retried with
+    jittered exponential backoff, within the request deadline. Every such
+    failure counts against the circuit breaker; while it is open the call
+    fails immediately with CircuitOpenError. Each attempt is admitted by
+    the outbound limiter, so retries count against the same quota.
+    
+    Args:
+        headers (dict): Request headers
+        payload (dict): Chat completion payload
+        deadline (Deadline, optional): Request deadline
+        breaker (CircuitBreaker, optional): Defaults to the shared breaker
+        limiter (OutboundLimiter, optional): Defaults to the shared limiter
+        
+    Returns:
+        httpx.Response: Successful response
+    """
+    breaker = breaker or get_circuit_breaker()
+    limiter = limiter or get_outbound_limiter()
+    url = getattr(settings, 'AIPROXY_URL', AIPROXY_URL)
+    cost = estimate_cost(payload)
+    attempt = 0
+    while True:
+        if deadline is not None:
+            deadline.check('AI Proxy call')
+        breaker.allow()
+        response = None
+        try:
+            with limiter.slot(cost, deadline):
+                response = get_client().post(url, headers=headers, json=payload, timeout=_attempt_timeout(deadline))
+            if response.status_code not in RETRYABLE_STATUS:
+                breaker.record_success()
+                return response.raise_for_status()
+            response.raise_for_status()
+        except httpx.TransportError as e:
+            error = e
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in RETRYABLE_STATUS:
+                raise
+            error = e
+        except BaseException:
+            breaker.release_trial()
+            raise
+        breaker.record_failure()
+        
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded("Deadline exceeded during AI Proxy call") from error
+        delay = _retry_delay(attempt, response, deadline)
+        if delay is None:
+            raise error
+        logger.warning(f"AI Proxy attempt {attempt + 1} failed ({str(error)}); retrying in {delay:.2f}s")
+        time.sleep(delay)
+        attempt += 1
+
+
+async def apost_chat(headers, payload, deadline=None, breaker=None, limiter=None):
+    """
+    Async counterpart of post_chat, using the shared async client.
+    """
+    breaker = breaker or get_circuit_breaker()
+    limiter = limiter or get_outbound_limiter()
+    url = getattr(settings, 'AIPROXY_URL', AIPROXY_URL)
+    cost = estimate_cost(payload)
+    attempt = 0
+    while True:
+        if deadline is not None:
+            deadline.check('AI Proxy call')
+        breaker.allow()
+        response = None
+        try:
+            async with limiter.aslot(cost, deadline):
+                response = await get_async_client().post(url, headers=headers, json=payload, timeout=_attempt_timeout(deadline))
+            if response.status_code not in RETRYABLE_STATUS:
+                breaker.record_success()
+                return response.raise_for_status()
+            response.raise_for_status()
+        except httpx.TransportError as e:
+            error = e
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in RETRYABLE_STATUS:
+                raise
+            error = e
+        except BaseException:
+            breaker.release_trial()
+            raise
+        breaker.record_failure()
+        
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded("Deadline exceeded during AI Proxy call") from error
+        delay = _retry_delay(attempt, response, deadline)
+        if delay is None:
+            raise error
+        logger.warning(f"AI Proxy attempt {attempt + 1} failed ({str(error)}); retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+        attempt += 1
@@ -0,0 +1,281 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from django.conf import settings
+from ..utils.file_utils import private_directory
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_question(question):
+    """
+    Normalize question text so trivially different submissions share a key.
+    
+    Unicode is NFC-normalized and runs of whitespace are collapsed. Case is
+    preserved because some questions quote case-sensitive values.
+    """
+    question = unicodedata.normalize('NFC', question or '')
+    return re.sub(r'\s+', ' ', question).strip()
+
+
+def make_cache_key(question, file_digest=None, version=''):
+    """
+    Build a content-addressed cache key.
+    
+    Args:
+        question (str): The question text
+        file_digest (str, optional): SHA-256 hex digest of the uploaded bytes
+        version (str): Model and prompt version the answer was produced with
+    
+    Returns:
+        str: SHA-256 hex digest identifying the request
+    """
+    material = '\x00'.join([version, normalize_question(question), file_digest or ''])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class MemoryTier:
+    """
+    In-process LRU cache with a per-entry time to live.
+    """
+    def __init__(self, max_entries=1024, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteTier:
+    """
+    Persistent cache tier stored in a single SQLite file.
+    
+    Entries are evicted least-recently-used first once the stored answers
+    exceed max_bytes. Errors are logged and treated as misses so a broken
+    cache file never fails a request.
+    """
+    def __init__(self, path, max_bytes=64 * 1024 * 1024):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._initialized = False
+    
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._initialized = True
+        return conn
+    
+    def get(self, key):
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    row = conn.execute("SELECT value FROM answers WHERE key = ?", (key,)).fetchone()
+                    if row is None:
+                        return None
+                    with conn:
+                        conn.execute("UPDATE answers SET accessed = ? WHERE key = ?", (time.time(), key))
+                    return json.loads(row[0])
+                finally:
+                    conn.close()
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Answer cache read failed: {str(e)}")
+            return None
+    
+    def set(self, key, value):
+        encoded = json.dumps(value)
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute(
+                            "INSERT OR REPLACE INTO answers (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                            (key, encoded, len(encoded), time.time())
+                        )
+                        self._evict(conn)
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Answer cache write failed: {str(e)}")
+    
+    def _evict(self, conn):
+        """Delete least recently used entries until the tier fits in max_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM answers").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM answers ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM answers WHERE key = ?", victims)
+    
+    def clear(self):
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute("DELETE FROM answers")
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Answer cache clear failed: {str(e)}")
+
+
+class AnswerCache:
+    """
+    Two-tier answer cache: an in-process LRU in front of a persistent tier.
+    
+    Disk hits are promoted into memory. Hit and miss counters are kept per
+    tier and reported by stats().
+    """
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory or MemoryTier()
+        self.disk = disk
+        self._counts = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+        self._lock = threading.Lock()
+    
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+    
+    def get(self, key):
+        """
+        Look up a cached response.
+        
+        Args:
+            key (str): Key from make_cache_key
+        
+        Returns:
+            dict or None: Cached response if present
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            self._count('memory_hits')
+            return value
+        
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                self._count('disk_hits')
+                return value
+        
+        self._count('misses')
+        return None
+    
+    def set(self, key, value):
+        """
+        Store a response in every tier.
+        
+        Args:
+            key (str): Key from make_cache_key
+            value (dict): JSON-serializable response
+        """
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+        self._count('stores')
+    
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+    
+    def stats(self):
+        """
+        Return hit/miss counters and the current memory tier size.
+        
+        Returns:
+            dict: Counters plus hits, lookups, hit_rate and memory_entries
+        """
+        with self._lock:
+            stats = dict(self._counts)
+        stats['hits'] = stats['memory_hits'] + stats['disk_hits']
+        stats['lookups'] = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / stats['lookups'] if stats['lookups'] else 0.0
+        stats['memory_entries'] = len(self.memory)
+        return stats
+
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    """
+    Return the process-wide AnswerCache configured from settings.
+    
+    The directory holding ANSWER_CACHE_PATH must belong to this user and
+    be closed to everyone else (see private_directory); otherwise only
+    the memory tier is used.
+    
+    Returns:
+        AnswerCache: Shared cache, or None if ANSWER_CACHE_ENABLED is False
+    """
+    global _answer_cache
+    
+    if not getattr(settings, 'ANSWER_CACHE_ENABLED', True):
+        return None
+    
+    if _answer_cache is None:
+        with _answer_cache_lock:
+            if _answer_cache is None:
+                memory = MemoryTier(
+                    max_entries=getattr(settings, 'ANSWER_CACHE_MAX_ENTRIES', 1024),
+                    ttl=getattr(settings, 'ANSWER_CACHE_TTL', 3600),
+                )
+                disk = None
+                path = getattr(settings, 'ANSWER_CACHE_PATH', None)
+                if path:
+                    try:
+                        private_directory(os.path.dirname(os.path.abspath(path)))
+                    except OSError as e:
+                        logger.warning(f"Answer cache disk tier disabled: {str(e)}")
+                    else:
+                        disk = SQLiteTier(path, max_bytes=getattr(settings, 'ANSWER_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+                _answer_cache = AnswerCache(memory, disk)
+    
+    return _answer_cache
@@ -0,0 +1,393 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from ..utils.csv_loader import pyarrow_available
+from ..utils.file_utils import private_directory
+
+logger = logging.getLogger(__name__)
+
+# Bump a parser's version whenever its output changes, so artifacts
+# written by older code are never read back
+PARSER_VERSIONS = {
+    'csv': 1,
+    'json': 1,
+    'access_log': 1,
+}
+
+# Format of the stored entries themselves
+STORE_VERSION = 2
+
+# Temporary entries left behind by a crashed writer are removed after this
+STALE_SECONDS = 3600
+
+
+def artifact_key(digest, kind, **params):
+    """
+    Build the cache key for one parse of an upload.
+    
+    Args:
+        digest (str): SHA-256 hex digest of the uploaded bytes
+        kind (str): Parser name, a key of PARSER_VERSIONS
+        **params: Options that change the parser's output (e.g. columns)
+    
+    Returns:
+        str: SHA-256 hex digest identifying the artifact
+    """
+    material = json.dumps(
+        [STORE_VERSION, kind, PARSER_VERSIONS[kind], digest, params],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def _has_default_index(df):
+    index = df.index
+    return isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1
+
+
+def _feather_compatible(df):
+    """Feather needs unique string column names."""
+    return all(isinstance(name, str) for name in df.columns) and df.columns.is_unique
+
+
+def _plain_names(df):
+    """Column names that survive a JSON round trip unchanged."""
+    return all(isinstance(name, (str, int)) and not isinstance(name, bool) for name in df.columns)
+
+
+def _dump(value, path, level=1):
+    """
+    Write value as compressed JSON.
+    
+    Entries are only ever stored as JSON, .npy or Feather, never pickled,
+    so reading one back cannot run code.
+    """
+    with open(path, 'wb') as f:
+        f.write(zlib.compress(json.dumps(value).encode('utf-8'), level))
+
+
+def _load(path):
+    with open(path, 'rb') as f:
+        return json.loads(zlib.decompress(f.read()))
+
+
+def _values(array):
+    """Column values as a JSON-ready list; missing extension values become None."""
+    return [None if value is pd.NA else value for value in array.tolist()]
+
+
+def _array(values, dtype):
+    """Inverse of _values for a column stored with str(dtype)."""
+    if dtype == 'object':
+        return pd.Series(values, dtype=object).array
+    return pd.array(values, dtype=dtype)
+
+
+def write_frame(df, directory):
+    """
+    Store a DataFrame as one file per column.
+    
+    Plain numpy columns (numbers, booleans, naive datetimes) and the codes
+    of categoricals are saved as .npy so they can be memory-mapped back;
+    anything else (strings, categories, extension arrays) is saved as
+    compressed JSON with its dtype. With pyarrow installed the frame is
+    written as Feather.
+    
+    Returns:
+        list: (name, kind) for each column, kind being 'array',
+            'category', 'values' or 'feather' for the whole frame
+    
+    Raises:
+        TypeError: If a column holds values JSON cannot represent
+    """
+    if pyarrow_available() and _feather_compatible(df):
+        df.to_feather(os.path.join(directory, 'frame.feather'), compression='uncompressed')
+        return [(None, 'feather')]
+    
+    columns = []
+    for i, (name, series) in enumerate(df.items()):
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            categories = dtype.categories
+            np.save(os.path.join(directory, f"{i}.npy"), series.cat.codes.to_numpy(), allow_pickle=False)
+            _dump({'dtype': str(categories.dtype), 'values': _values(categories.array), 'ordered': dtype.ordered},
+                  os.path.join(directory, f"{i}.json.z"))
+            columns.append((name, 'category'))
+        elif isinstance(dtype, np.dtype) and dtype != object:
+            np.save(os.path.join(directory, f"{i}.npy"), series.to_numpy(), allow_pickle=False)
+            columns.append((name, 'array'))
+        else:
+            _dump({'dtype': str(dtype), 'values': _values(series.array)}, os.path.join(directory, f"{i}.json.z"))
+            columns.append((name, 'values'))
+    return columns
+
+
+def read_frame(directory, columns):
+    """
+    Rebuild a frame written by write_frame, memory-mapping its arrays.
+    
+    Pages are only read from disk when a column is used, and written
+    pages stay private to the process.
+    """
+    columns = [tuple(column) for column in columns]
+    if columns == [(None, 'feather')]:
+        from pyarrow import feather
+        return feather.read_table(os.path.join(directory, 'frame.feather'), memory_map=True).to_pandas()
+    
+    data = {}
+    for i, (name, kind) in enumerate(columns):
+        if kind == 'values':
+            stored = _load(os.path.join(directory, f"{i}.json.z"))
+            values = _array(stored['values'], stored['dtype'])
+        else:
+            # Private (copy-on-write) mapping, so callers can modify the frame
+            # without touching the file; pandas expects a plain ndarray view
+            values = np.load(os.path.join(directory, f"{i}.npy"), mmap_mode='c').view(np.ndarray)
+            if kind == 'category':
+                stored = _load(os.path.join(directory, f"{i}.json.z"))
+                categories = pd.Index(stored['values'], dtype=stored['dtype'])
+                values = pd.Categorical.from_codes(
+                    values, dtype=pd.CategoricalDtype(categories, stored['ordered']), validate=False,
+                )
+        data[i] = pd.Series(values, copy=False)
+    df = pd.DataFrame(data, copy=False)
+    df.columns = [name for name, _ in columns]
+    return df
+
+
+def cached_parse(digest, size, kind, parse, frame=False, **params):
+    """
+    Run a parser through the shared artifact cache.
+    
+    Uploads below ARTIFACT_CACHE_MIN_BYTES are parsed directly; for them
+    the cache's file I/O would cost more than it saves.
+    
+    Args:
+        digest (str): SHA-256 of the uploaded bytes
+        size (int): Upload size in bytes
+        kind (str): Parser name, a key of PARSER_VERSIONS
+        parse (callable): Returns (value, extra), extra being a small dict
+            of details stored alongside the value
+        frame (bool): True if the value is a DataFrame
+        **params: Options that change the parser's output
+    
+    Returns:
+        tuple: (value, extra), from the cache or from parse()
+    """
+    cache = get_artifact_cache()
+    if cache is None or not digest or size < getattr(settings, 'ARTIFACT_CACHE_MIN_BYTES', 256 * 1024):
+        return parse()
+    
+    key = artifact_key(digest, kind, **params)
+    hit = cache.get_frame(key) if frame else cache.get_value(key)
+    if hit is not None:
+        return hit
+    value, extra = parse()
+    if frame:
+        cache.put_frame(key, value, extra)
+    else:
+        cache.put_value(key, value, extra)
+    return value, extra
+
+
+class ArtifactCache:
+    """
+    On-disk cache of parsed uploads, shared by every worker process.
+    
+    Each entry is a directory named after its key holding a metadata file
+    and the parsed data: DataFrames column by column (see write_frame),
+    other values as compressed JSON. Entries are written under a
+    temporary name and renamed into place. Hits refresh the entry's mtime
+    and the least recently used entries are deleted once the cache
+    exceeds max_bytes. Errors are logged and treated as misses so a
+    broken cache never fails a request.
+    """
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+    
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+    
+    def get_frame(self, key):
+        """
+        Load a cached DataFrame.
+        
+        Args:
+            key (str): Key from artifact_key
+        
+        Returns:
+            tuple or None: (DataFrame, extra) on a hit, where extra is the
+                dict stored alongside the frame
+        """
+        meta = self._meta(key, 'frame')
+        if meta is None:
+            return None
+        try:
+            return read_frame(self._entry(key), meta['columns']), meta['extra']
+        except (OSError, ValueError, TypeError, KeyError, zlib.error) as e:
+            logger.warning(f"Artifact cache read failed for {key}: {str(e)}")
+            return None
+    
+    def put_frame(self, key, df, extra=None):
+        """
+        Store a DataFrame and a small dict of details about it.
+        
+        Frames with a non-default index or with column names other than
+        strings and integers are not cached.
+        
+        Returns:
+            bool: True if the frame was stored
+        """
+        if not _has_default_index(df) or not _plain_names(df):
+            return False
+        return self._put(key, 'frame', extra, lambda directory: write_frame(df, directory))
+    
+    def get_value(self, key):
+        """
+        Load a cached Python value (parsed JSON, decoded text, ...).
+        
+        Returns:
+            tuple or None: (value, extra) on a hit
+        """
+        meta = self._meta(key, 'value')
+        if meta is None:
+            return None
+        try:
+            return _load(os.path.join(self._entry(key), 'value.json.z')), meta['extra']
+        except (OSError, ValueError, TypeError, zlib.error) as e:
+            logger.warning(f"Artifact cache read failed for {key}: {str(e)}")
+            return None
+    
+    def put_value(self, key, value, extra=None):
+        """
+        Store a JSON-serializable value as compressed JSON.
+        
+        Returns:
+            bool: True if the value was stored
+        """
+        return self._put(key, 'value', extra, lambda directory: _dump(value, os.path.join(directory, 'value.json.z')))
+    
+    def _meta(self, key, kind):
+        path = self._entry(key)
+        try:
+            meta = _load(os.path.join(path, 'meta.json.z'))
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError, zlib.error) as e:
+            logger.warning(f"Ignoring unreadable artifact {key}: {str(e)}")
+            return None
+        if meta.get('version') != STORE_VERSION or meta.get('kind') != kind:
+            return None
+        return meta
+    
+    def _put(self, key, kind, extra, write):
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            tmp = tempfile.mkdtemp(dir=self.directory, prefix='.tmp-')
+            try:
+                columns = write(tmp)
+                _dump({'version': STORE_VERSION, 'kind': kind, 'columns': columns, 'extra': extra or {}},
+                      os.path.join(tmp, 'meta.json.z'))
+                if _size(tmp) > self.max_bytes:
+                    return False
+                target = self._entry(key)
+                # Replaced entries may still be mapped by readers; deleting
+                # the directory leaves their open files intact
+                shutil.rmtree(target, ignore_errors=True)
+                try:
+                    os.replace(tmp, target)
+                except OSError:
+                    # Another worker stored the same artifact first
+                    if not os.path.exists(target):
+                        raise
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+            self.evict()
+            return True
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Artifact cache write failed for {key}: {str(e)}")
+            return False
+    
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = []
+            now = time.time()
+            for entry in os.scandir(self.directory):
+                if not entry.is_dir():
+                    continue
+                mtime = entry.stat().st_mtime
+                if entry.name.startswith('.tmp-'):
+                    if mtime < now - STALE_SECONDS:
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                    continue
+                entries.append((mtime, _size(entry.path), entry.path))
+            
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+    
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _size(directory):
+    """Bytes used by the files directly inside directory."""
+    total = 0
+    for entry in os.scandir(directory):
+        try:
+            total += entry.stat().st_size
+        except FileNotFoundError:
+            pass
+    return total
+
+
+_artifact_cache = None
+_artifact_cache_lock = threading.Lock()
+
+
+def get_artifact_cache():
+    """
+    Return the process-wide ArtifactCache configured from settings.
+    
+    The directory must belong to this user and be closed to everyone
+    else (see private_directory); otherwise the cache is disabled.
+    
+    Returns:
+        ArtifactCache: Shared cache, or None if ARTIFACT_CACHE_DIR is empty
+            or unsafe
+    """
+    global _artifact_cache
+    
+    directory = getattr(settings, 'ARTIFACT_CACHE_DIR', '')
+    if not directory:
+        return None
+    
+    if _artifact_cache is None or _artifact_cache.directory != directory:
+        with _artifact_cache_lock:
+            if _artifact_cache is None or _artifact_cache.directory != directory:
+                try:
+                    private_directory(directory)
+                except OSError as e:
+                    logger.warning(f"Artifact cache disabled: {str(e)}")
+                    return None
+                _artifact_cache = ArtifactCache(
+                    directory,
+                    max_bytes=getattr(settings, 'ARTIFACT_CACHE_MAX_BYTES', 1024 * 1024 * 1024),
+                )
+    return _artifact_cache
@@ -0,0 +1,129 @@
+import hashlib
+import io
+import posixpath
+import re
+import pandas as pd
+from .base_processor import BaseProcessor
+from ...utils.upload import sniff
+
+
+def members_named(file_info, predicate):
+    """
+    Yield (name, member_info) for archive members whose path matches.
+    
+    The predicate only sees the member path, so members it rejects are
+    never inflated or parsed. Lazy archives parse the matches concurrently
+    up front; they are still yielded in archive order.
+    """
+    members = file_info.get('extracted_content', {})
+    names = [name for name in members if predicate(name)]
+    if hasattr(members, 'prefetch'):
+        members.prefetch(names)
+    for name in names:
+        yield name, members[name]
+
+
+def is_type(*types):
+    """Predicate matching member paths whose extension maps to one of types."""
+    return lambda name: sniff(b'', posixpath.basename(name)) in types
+
+
+class ZipAnswerColumnProcessor(BaseProcessor):
+    """
+    Returns the first 'answer' value from a CSV inside a zip archive.
+    """
+    def solve(self, question, file_info):
+        for name, extracted in members_named(file_info, lambda name: name.endswith('.csv')):
+            if extracted.get('type') == 'csv':
+                if 'answer' in extracted.get('columns', []):
+                    df = extracted.get('data')
+                    if df is not None and not df.empty:
+                        return str(df['answer'].iloc[0])
+        return None
+
+
+class CompareFilesProcessor(BaseProcessor):
+    """
+    Counts the lines that differ between a.txt and b.txt.
+    """
+    def solve(self, question, file_info):
+        a_content = None
+        b_content = None
+        
+        wanted = {'a.txt', 'b.txt'}
+        for name, extracted in members_named(file_info, lambda name: posixpath.basename(name) in wanted):
+            if posixpath.basename(name) == 'a.txt':
+                a_content = extracted.get('content')
+            else:
+                b_content = extracted.get('content')
+        
+        if a_content and b_content:
+            a_lines = a_content.splitlines()
+            b_lines = b_content.splitlines()
+            
+            # Count different lines
+            if len(a_lines) == len(b_lines):
+                diff_count = sum(1 for a, b in zip(a_lines, b_lines) if a != b)
+                return str(diff_count)
+        return None
+
+
+class EncodingsSumProcessor(BaseProcessor):
+    """
+    Sums the values of special symbols across files with different encodings.
+    
+    Declines (returns None) unless some member holds one of the symbols.
+    """
+    special_symbols = ['›', 'œ', '—']
+    
+    def solve(self, question, file_info):
+        total_sum = 0
+        found = False
+        
+        for name, extracted in members_named(file_info, is_type('csv', 'text')):
+            if extracted.get('type') in ['csv', 'text']:
+                df = extracted.get('data')
+                if isinstance(df, str):
+                    # Text members hold tab-separated symbol/value rows
+                    df = pd.read_csv(io.StringIO(df), sep='\t')
+                if df is not None and 'symbol' in df.columns and 'value' in df.columns:
+                    # Sum values for matching symbols
+                    for symbol in self.special_symbols:
+                        matches = df[df['symbol'] == symbol]
+                        found = found or not matches.empty
+                        total_sum += matches['value'].sum()
+        
+        if not found:
+            return None
+        return str(int(total_sum))
+
+
+class ReplacementHashProcessor(BaseProcessor):
+    """
+    Replaces IITM with IIT Madras in every file and hashes the result.
+    
+    Works on the members' bytes, so encodings and line endings are left
+    as they are. Declines (returns None) if no file mentions IITM.
+    """
+    def solve(self, question, file_info):
+        # Process files and replace IITM with IIT Madras
+        return self._process_file_replacement(file_info)
+    
+    def _process_file_replacement(self, file_info):
+        """Process files for IITM replacement and calculate hash"""
+        archive = file_info.get('archive')
+        if archive is None:
+            return None
+        
+        # Simulate cat * | sha256sum: files in name order, concatenated as they are
+        sha256 = hashlib.sha256()
+        replacements = 0
+        for name in sorted(filter(is_type('text', 'markdown'), archive.names())):
+            # Replace IITM with IIT Madras (case insensitive)
+            replaced, count = re.subn(rb'(?i)IITM', b'IIT Madras', archive.read(name))
+            replacements += count
+            sha256.update(replaced)
+        
+        if not replacements:
+            return None
+        return sha256.hexdigest()
@@ -1,6 +1,10 @@
 class BaseProcessor:
     """
     Base class for all processors.
+    
+    Solver processors are declared in processors.registry with the keywords
+    and file types that route to them, and implement solve(). Their modules
+    are imported only when a question first routes to them.
     """
     def process(self, question, file=None):
         """
@@ -13,4 +17,17 @@ class BaseProcessor:
         Returns:
             dict: Response with answer key
         """
+        raise NotImplementedError("Subclasses must implement this method")
+    
+    def solve(self, question, file_info):
+        """
+        Answer the question from an already extracted file.
+        
+        Args:
+            question (str): The question text
+            file_info (dict): Information extracted from the file
+            
+        Returns:
+            str or None: The answer, or None to let other processors try
+        """
         raise NotImplementedError("Subclasses must implement this method")
\ No newline at end of file
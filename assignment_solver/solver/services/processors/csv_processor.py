@@ -0,0 +1,11 @@
+from .base_processor import BaseProcessor
+
+
+class AnswerColumnProcessor(BaseProcessor):
+    """
+    Returns the first value of the 'answer' column of a CSV file.
+    """
+    def solve(self, question, file_info):
+        if file_info.get('data') is not None and 'answer' in file_info['data'].columns:
+            return str(file_info['data']['answer'].iloc[0])
+        return None
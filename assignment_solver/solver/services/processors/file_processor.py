@@ -1,17 +1,109 @@
+import logging
 import os
-import zipfile
-import tempfile
-import pandas as pd
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 import json
 import sqlite3
-import re
-import csv
-import hashlib
-import chardet
-from pathlib import Path
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+import zlib
+from django.conf import settings
 from .base_processor import BaseProcessor
+from .registry import processors
+from ..artifact_cache import cached_parse
+from ...utils.access_log import looks_like_access_log
+from ...utils.archive import ArchiveBudget, ArchiveLimitExceeded, LazyMembers, ZipView
+from ...utils.compression import OPENERS, inner_name, open_decompressed
+from ...utils.csv_loader import load_csv
+from ...utils.file_info import FileInfo, archive_manifest, frame_preview, json_preview, json_source_preview, text_preview
+from ...utils.gzip_index import DEFAULT_SPAN, open_or_build
+from ...utils.json_recovery import RecoverySummary, recover_records, tally
+from ...utils.json_stream import JSONSource, decode_values
+from ...utils.upload import Upload
+
+logger = logging.getLogger(__name__)
+
+_member_pool = None
+_member_pool_pid = None
+_member_pool_lock = threading.Lock()
+
+
+def member_pool():
+    """
+    Return the process-wide pool used to parse archive members in parallel.
+    
+    ARCHIVE_POOL selects 'thread' (inflate and parse share the archive in
+    place) or 'process' (members are inflated here and parsed in worker
+    processes, for CPU-heavy archives); ARCHIVE_WORKERS bounds its size.
+    
+    Returns:
+        Executor: Shared pool, or None if ARCHIVE_WORKERS is below 2
+    """
+    global _member_pool, _member_pool_pid
+    
+    workers = getattr(settings, 'ARCHIVE_WORKERS', min(8, os.cpu_count() or 1))
+    if workers < 2:
+        return None
+    
+    pid = os.getpid()
+    if _member_pool is None or _member_pool_pid != pid:
+        with _member_pool_lock:
+            if _member_pool is None or _member_pool_pid != pid:
+                if getattr(settings, 'ARCHIVE_POOL', 'thread') == 'process':
+                    _member_pool = ProcessPoolExecutor(max_workers=workers)
+                else:
+                    _member_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='archive')
+                _member_pool_pid = pid
+    return _member_pool
+
+
+_csv_pool = None
+_csv_pool_pid = None
+_csv_pool_lock = threading.Lock()
+
+
+def csv_pool():
+    """
+    Return the process-wide pool used to parse large CSVs in byte ranges.
+    
+    Returns:
+        ProcessPoolExecutor: Shared pool of CSV_WORKERS processes, or None
+            if CSV_WORKERS is below 2
+    """
+    global _csv_pool, _csv_pool_pid
+    
+    workers = getattr(settings, 'CSV_WORKERS', min(8, os.cpu_count() or 1))
+    if workers < 2:
+        return None
+    
+    pid = os.getpid()
+    if _csv_pool is None or _csv_pool_pid != pid:
+        with _csv_pool_lock:
+            if _csv_pool is None or _csv_pool_pid != pid:
+                _csv_pool = ProcessPoolExecutor(max_workers=workers)
+                _csv_pool_pid = pid
+    return _csv_pool
+
+
+def archive_budget():
+    """
+    Return a fresh ArchiveBudget for one upload, with limits from settings.
+    """
+    return ArchiveBudget(
+        max_bytes=getattr(settings, 'ARCHIVE_MAX_BYTES', 512 * 1024 * 1024),
+        max_ratio=getattr(settings, 'ARCHIVE_MAX_RATIO', 100),
+        max_members=getattr(settings, 'ARCHIVE_MAX_MEMBERS', 10000),
+        max_depth=getattr(settings, 'ARCHIVE_MAX_DEPTH', 3),
+    )
+
+
+def parse_member(name, data, budget=None):
+    """
+    Extract one inflated archive member; module-level so process pools can run it.
+    """
+    info = FileProcessor().extract_file_info(Upload(os.path.basename(name), data), budget=budget)
+    info['archive_path'] = name
+    return info
+
 
 class FileProcessor(BaseProcessor):
     """
@@ -32,254 +124,306 @@ class FileProcessor(BaseProcessor):
         if not file:
             return {"answer": "No file provided"}
         
-        # Create temp directory for file extraction
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Save uploaded file
-            file_path = os.path.join(temp_dir, file.name)
-            with open(file_path, 'wb+') as destination:
-                for chunk in file.chunks():
-                    destination.write(chunk)
-            
-            # Extract file info
-            file_info = self.extract_file_info(file_path)
-            
+        with self.open_upload(file, question) as file_info:
             # Process based on question type
-            
-            # ZIP extraction (Q8)
-            if "unzip" in question.lower() and "answer column" in question.lower() and file_info.get('type') == 'zip':
-                for name, extracted in file_info.get('extracted_content', {}).items():
-                    if name.endswith('.csv') and extracted.get('type') == 'csv':
-                        if 'answer' in extracted.get('columns', []):
-                            df = extracted.get('data')
-                            if df is not None and not df.empty:
-                                return {"answer": str(df['answer'].iloc[0])}
-            
-            # Simple CSV question
-            elif "answer column" in question.lower() and file_info.get('type') == 'csv':
-                if file_info.get('data') is not None and 'answer' in file_info['data'].columns:
-                    return {"answer": str(file_info['data']['answer'].iloc[0])}
-            
-            # Markdown formatting (Q3)
-            elif "prettier" in question.lower() and "sha256sum" in question.lower() and file_info.get('type') == 'markdown':
-                # Process markdown with prettier (simulate the output)
-                content = file_info.get('content', '')
-                # Apply basic prettier formatting rules
-                formatted = self._format_markdown(content)
-                # Calculate SHA256 hash
-                hash_result = hashlib.sha256(formatted.encode('utf-8')).hexdigest()
-                return {"answer": hash_result}
-            
-            # File comparison (Q17)
-            elif "how many lines are different" in question.lower() and file_info.get('type') == 'zip':
-                a_content = None
-                b_content = None
-                
-                for name, extracted in file_info.get('extracted_content', {}).items():
-                    if name == 'a.txt':
-                        a_content = extracted.get('content')
-                    elif name == 'b.txt':
-                        b_content = extracted.get('content')
-                
-                if a_content and b_content:
-                    a_lines = a_content.splitlines()
-                    b_lines = b_content.splitlines()
-                    
-                    # Count different lines
-                    if len(a_lines) == len(b_lines):
-                        diff_count = sum(1 for a, b in zip(a_lines, b_lines) if a != b)
-                        return {"answer": str(diff_count)}
-            
-            # File encoding processing (Q12)
-            elif "different encodings" in question.lower() and "sum" in question.lower() and file_info.get('type') == 'zip':
-                total_sum = 0
-                special_symbols = ['›', 'œ', '—']
-                
-                for name, extracted in file_info.get('extracted_content', {}).items():
-                    if extracted.get('type') in ['csv', 'text']:
-                        df = extracted.get('data')
-                        if df is not None and 'symbol' in df.columns and 'value' in df.columns:
-                            # Sum values for matching symbols
-                            for symbol in special_symbols:
-                                matches = df[df['symbol'] == symbol]
-                                total_sum += matches['value'].sum()
-                
-                return {"answer": str(int(total_sum))}
-            
-            # CSS Selector (Q11)
-            elif "div" in question.lower() and "foo class" in question.lower() and "data-value" in question.lower():
-                if file_info.get('type') in ['text', 'html']:
-                    content = file_info.get('content', '')
-                    soup = BeautifulSoup(content, 'html.parser')
-                    # Find all divs with foo class
-                    divs = soup.select('div.foo')
-                    # Sum data-value attributes
-                    total = sum(int(div.get('data-value', 0)) for div in divs)
-                    return {"answer": str(total)}
-            
-            # DevTools usage (Q6)
-            elif "hidden input" in question.lower() and "secret value" in question.lower():
-                if file_info.get('type') in ['text', 'html']:
-                    content = file_info.get('content', '')
-                    soup = BeautifulSoup(content, 'html.parser')
-                    # Find hidden input
-                    hidden_input = soup.find('input', {'type': 'hidden'})
-                    if hidden_input:
-                        return {"answer": hidden_input.get('value', '')}
-            
-            # SQL Query (Q18)
-            elif "sql" in question.lower() and "gold" in question.lower() and "ticket" in question.lower():
-                if file_info.get('type') == 'sqlite':
-                    db_path = file_info.get('path')
-                    conn = sqlite3.connect(db_path)
-                    cursor = conn.cursor()
-                    
-                    # Execute SQL to find total sales for Gold tickets
-                    query = """
-                    SELECT SUM(units * price) 
-                    FROM tickets 
-                    WHERE UPPER(TRIM(type)) = 'GOLD'
-                    """
-                    cursor.execute(query)
-                    result = cursor.fetchone()[0]
-                    conn.close()
-                    
-                    return {"answer": str(result)}
-            
-            # File replacement (Q14)
-            elif "replace" in question.lower() and "iitm" in question.lower() and "sha256sum" in question.lower():
-                if file_info.get('type') == 'zip':
-                    # Process files and replace IITM with IIT Madras
-                    content_hash = self._process_file_replacement(file_info)
-                    return {"answer": content_hash}
+            answer = self.solve(question, file_info)
+            if answer is not None:
+                return {"answer": answer}
             
             # For more complex cases or unhandled questions
             return {"answer": f"Extracted file information from {file.name}"}
     
-    def extract_file_info(self, file_path):
+    @contextmanager
+    def open_upload(self, file, question=None):
+        """
+        Ingest an upload and extract it once.
+        
+        The bytes are read in place; anything spilled to disk for solvers
+        that need a path (e.g. SQLite) is removed when the block exits, so
+        those solvers must run inside it.
+        
+        With a question, CSVs are parsed with only the columns the matching
+        processors declare; file_info['projected'] then lists them, and the
+        file must be extracted again without a question for the LLM prompt.
+        
+        Args:
+            file (UploadedFile or Upload): The uploaded file; an Upload is
+                left open for its owner to close
+            question (str, optional): Question the file is extracted for
+            
+        Yields:
+            FileInfo: Information about the file and its content
+        """
+        upload = file if isinstance(file, Upload) else Upload.from_file(file)
+        try:
+            columns = processors.columns_for(question, upload.kind) if question else None
+            yield self.extract_file_info(upload, columns=columns)
+        finally:
+            if upload is not file:
+                upload.close()
+    
+    def solve(self, question, file_info):
+        """
+        Run the registered processors that match the question and file type.
+        
+        Candidates come from the processor registry, highest priority first;
+        a processor returning None passes to the next candidate.
+        
+        Args:
+            question (str): The question text
+            file_info (dict): Information extracted from the file
+            
+        Returns:
+            str or None: Answer from the first processor that produced one
+        """
+        return processors.solve(question, file_info)
+    
+    def _extract_member(self, archive, name):
+        """
+        Inflate one archive member and extract it like a top-level file.
+        
+        A member that goes over the archive budget comes back as an error
+        entry; once the budget is spent, later members fail fast.
+        """
+        try:
+            return parse_member(name, archive.read(name), budget=archive.budget.child())
+        except ArchiveLimitExceeded as e:
+            return FileInfo(
+                name=os.path.basename(name),
+                archive_path=name,
+                error=str(e),
+                limit=e.as_dict(),
+            )
+    
+    def _indexed_log_info(self, upload, name):
+        """
+        File info for a large gzipped access log, backed by a cached
+        GzipIndex instead of its inflated text.
+        
+        Returns:
+            FileInfo or None: None unless indexing is enabled, the upload
+                is at least GZIP_INDEX_MIN_BYTES, it holds an access log and
+                the index could be opened or built
+        """
+        directory = getattr(settings, 'GZIP_INDEX_DIR', '')
+        if upload.kind != 'gzip' or not directory or upload.size < getattr(settings, 'GZIP_INDEX_MIN_BYTES', 32 * 1024 * 1024):
+            return None
+        with open_decompressed('gzip', upload.open()) as stream:
+            head = stream.read(64 * 1024).decode('utf-8', 'replace')
+        if not looks_like_access_log(head):
+            return None
+        
+        # Streamed logs are never held in memory whole, so only the
+        # expansion ratio and a separate inflate ceiling apply
+        budget = ArchiveBudget(
+            max_bytes=getattr(settings, 'GZIP_INDEX_MAX_BYTES', 64 * 1024 ** 3),
+            max_ratio=getattr(settings, 'ARCHIVE_MAX_RATIO', 100),
+        )
+        try:
+            index = open_or_build(
+                upload.sha256,
+                lambda: open_decompressed('gzip', upload.open(), budget, name, upload.size),
+                directory,
+                getattr(settings, 'GZIP_INDEX_SPAN', DEFAULT_SPAN),
+                getattr(settings, 'GZIP_INDEX_CACHE_BYTES', 8 * 1024 ** 3),
+            )
+        except (OSError, zlib.error) as e:
+            # Unsafe or full cache directory, or a corrupt stored entry;
+            # the log is inflated in memory instead
+            logger.warning(f"Gzip index disabled: {str(e)}")
+            return None
+        return FileInfo(
+            name=name,
+            type='text',
+            size=index.size,
+            content=text_preview(head),
+            gzip_index=index,
+            compression='gzip',
+            compressed_name=upload.name,
+            compressed_size=upload.size,
+        )
+    
+    def _parse_csv(self, upload, columns):
+        """
+        Parse a CSV upload into a compact DataFrame.
+        
+        Returns:
+            tuple: (DataFrame, {'header': full header, 'encoding': encoding})
+        """
+        # Decoded once; the parser reads the shared text
+        decoded = upload.decode()
+        df, header = load_csv(
+            decoded.text,
+            raw=upload.buffer,
+            encoding=decoded.encoding,
+            columns=columns,
+            chunk_bytes=getattr(settings, 'CSV_CHUNK_BYTES', 64 * 1024 * 1024),
+            chunk_rows=getattr(settings, 'CSV_CHUNK_ROWS', 250000),
+            engine=getattr(settings, 'CSV_ENGINE', 'auto'),
+            category_ratio=getattr(settings, 'CSV_CATEGORY_RATIO', 0.5),
+            path=upload.disk_path,
+            executor=csv_pool() if upload.disk_path else None,
+            workers=getattr(settings, 'CSV_WORKERS', min(8, os.cpu_count() or 1)),
+            parallel_bytes=getattr(settings, 'CSV_PARALLEL_BYTES', 128 * 1024 * 1024),
+        )
+        return df, {'header': header, 'encoding': decoded.encoding}
+    
+    def _parse_json(self, upload):
+        """
+        Parse a JSON upload.
+        
+        Several documents one after another (NDJSON, JSON Lines) are
+        returned as a list of them. Malformed or truncated files are
+        returned as the list of records that could be salvaged.
+        
+        Returns:
+            tuple: (data, {'encoding': encoding}), plus 'format': 'ndjson'
+                for multi-document files, or 'format': 'recovered' and a
+                'recovery' summary for salvaged ones
+        """
+        decoded = upload.decode()
+        details = {'encoding': decoded.encoding}
+        try:
+            return json.loads(decoded.text), details
+        except json.JSONDecodeError as e:
+            error = e
+        if error.msg == 'Extra data':
+            try:
+                return decode_values(decoded.text), dict(details, format='ndjson')
+            except json.JSONDecodeError as e:
+                error = e
+        
+        summary = RecoverySummary()
+        records = list(tally(recover_records([decoded.text]), summary))
+        if not records:
+            raise error
+        return records, dict(details, format='recovered', recovery=summary.as_dict())
+    
+    def extract_file_info(self, upload, budget=None, columns=None):
         """
         Extract information from different file types.
         
+        The type is sniffed from the leading bytes, then the file extension.
+        Previews ('content') are rendered lazily, on first access. Parsed
+        CSVs and JSON are reused from the artifact cache when the same bytes
+        were uploaded before.
+        
         Args:
-            file_path: Path to the file
+            upload (Upload or str): Ingested upload, or a path to a file
+            budget (ArchiveBudget, optional): Limits for archives; nested
+                archives pass their parent's budget down
+            columns (iterable, optional): For CSVs, the columns to load
             
         Returns:
-            dict: Information about the file and its content
+            FileInfo: Information about the file and its content
         """
-        file_info = {
-            'path': file_path,
-            'name': os.path.basename(file_path),
-            'type': None,
-            'content': None,
-            'data': None,
-        }
+        if isinstance(upload, str):
+            with Upload.from_path(upload) as owned:
+                return self.extract_file_info(owned, budget, columns)
+        
+        file_info = FileInfo(path=upload.disk_path, name=upload.name, size=upload.size, sha256=upload.sha256)
         
         # Handle ZIP files
-        if file_path.endswith('.zip'):
+        if upload.kind == 'zip':
             file_info['type'] = 'zip'
-            extract_dir = os.path.join(os.path.dirname(file_path), 'extracted')
-            os.makedirs(extract_dir, exist_ok=True)
-            
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-            
-            # List all extracted files
-            extracted_files = os.listdir(extract_dir)
-            file_info['extracted_files'] = extracted_files
-            
-            # Process each extracted file
-            extracted_content = {}
-            for extracted_file in extracted_files:
-                extracted_path = os.path.join(extract_dir, extracted_file)
-                extracted_info = self.extract_file_info(extracted_path)
-                extracted_content[extracted_file] = extracted_info
-            
-            file_info['extracted_content'] = extracted_content
-            file_info['content'] = str(extracted_content)
+            try:
+                # Only the central directory is read here; members are
+                # inflated and parsed when a solver first asks for them
+                archive = ZipView(upload.open(), budget if budget is not None else archive_budget())
+                pool = member_pool()
+                extracted_content = LazyMembers(
+                    archive,
+                    self._extract_member,
+                    executor=pool,
+                    remote_parse=parse_member if isinstance(pool, ProcessPoolExecutor) else None,
+                    min_parallel=getattr(settings, 'ARCHIVE_PARALLEL_MIN_MEMBERS', 8),
+                )
+                file_info['archive'] = archive
+                file_info['extracted_files'] = archive.names()
+                file_info['extracted_content'] = extracted_content
+                file_info.lazy('content', archive_manifest, archive)
+            except ArchiveLimitExceeded as e:
+                file_info['error'] = str(e)
+                file_info['limit'] = e.as_dict()
+            except Exception as e:
+                file_info['error'] = str(e)
             
         # Handle CSV files
-        elif file_path.endswith('.csv'):
+        elif upload.kind == 'csv':
             file_info['type'] = 'csv'
             try:
-                # Try to detect encoding
-                rawdata = open(file_path, 'rb').read(1024)
-                detected = chardet.detect(rawdata)
-                encoding = detected['encoding'] or 'utf-8'
-                
-                # Read with detected encoding
-                df = pd.read_csv(file_path, encoding=encoding)
+                df, details = cached_parse(
+                    upload.sha256, upload.size, 'csv',
+                    lambda: self._parse_csv(upload, columns),
+                    frame=True,
+                    columns=sorted(columns) if columns else None,
+                    category_ratio=getattr(settings, 'CSV_CATEGORY_RATIO', 0.5),
+                )
+                header = details['header']
+                file_info['encoding'] = details['encoding']
                 file_info['data'] = df
-                file_info['content'] = df.head(20).to_string()  # First 20 rows as string
+                file_info.lazy('content', frame_preview, df)  # First 20 rows as string
                 file_info['columns'] = list(df.columns)
+                if len(df.columns) < len(header):
+                    file_info['columns'] = header
+                    file_info['projected'] = list(df.columns)
             except Exception as e:
-                # Try alternative encodings if default fails
-                try:
-                    df = pd.read_csv(file_path, encoding='cp1252')
-                    file_info['data'] = df
-                    file_info['content'] = df.head(20).to_string()
-                    file_info['columns'] = list(df.columns)
-                except Exception as inner_e:
-                    file_info['error'] = f"{str(e)}; {str(inner_e)}"
+                file_info['error'] = str(e)
         
         # Handle JSON files
-        elif file_path.endswith('.json'):
+        elif upload.kind == 'json':
             file_info['type'] = 'json'
             try:
-                with open(file_path, 'r') as f:
-                    json_data = json.load(f)
-                file_info['data'] = json_data
-                file_info['content'] = json.dumps(json_data, indent=2)[:2000]  # First 2000 chars
+                if upload.size > getattr(settings, 'JSON_STREAM_BYTES', 64 * 1024 * 1024):
+                    # Never built as objects: queries and the preview stream the bytes
+                    source = JSONSource(path=upload.disk_path) if upload.disk_path else JSONSource(data=upload.buffer.obj)
+                    file_info['json_source'] = source
+                    file_info.lazy('content', json_source_preview, source)
+                else:
+                    json_data, details = cached_parse(upload.sha256, upload.size, 'json', lambda: self._parse_json(upload))
+                    file_info['encoding'] = details['encoding']
+                    file_info['data'] = json_data
+                    if details.get('format'):
+                        file_info['json_format'] = details['format']
+                    if details.get('recovery'):
+                        file_info['recovery'] = details['recovery']
+                    file_info.lazy('content', json_preview, json_data)  # First 2000 chars
             except Exception as e:
                 file_info['error'] = str(e)
         
         # Handle text files and HTML
-        elif file_path.endswith(('.txt', '.log', '.html', '.htm')):
-            if file_path.endswith(('.html', '.htm')):
+        elif upload.kind in ('text', 'html'):
+            if upload.kind == 'html':
                 file_info['type'] = 'html'
             else:
                 file_info['type'] = 'text'
                 
             try:
-                # Try to detect encoding
-                rawdata = open(file_path, 'rb').read(4096)
-                detected = chardet.detect(rawdata)
-                encoding = detected['encoding'] or 'utf-8'
-                
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                file_info['content'] = content[:10000]  # First 10000 chars
-                file_info['data'] = content
+                decoded = upload.decode()
+                file_info['encoding'] = decoded.encoding
+                file_info.lazy('content', text_preview, decoded.text)  # First 10000 chars
+                file_info['data'] = decoded.text
             except Exception as e:
-                # Try alternative encodings
-                encodings = ['utf-8', 'cp1252', 'latin1', 'utf-16']
-                for enc in encodings:
-                    try:
-                        with open(file_path, 'r', encoding=enc) as f:
-                            content = f.read()
-                        file_info['content'] = content[:10000]
-                        file_info['data'] = content
-                        file_info['encoding'] = enc
-                        break
-                    except:
-                        continue
-                else:
-                    file_info['error'] = str(e)
+                file_info['error'] = str(e)
         
         # Handle Markdown files
-        elif file_path.endswith(('.md', '.markdown')):
+        elif upload.kind == 'markdown':
             file_info['type'] = 'markdown'
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                file_info['content'] = content
-                file_info['data'] = content
+                decoded = upload.decode()
+                file_info['encoding'] = decoded.encoding
+                file_info['content'] = decoded.text
+                file_info['data'] = decoded.text
             except Exception as e:
                 file_info['error'] = str(e)
         
         # Handle SQLite database files
-        elif file_path.endswith(('.db', '.sqlite', '.sqlite3')):
+        elif upload.kind == 'sqlite':
             file_info['type'] = 'sqlite'
             try:
-                conn = sqlite3.connect(file_path)
+                # sqlite3 needs a real file, so this is the one type spilled to disk
+                file_info['path'] = upload.path()
+                conn = sqlite3.connect(file_info['path'])
                 cursor = conn.cursor()
                 
                 # Get list of tables
@@ -303,63 +447,35 @@ class FileProcessor(BaseProcessor):
                 
                 conn.close()
                 file_info['data'] = table_data
-                file_info['content'] = str(table_data)
+                file_info.lazy('content', str, table_data)
+            except Exception as e:
+                file_info['error'] = str(e)
+        
+        # Handle gzip/bz2/xz: inflate in memory and extract the inner file
+        elif upload.kind in OPENERS:
+            file_info['type'] = upload.kind
+            budget = budget if budget is not None else archive_budget()
+            name = inner_name(upload.name, upload.kind)
+            try:
+                indexed = self._indexed_log_info(upload, name)
+                if indexed is not None:
+                    return indexed
+                with open_decompressed(upload.kind, upload.open(), budget, name, upload.size) as stream:
+                    inner = Upload(name, stream.read())
+                inner_info = self.extract_file_info(inner, budget.child())
+                inner_info['compression'] = upload.kind
+                inner_info['compressed_name'] = upload.name
+                inner_info['compressed_size'] = upload.size
+                return inner_info
+            except ArchiveLimitExceeded as e:
+                file_info['error'] = str(e)
+                file_info['limit'] = e.as_dict()
             except Exception as e:
                 file_info['error'] = str(e)
         
         # For other file types, just record basic info
         else:
             file_info['type'] = 'unknown'
-            file_info['content'] = f"File type not supported: {file_path}"
-        
-        return file_info
-    
-    def _format_markdown(self, content):
-        """Simple markdown formatter to simulate prettier"""
-        lines = content.splitlines()
-        formatted = []
-        
-        for line in lines:
-            # Heading formatting
-            if re.match(r'^#+\s+', line):
-                heading = re.match(r'^(#+)\s+(.+)', line)
-                if heading:
-                    formatted.append(f"{heading.group(1)} {heading.group(2).strip()}")
-                    continue
-            
-            # List item formatting
-            if re.match(r'^\s*[\*\-]\s+', line):
-                indent = len(re.match(r'^\s*', line).group(0))
-                list_match = re.match(r'^\s*([\*\-])\s+(.+)', line)
-                if list_match:
-                    formatted.append(f"{' ' * indent}{list_match.group(1)} {list_match.group(2).strip()}")
-                    continue
-            
-            # Blockquote formatting
-            if re.match(r'^\s*>\s*', line):
-                quote_match = re.match(r'^\s*>\s*(.+)', line)
-                if quote_match:
-                    formatted.append(f"> {quote_match.group(1).strip()}")
-                    continue
-            
-            # Regular text (collapse multiple spaces)
-            formatted.append(re.sub(r'\s+', ' ', line).strip())
-        
-        return '\n'.join(formatted)
-    
-    def _process_file_replacement(self, file_info):
-        """Process files for IITM replacement and calculate hash"""
-        result = []
-        
-        for name, file_data in file_info.get('extracted_content', {}).items():
-            if file_data.get('type') in ['text', 'markdown']:
-                content = file_data.get('content', '')
-                # Replace IITM with IIT Madras (case insensitive)
-                replaced = re.sub(r'(?i)IITM', 'IIT Madras', content)
-                result.append(replaced)
-        
-        # Simulate cat * | sha256sum
-        combined = '\n'.join(result)
-        hash_result = hashlib.sha256(combined.encode('utf-8')).hexdigest()
+            file_info['content'] = f"File type not supported: {upload.name}"
         
-        return hash_result
\ No newline at end of file
+        return file_info
\ No newline at end of file
@@ -0,0 +1,37 @@
+from bs4 import BeautifulSoup
+from .base_processor import BaseProcessor
+
+
+class CSSSelectorProcessor(BaseProcessor):
+    """
+    Sums the data-value attributes of every div with the foo class.
+    
+    Reads the whole document rather than the preview, and declines
+    (returns None) if it has no such div.
+    """
+    def solve(self, question, file_info):
+        content = file_info.get('data')
+        if not isinstance(content, str):
+            content = file_info.get('content', '')
+        soup = BeautifulSoup(content, 'html.parser')
+        # Find all divs with foo class
+        divs = soup.select('div.foo')
+        if not divs:
+            return None
+        # Sum data-value attributes
+        total = sum(int(div.get('data-value', 0)) for div in divs)
+        return str(total)
+
+
+class HiddenInputProcessor(BaseProcessor):
+    """
+    Returns the value of the first hidden input element.
+    """
+    def solve(self, question, file_info):
+        content = file_info.get('content', '')
+        soup = BeautifulSoup(content, 'html.parser')
+        # Find hidden input
+        hidden_input = soup.find('input', {'type': 'hidden'})
+        if hidden_input:
+            return hidden_input.get('value', '')
+        return None
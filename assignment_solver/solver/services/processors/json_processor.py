@@ -0,0 +1,127 @@
+import logging
+import re
+from .base_processor import BaseProcessor
+from ...utils.json_recovery import RecoverySummary, source_records, tally
+from ...utils.json_stream import JSONStreamError, count_keys, list_paths, object_events, sum_field
+
+logger = logging.getLogger(__name__)
+
+NAME = r'["\'`]?([^\s"\'`?,;:]+)["\'`]?'
+
+KEY_COUNTS = [
+    re.compile(rf'\bhow many times does\s+{NAME}\s+appear as a key\b', re.I),
+    re.compile(rf'\b(?:occurrences|count) of (?:the )?key\s+{NAME}', re.I),
+]
+FIELD_SUMS = [
+    re.compile(r'\bsum (?:of |up )?(?:the |all )?["\'`]?(\w+)["\'`]? (?:values?|fields?|figures?|amounts?)\b', re.I),
+    re.compile(r'\btotal ["\'`]?(\w+)["\'`]? (?:value|amount|figure)\b', re.I),
+]
+PATHS = re.compile(r'\b(?:list|what are)\b.*\bpaths\b', re.I)
+
+# Words the field patterns can catch that never name a field
+NOT_FIELDS = {'the', 'all', 'of', 'number', 'count', 'total'}
+
+
+def json_events(file_info):
+    """
+    Events over an extracted JSON file: streamed from its JSONSource when
+    it was too large to load, else replayed from the parsed (or salvaged)
+    data.
+    
+    Returns:
+        iterator or None: (path, event, value) triples, None without JSON
+    """
+    source = file_info.get('json_source')
+    if source is not None:
+        return source.events()
+    if file_info.get('data') is None:
+        return None
+    return object_events(file_info['data'], multiple=file_info.get('json_format') in ('ndjson', 'recovered'))
+
+
+def format_number(value):
+    """Integers as such, floats without representation noise."""
+    if isinstance(value, float):
+        value = round(value, 10)
+        if value.is_integer():
+            return str(int(value))
+    return str(value)
+
+
+class JSONQuery:
+    """
+    A structural question about a JSON document, read from question text:
+    how often a key occurs (as a key, not as a value), the sum of a numeric
+    field at any depth, or the list of paths in the document.
+    """
+    __slots__ = ('aggregate', 'name')
+    
+    def __init__(self, aggregate, name=None):
+        self.aggregate = aggregate
+        self.name = name
+    
+    @classmethod
+    def parse(cls, question):
+        """
+        Build a query from a question.
+        
+        Args:
+            question (str): The question text
+        
+        Returns:
+            JSONQuery or None: None if the question is not understood
+        """
+        for pattern in KEY_COUNTS:
+            match = pattern.search(question)
+            if match:
+                return cls('keys', match.group(1))
+        for pattern in FIELD_SUMS:
+            match = pattern.search(question)
+            if match and match.group(1).lower() not in NOT_FIELDS:
+                return cls('sum', match.group(1))
+        if PATHS.search(question):
+            return cls('paths')
+        return None
+    
+    def run(self, stream):
+        """
+        Evaluate the query in one pass over the events.
+        
+        Args:
+            stream (iterator): (path, event, value) triples
+        
+        Returns:
+            str or None: The answer, None if a summed field never occurs
+        """
+        if self.aggregate == 'keys':
+            return str(count_keys(stream, self.name))
+        if self.aggregate == 'sum':
+            total, count = sum_field(stream, self.name)
+            return format_number(total) if count else None
+        return '\n'.join(list_paths(stream))
+
+
+class JSONStructureProcessor(BaseProcessor):
+    """
+    Answers key-count, field-sum and path questions over JSON and NDJSON
+    files, e.g. how many times a key appears in a large nested log.
+    Documents above JSON_STREAM_BYTES are streamed, never loaded whole;
+    malformed ones are answered from the records that can be salvaged.
+    """
+    def solve(self, question, file_info):
+        query = JSONQuery.parse(question)
+        if query is None:
+            return None
+        stream = json_events(file_info)
+        if stream is None:
+            return None
+        try:
+            return query.run(stream)
+        except JSONStreamError as e:
+            logger.warning(f"{file_info.get('name')} is malformed ({str(e)}); answering from its salvaged records")
+        
+        # Only streamed sources get here; loaded files were salvaged when extracted
+        summary = RecoverySummary()
+        answer = query.run(object_events(tally(source_records(file_info['json_source']), summary), multiple=True))
+        file_info['recovery'] = summary.as_dict()
+        return answer
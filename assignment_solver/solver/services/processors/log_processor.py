@@ -0,0 +1,288 @@
+import calendar
+import io
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import numpy as np
+from django.conf import settings
+from .base_processor import BaseProcessor
+from ..artifact_cache import cached_parse
+from ...utils.access_log import AccessLog, looks_like_access_log, read_access_log, read_indexed_log
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july',
+          'august', 'september', 'october', 'november', 'december']
+
+# Phrasings this engine does not compute; leave those questions to the LLM
+UNSUPPORTED = re.compile(r'\b(average|mean|median|percent(age)?|ratio|proportion|per (hour|day|minute))\b', re.I)
+
+TIME = r'(\d{1,2})(?::(\d{2}))?'
+HOUR_RANGES = [
+    re.compile(rf'\bfrom\s+{TIME}\s+(?:until|till|to)\s+(?:before\s+)?{TIME}', re.I),
+    re.compile(rf'\bbetween\s+{TIME}\s+and\s+{TIME}\b(?![-/])', re.I),
+]
+ZONE_ALIASES = {'utc': 'UTC', 'gmt': 'UTC', 'ist': 'Asia/Kolkata'}
+
+# Widest UTC offset in use; wall-clock dates are widened by this much
+# when turned into UTC bounds for skipping indexed frames
+MAX_OFFSET = 14 * 3600
+
+_log_pool = None
+_log_pool_pid = None
+_log_pool_lock = threading.Lock()
+
+
+def log_pool():
+    """
+    Return the process-wide pool used to parse indexed log frames.
+    
+    LOG_POOL selects 'thread' (zlib and the CSV tokenizer release the GIL)
+    or 'process'; LOG_WORKERS bounds its size.
+    
+    Returns:
+        Executor: Shared pool, or None if LOG_WORKERS is below 2
+    """
+    global _log_pool, _log_pool_pid
+    
+    workers = getattr(settings, 'LOG_WORKERS', min(8, os.cpu_count() or 1))
+    if workers < 2:
+        return None
+    
+    pid = os.getpid()
+    if _log_pool is None or _log_pool_pid != pid:
+        with _log_pool_lock:
+            if _log_pool is None or _log_pool_pid != pid:
+                if getattr(settings, 'LOG_POOL', 'thread') == 'process':
+                    _log_pool = ProcessPoolExecutor(max_workers=workers)
+                else:
+                    _log_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='log')
+                _log_pool_pid = pid
+    return _log_pool
+
+
+class LogQuery:
+    """
+    A filter plus aggregate over an access log, read from question text.
+    
+    Filters: path prefix, method, status range, weekday, time-of-day window
+    (end exclusive), date or date range, month, and an optional timezone to
+    read times in (by default the offset each line was logged with).
+    Aggregates: count, sum of bytes, distinct count, and top-1 by requests
+    or bytes grouped by IP or path.
+    """
+    __slots__ = ('prefix', 'methods', 'status', 'weekdays', 'minutes', 'dates', 'month', 'tz',
+                 'aggregate', 'group', 'measure', 'output')
+    
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, None)
+    
+    @classmethod
+    def parse(cls, question):
+        """
+        Build a query from a question.
+        
+        Args:
+            question (str): The question text
+        
+        Returns:
+            LogQuery or None: None if the question is not understood
+        """
+        if UNSUPPORTED.search(question):
+            return None
+        query = cls()
+        if not query._parse_aggregate(question):
+            return None
+        query._parse_filters(question)
+        return query
+    
+    def _parse_aggregate(self, question):
+        group = None
+        if re.search(r'\bIPs?\b|\bIP address', question, re.I):
+            group = 'ip'
+        elif re.search(r'\b(pages?|paths?|urls?|files?)\b', question, re.I):
+            group = 'path'
+        bytes_asked = re.search(r'\bbytes\b|\bdownload', question, re.I)
+        
+        if group and re.search(r'\b(top|highest|most|maximum|largest)\b', question, re.I):
+            self.aggregate = 'top'
+            self.group = group
+            self.measure = 'size' if bytes_asked else 'requests'
+            asks_value = re.search(r'\bhow (many|much)\b|\bnumber of\b|\btotal\b', question, re.I)
+            asks_key = re.search(r'\b(which|what|whose)\s+(is the\s+)?(IP|page|path|url|file)', question, re.I)
+            self.output = 'key' if asks_key and not asks_value else 'value'
+        elif group and re.search(r'\b(unique|distinct)\b', question, re.I):
+            self.aggregate = 'distinct'
+            self.group = group
+        elif re.search(r'\bhow many bytes\b|\btotal (downloaded )?bytes\b|\bsum of (the )?bytes\b', question, re.I):
+            self.aggregate = 'sum'
+        elif re.search(r'\bhow many\b|\bnumber of\b|\bcount\b', question, re.I):
+            self.aggregate = 'count'
+        return self.aggregate is not None
+    
+    def _parse_filters(self, question):
+        match = re.search(r'\bunder\s+(?:the\s+)?/?([\w.\-]+(?:/[\w.\-]+)*)/?', question, re.I)
+        if match is None:
+            match = re.search(r'\b(?:from|in)\s+the\s+/?([\w.\-]+)/?\s+section\b', question, re.I)
+        if match:
+            self.prefix = f"/{match.group(1).strip('/')}/"
+        
+        methods = set(re.findall(r'\b(GET|POST|PUT|DELETE|HEAD|PATCH|OPTIONS)\b', question))
+        self.methods = methods or None
+        
+        match = re.search(r'\bstatus(?: code)?\s+(\d{3})\b', question, re.I)
+        if match:
+            self.status = (int(match.group(1)), int(match.group(1)))
+        elif re.search(r'\bsuccessful\b', question, re.I):
+            self.status = (200, 299)
+        elif re.search(r'\b(failed|unsuccessful|errors?)\b', question, re.I):
+            self.status = (400, 599)
+        
+        days = {WEEKDAYS.index(day.lower() + 'day') for day in re.findall(
+            r'\b(mon|tues|wednes|thurs|fri|satur|sun)days?\b', question, re.I)}
+        self.weekdays = days or None
+        
+        for pattern in HOUR_RANGES:
+            match = pattern.search(question)
+            if match:
+                start = int(match.group(1)) * 60 + int(match.group(2) or 0)
+                end = int(match.group(3)) * 60 + int(match.group(4) or 0)
+                if start < end <= 24 * 60:
+                    self.minutes = (start, end)
+                    break
+        
+        dates = re.findall(r'\b(\d{4}-\d{2}-\d{2})\b', question)
+        if dates:
+            self.dates = (np.datetime64(min(dates)), np.datetime64(max(dates)))
+        
+        match = re.search(r'\b(' + '|'.join(MONTHS) + r')\s+(\d{4})\b', question, re.I)
+        if match:
+            self.month = np.datetime64(f"{match.group(2)}-{MONTHS.index(match.group(1).lower()) + 1:02d}", 'M')
+        
+        self.tz = self._parse_timezone(question)
+    
+    @staticmethod
+    def _parse_timezone(question):
+        match = re.search(r'\b([A-Z][A-Za-z_]+/[A-Z][A-Za-z_]+)\b', question)
+        if match:
+            try:
+                return ZoneInfo(match.group(1))
+            except (ZoneInfoNotFoundError, ValueError):
+                pass
+        match = re.search(r'\b(?:in|as)\s+(UTC|GMT|IST)\b|\b(UTC|GMT|IST)\s+time\b', question)
+        if match:
+            return ZoneInfo(ZONE_ALIASES[(match.group(1) or match.group(2)).lower()])
+        return None
+    
+    def utc_bounds(self):
+        """
+        Conservative UTC epoch-second range the query's date filters can
+        match, for skipping index frames; (None, None) if unbounded.
+        """
+        if self.dates:
+            start, end = self.dates[0], self.dates[1] + np.timedelta64(1, 'D')
+        elif self.month is not None:
+            start, end = self.month, self.month + np.timedelta64(1, 'M')
+        else:
+            return None, None
+        start = calendar.timegm(start.astype('datetime64[s]').astype(object).timetuple())
+        end = calendar.timegm(end.astype('datetime64[s]').astype(object).timetuple())
+        return start - MAX_OFFSET, end + MAX_OFFSET
+    
+    def mask(self, log):
+        """
+        Boolean row mask for this query's filters, computed with vectorized
+        NumPy operations over the log's columns.
+        """
+        table = log.table
+        mask = np.ones(len(table), dtype=bool)
+        if self.prefix:
+            mask &= log.prefix_mask('path', self.prefix)
+        if self.methods:
+            mask &= log.isin_mask('method', self.methods)
+        if self.status:
+            status = table['status'].to_numpy()
+            mask &= (status >= self.status[0]) & (status <= self.status[1])
+        
+        if self.weekdays or self.minutes or self.dates or self.month is not None:
+            times = log.local_time(self.tz).to_numpy()
+            days = times.astype('datetime64[D]')
+            if self.weekdays:
+                # 1970-01-01 was a Thursday (weekday 3)
+                weekday = (days.view('int64') + 3) % 7
+                mask &= np.isin(weekday, list(self.weekdays))
+            if self.minutes:
+                minute = (times - days).astype('timedelta64[m]').astype('int64')
+                mask &= (minute >= self.minutes[0]) & (minute < self.minutes[1])
+            if self.dates:
+                mask &= (days >= self.dates[0]) & (days <= self.dates[1])
+            if self.month is not None:
+                mask &= days.astype('datetime64[M]') == self.month
+        return mask
+    
+    def run(self, log):
+        """
+        Evaluate the query.
+        
+        Args:
+            log (AccessLog): Parsed log
+        
+        Returns:
+            str: The answer
+        """
+        mask = self.mask(log)
+        table = log.table
+        if self.aggregate == 'count':
+            return str(int(mask.sum()))
+        if self.aggregate == 'sum':
+            return str(int(table['size'].to_numpy()[mask].sum()))
+        if self.aggregate == 'distinct':
+            return str(int(table[self.group][mask].nunique()))
+        
+        selected = table.loc[mask, [self.group, 'size']]
+        if selected.empty:
+            return None
+        grouped = selected.groupby(self.group, observed=True)
+        totals = grouped['size'].sum() if self.measure == 'size' else grouped.size()
+        key = totals.idxmax()
+        return str(key) if self.output == 'key' else str(int(totals[key]))
+
+
+class ApacheLogProcessor(BaseProcessor):
+    """
+    Answers filter, group-by and top-k questions over Apache access logs,
+    e.g. successful GET requests under /telugu/ on Sunday afternoons, or the
+    bytes downloaded by the top IP under kannada/ on a date.
+    """
+    def solve(self, question, file_info):
+        if not looks_like_access_log(str(file_info.get('content') or '')[:4096]):
+            return None
+        query = LogQuery.parse(question)
+        if query is None:
+            return None
+        return query.run(self.load(file_info, query.utc_bounds()))
+    
+    def load(self, file_info, bounds=(None, None)):
+        """
+        Parse the log into columns once per file_info, so follow-up
+        questions on the same upload reuse the table; the table is also
+        kept in the artifact cache for later uploads of the same bytes.
+        
+        Large gzip logs arrive with a GzipIndex instead of their text; only
+        the frames overlapping bounds are inflated, on the log pool, and
+        parsed frames are kept for later questions.
+        """
+        index = file_info.get('gzip_index')
+        if index is not None:
+            frames = index.select(*bounds)
+            return read_indexed_log(index, frames, log_pool(), file_info.setdefault('access_log_frames', {}))
+        if 'access_log' not in file_info:
+            table, _ = cached_parse(
+                file_info.get('sha256'), file_info.get('size') or 0, 'access_log',
+                lambda: (read_access_log(io.StringIO(file_info.get('data') or '')).table, {}),
+                frame=True,
+            )
+            file_info['access_log'] = AccessLog(table)
+        return file_info['access_log']
@@ -0,0 +1,50 @@
+import hashlib
+import re
+from .base_processor import BaseProcessor
+
+
+class PrettierHashProcessor(BaseProcessor):
+    """
+    Formats markdown the way prettier would and returns its SHA-256 hash.
+    """
+    def solve(self, question, file_info):
+        # Process markdown with prettier (simulate the output)
+        content = file_info.get('content', '')
+        # Apply basic prettier formatting rules
+        formatted = format_markdown(content)
+        # Calculate SHA256 hash
+        return hashlib.sha256(formatted.encode('utf-8')).hexdigest()
+
+
+def format_markdown(content):
+    """Simple markdown formatter to simulate prettier"""
+    lines = content.splitlines()
+    formatted = []
+    
+    for line in lines:
+        # Heading formatting
+        if re.match(r'^#+\s+', line):
+            heading = re.match(r'^(#+)\s+(.+)', line)
+            if heading:
+                formatted.append(f"{heading.group(1)} {heading.group(2).strip()}")
+                continue
+        
+        # List item formatting
+        if re.match(r'^\s*[\*\-]\s+', line):
+            indent = len(re.match(r'^\s*', line).group(0))
+            list_match = re.match(r'^\s*([\*\-])\s+(.+)', line)
+            if list_match:
+                formatted.append(f"{' ' * indent}{list_match.group(1)} {list_match.group(2).strip()}")
+                continue
+        
+        # Blockquote formatting
+        if re.match(r'^\s*>\s*', line):
+            quote_match = re.match(r'^\s*>\s*(.+)', line)
+            if quote_match:
+                formatted.append(f"> {quote_match.group(1).strip()}")
+                continue
+        
+        # Regular text (collapse multiple spaces)
+        formatted.append(re.sub(r'\s+', ' ', line).strip())
+    
+    return '\n'.join(formatted)
@@ -0,0 +1,160 @@
+import importlib
+import logging
+import threading
+from ..router import QuestionRouter, Rule
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessorRegistry:
+    """
+    Registry of BaseProcessor subclasses, loaded on first use.
+    
+    Each processor is declared with a name, the dotted path of its class,
+    the keywords that route a question to it, the file types it handles and
+    a priority. Only the declaration lives here; the processor's module (and
+    whatever heavy libraries it imports) is imported the first time a request
+    routes to it, and the instance is reused afterwards.
+    """
+    def __init__(self):
+        self.router = QuestionRouter()
+        self._paths = {}
+        self._columns = {}
+        self._instances = {}
+        self._lock = threading.Lock()
+    
+    def register(self, name, path, keywords=(), file_types=None, priority=0, columns=None):
+        """
+        Declare a processor.
+        
+        Args:
+            name (str): Unique processor name
+            path (str): Dotted path to the BaseProcessor subclass
+            keywords (iterable): Substrings that must all appear in the question
+            file_types (iterable, optional): Accepted file types; None for any
+            priority (int): Higher priorities are tried first
+            columns (iterable, optional): The only CSV columns the processor
+                reads; None if it may read any
+        """
+        if name in self._paths:
+            raise ValueError(f"Processor already registered: {name}")
+        self._paths[name] = path
+        self._columns[name] = frozenset(columns) if columns is not None else None
+        self.router.add_rule(Rule(name, keywords, file_types, priority, handler=name))
+    
+    def get(self, name):
+        """
+        Return the processor instance for name, importing its module if needed.
+        
+        Args:
+            name (str): Registered processor name
+        
+        Returns:
+            BaseProcessor: Shared processor instance
+        """
+        processor = self._instances.get(name)
+        if processor is None:
+            with self._lock:
+                processor = self._instances.get(name)
+                if processor is None:
+                    module_path, class_name = self._paths[name].rsplit('.', 1)
+                    logger.info(f"Loading processor {name} from {module_path}")
+                    processor = getattr(importlib.import_module(module_path), class_name)()
+                    self._instances[name] = processor
+        return processor
+    
+    def candidates(self, question, file_type=None):
+        """
+        Return the names of processors matching the question, best first.
+        """
+        return [rule.name for rule in self.router.candidates(question, file_type)]
+    
+    def columns_for(self, question, file_type=None):
+        """
+        Return the CSV columns the processors matching a question read.
+        
+        Returns:
+            frozenset or None: Union of the declared columns, or None if no
+                processor matches or any of them may read every column
+        """
+        names = self.candidates(question, file_type)
+        if not names or any(self._columns[name] is None for name in names):
+            return None
+        return frozenset().union(*(self._columns[name] for name in names))
+    
+    def solve(self, question, file_info):
+        """
+        Run matching processors until one produces an answer.
+        
+        A processor that raises is logged and skipped, so an unexpected file
+        layout falls back to the next candidate (and ultimately the LLM)
+        instead of failing the request.
+        
+        Args:
+            question (str): The question text
+            file_info (dict): Information extracted from the file
+        
+        Returns:
+            str or None: Answer from the first processor that produced one
+        """
+        for name in self.candidates(question, file_info.get('type')):
+            try:
+                answer = self.get(name).solve(question, file_info)
+            except Exception as e:
+                logger.warning(f"Processor {name} failed: {str(e)}")
+                continue
+            if answer is not None:
+                logger.info(f"Answered locally by processor {name}")
+                return answer
+        return None
+    
+    def loaded(self):
+        """Return the names of processors whose modules have been imported."""
+        return sorted(self._instances)
+    
+    def __contains__(self, name):
+        return name in self._paths
+    
+    def __len__(self):
+        return len(self._paths)
+
+
+processors = ProcessorRegistry()
+
+# Built-in processors. Keep these declarations free of heavy imports; the
+# modules they point at are only imported when a question routes to them.
+_PACKAGE = 'solver.services.processors'
+
+# ZIP extraction (Q8)
+processors.register('zip_answer_column', f'{_PACKAGE}.archive_processor.ZipAnswerColumnProcessor',
+                    ["unzip", "answer column"], file_types={'zip'}, priority=90)
+# Simple CSV question, e.g. "What is the value in the 'answer' column?"
+processors.register('csv_answer_column', f'{_PACKAGE}.csv_processor.AnswerColumnProcessor',
+                    ["column", "answer"], file_types={'csv'}, priority=80, columns=['answer'])
+# Markdown formatting (Q3)
+processors.register('prettier_sha256', f'{_PACKAGE}.markdown_processor.PrettierHashProcessor',
+                    ["prettier", "sha256sum"], file_types={'markdown'}, priority=70)
+# File comparison (Q17)
+processors.register('compare_files', f'{_PACKAGE}.archive_processor.CompareFilesProcessor',
+                    ["how many lines are different"], file_types={'zip'}, priority=60)
+# File encoding processing (Q12)
+processors.register('encodings_sum', f'{_PACKAGE}.archive_processor.EncodingsSumProcessor',
+                    ["different encodings", "sum"], file_types={'zip'}, priority=50)
+# CSS Selector (Q11)
+processors.register('css_selector', f'{_PACKAGE}.html_processor.CSSSelectorProcessor',
+                    ["div", "foo class", "data-value"], file_types={'text', 'html'}, priority=40)
+# DevTools usage (Q6)
+processors.register('hidden_input', f'{_PACKAGE}.html_processor.HiddenInputProcessor',
+                    ["hidden input", "secret value"], file_types={'text', 'html'}, priority=30)
+# SQL Query (Q18)
+processors.register('gold_ticket_sales', f'{_PACKAGE}.sql_processor.GoldTicketSalesProcessor',
+                    ["sql", "gold", "ticket"], file_types={'sqlite'}, priority=20)
+# File replacement (Q14)
+processors.register('iitm_replacement', f'{_PACKAGE}.archive_processor.ReplacementHashProcessor',
+                    ["replace", "iitm", "sha256sum"], file_types={'zip'}, priority=10)
+# Apache access log analytics (GA5); declines anything that is not a log
+processors.register('apache_log', f'{_PACKAGE}.log_processor.ApacheLogProcessor',
+                    file_types={'text'}, priority=5)
+# Key counts, field sums and paths in JSON/NDJSON (GA5); declines other questions
+processors.register('json_structure', f'{_PACKAGE}.json_processor.JSONStructureProcessor',
+                    file_types={'json'}, priority=5)
@@ -0,0 +1,24 @@
+import sqlite3
+from .base_processor import BaseProcessor
+
+
+class GoldTicketSalesProcessor(BaseProcessor):
+    """
+    Computes total sales of Gold tickets from the tickets table.
+    """
+    def solve(self, question, file_info):
+        db_path = file_info.get('path')
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        
+        # Execute SQL to find total sales for Gold tickets
+        query = """
+        SELECT SUM(units * price) 
+        FROM tickets 
+        WHERE UPPER(TRIM(type)) = 'GOLD'
+        """
+        cursor.execute(query)
+        result = cursor.fetchone()[0]
+        conn.close()
+        
+        return str(result)
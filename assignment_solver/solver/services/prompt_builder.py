@@ -0,0 +1,219 @@
+import json
+import math
+from django.conf import settings
+
+# Rough tokens-per-character ratio for English text and CSV under the
+# gpt-4o tokenizer; errs on the side of overestimating.
+CHARS_PER_TOKEN = 3.5
+TRUNCATED = "\n... [truncated]"
+
+SYSTEM_PROMPT = "You are a helpful assistant for the IIT Madras Online Degree in Data Science. Your task is to answer questions accurately. Provide only the exact answer without any explanations or additional text."
+FILE_INSTRUCTIONS = "Answer the question based on the file content. Provide ONLY the answer, without any explanations or text."
+DIRECT_INSTRUCTIONS = "Answer the question directly. Provide ONLY the answer, without any explanations or text."
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens text will use."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate(text, max_tokens):
+    """
+    Cut text so that it fits in max_tokens, marking the cut.
+    
+    Args:
+        text (str): Text to fit
+        max_tokens (int): Token budget
+    
+    Returns:
+        str: text, or a prefix of it ending with a truncation marker
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = int(max_tokens * CHARS_PER_TOKEN) - len(TRUNCATED)
+    if max_chars <= 0:
+        return ''
+    return text[:max_chars] + TRUNCATED
+
+
+class PromptBuilder:
+    """
+    Builds AI Proxy prompts that stay within a token budget.
+    
+    Instead of sending whole reprs of extracted files, each file type is
+    summarized into a compact digest: row/column counts, dtypes and column
+    statistics for tables, a member manifest for archives, table schemas for
+    databases, and as many representative rows or characters as the budget
+    leaves room for.
+    """
+    def __init__(self, budget_tokens=None, context_tokens=None):
+        context_tokens = context_tokens or getattr(settings, 'AIPROXY_CONTEXT_TOKENS', 128000)
+        budget_tokens = budget_tokens or getattr(settings, 'PROMPT_TOKEN_BUDGET', 12000)
+        # Never exceed the model context, leaving room for the system prompt and the answer
+        self.budget_tokens = min(budget_tokens, context_tokens - estimate_tokens(SYSTEM_PROMPT) - 1000)
+    
+    def build(self, question, file_info=None):
+        """
+        Build the user prompt for a question and optional extracted file.
+        
+        Args:
+            question (str): The question text
+            file_info (dict, optional): Information extracted from the file
+        
+        Returns:
+            str: Prompt guaranteed to fit in the token budget
+        """
+        if not file_info:
+            template = "Question: {question}\n\n" + DIRECT_INSTRUCTIONS
+        else:
+            template = "Question: {question}\n\nFile Content: {digest}\n\n" + FILE_INSTRUCTIONS
+        
+        fixed = estimate_tokens(template.format(question='', digest=''))
+        question = truncate(question, self.budget_tokens - fixed)
+        if not file_info:
+            return template.format(question=question)
+        
+        remaining = self.budget_tokens - fixed - estimate_tokens(question)
+        return template.format(question=question, digest=self.digest(file_info, remaining))
+    
+    def digest(self, file_info, max_tokens):
+        """
+        Summarize an extracted file within max_tokens.
+        
+        Args:
+            file_info (dict): Information extracted from the file
+            max_tokens (int): Token budget for the digest
+        
+        Returns:
+            str: Compact description of the file
+        """
+        if max_tokens <= 0:
+            return ''
+        
+        file_type = file_info.get('type')
+        header = f"{file_info.get('name')} ({file_type})"
+        if file_info.get('error'):
+            header += f"\nError reading file: {file_info['error']}"
+        if file_info.get('recovery'):
+            recovery = file_info['recovery']
+            header += (
+                f"\nMalformed JSON: {recovery['records']} records salvaged, {recovery['damaged_count']} damaged"
+                f" (incomplete fields dropped); numeric field totals: {recovery['totals']}"
+            )
+        
+        body_tokens = max_tokens - estimate_tokens(header) - 1
+        if file_type == 'zip':
+            body = self._digest_zip(file_info, body_tokens)
+        elif file_type == 'csv' and file_info.get('data') is not None:
+            body = self._digest_dataframe(file_info['data'], body_tokens)
+        elif file_type == 'sqlite' and file_info.get('data') is not None:
+            body = self._digest_sqlite(file_info['data'], body_tokens)
+        elif file_type == 'json' and file_info.get('data') is not None:
+            body = self._digest_json(file_info['data'], body_tokens)
+        elif isinstance(file_info.get('data'), str):
+            body = self._digest_text(file_info['data'], body_tokens)
+        else:
+            body = truncate(str(file_info.get('content') or ''), body_tokens)
+        
+        return truncate(f"{header}\n{body}" if body else header, max_tokens)
+    
+    def _digest_zip(self, file_info, max_tokens):
+        """Member manifest followed by per-member digests sharing the budget."""
+        members = file_info.get('extracted_content', {})
+        # Lazy archives describe members without inflating them
+        describe = getattr(members, 'describe', members.get)
+        manifest_lines = [f"Archive members ({len(members)}):"]
+        for name in members:
+            member = describe(name)
+            size = member.get('size')
+            manifest_lines.append(f"- {name}: {member.get('type')}" + (f", {size} bytes" if size is not None else ''))
+        manifest = truncate('\n'.join(manifest_lines), max_tokens // 4 or 1)
+        
+        parts = [manifest]
+        remaining = max_tokens - estimate_tokens(manifest)
+        names = list(members)
+        for i, name in enumerate(names):
+            share = remaining // (len(names) - i)
+            if share < 20:
+                break
+            member_digest = self.digest(members[name], share)
+            parts.append(f"--- {member_digest}")
+            remaining -= estimate_tokens(member_digest) + 2
+        return '\n'.join(parts)
+    
+    def _digest_dataframe(self, df, max_tokens):
+        """Shape, dtypes, vectorized column statistics and representative rows."""
+        lines = [f"Rows: {len(df)}, Columns: {len(df.columns)}"]
+        
+        nulls = df.isna().sum()
+        numeric = df.select_dtypes(include='number')
+        stats = numeric.agg(['min', 'max', 'mean', 'sum']) if not numeric.empty else None
+        others = df.select_dtypes(exclude='number')
+        unique = others.nunique() if not others.empty else None
+        
+        lines.append("Columns:")
+        for column in df.columns:
+            line = f"- {column} ({df[column].dtype}), nulls={int(nulls[column])}"
+            if stats is not None and column in stats.columns:
+                col = stats[column]
+                line += f", min={col['min']:g}, max={col['max']:g}, mean={col['mean']:g}, sum={col['sum']:g}"
+            elif unique is not None and column in unique.index:
+                top = {str(value): int(count) for value, count in df[column].value_counts().head(3).items()}
+                line += f", unique={int(unique[column])}, top={top}"
+            lines.append(line)
+        
+        summary = truncate('\n'.join(lines), max_tokens // 2 or 1)
+        rows = self._sample_rows(df, max_tokens - estimate_tokens(summary) - 1)
+        return f"{summary}\n{rows}" if rows else summary
+    
+    def _sample_rows(self, df, max_tokens):
+        """Render as many leading and trailing rows as fit, as CSV."""
+        if max_tokens <= 0 or df.empty:
+            return ''
+        sample = df.head(50).to_csv(index=False)
+        per_row = max(1, estimate_tokens(sample) / (min(len(df), 50) + 1))
+        n_rows = int(max_tokens / per_row) - 2
+        if n_rows <= 0:
+            return ''
+        if n_rows >= len(df):
+            return truncate("Rows:\n" + df.to_csv(index=False), max_tokens)
+        head = df.head(max(1, n_rows - n_rows // 4))
+        tail = df.tail(n_rows // 4)
+        text = f"First {len(head)} rows:\n{head.to_csv(index=False)}"
+        if len(tail):
+            text += f"Last {len(tail)} rows:\n{tail.to_csv(index=False, header=False)}"
+        return truncate(text, max_tokens)
+    
+    def _digest_sqlite(self, tables, max_tokens):
+        """Table schemas with their sample rows."""
+        lines = []
+        for table_name, table in tables.items():
+            lines.append(f"Table {table_name}({', '.join(table.get('columns', []))})")
+            for row in table.get('sample', []):
+                lines.append('  ' + ', '.join(str(value) for value in row))
+        return truncate('\n'.join(lines), max_tokens)
+    
+    def _digest_json(self, data, max_tokens):
+        """Top-level structure followed by compact JSON."""
+        if isinstance(data, list):
+            structure = f"Array of {len(data)} items"
+            if data and isinstance(data[0], dict):
+                structure += f"; first item keys: {list(data[0])}"
+        elif isinstance(data, dict):
+            structure = f"Object with keys: {list(data)}"
+        else:
+            structure = f"Scalar: {type(data).__name__}"
+        structure = truncate(structure, max_tokens // 4 or 1)
+        body = json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=str)
+        return f"{structure}\n{truncate(body, max_tokens - estimate_tokens(structure) - 1)}"
+    
+    def _digest_text(self, text, max_tokens):
+        """Line count followed by the head and tail of the text."""
+        header = f"Lines: {text.count(chr(10)) + 1}, Characters: {len(text)}"
+        remaining = max_tokens - estimate_tokens(header) - 1
+        if estimate_tokens(text) <= remaining:
+            return f"{header}\n{text}"
+        tail_tokens = remaining // 4
+        head = truncate(text, remaining - tail_tokens - estimate_tokens(TRUNCATED))
+        tail = text[-int(tail_tokens * CHARS_PER_TOKEN):] if tail_tokens > 0 else ''
+        return f"{header}\n{head}\n{tail}"
@@ -0,0 +1,339 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from django.conf import settings
+from .resilience import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at rate_per_minute, holding at most capacity.
+    
+    reserve() takes tokens immediately, letting the balance go negative, and
+    returns how long the caller must wait before the tokens are really
+    available. Reservations are served in arrival order, so callers queue
+    fairly instead of racing for freshly refilled tokens.
+    """
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self, amount):
+        """
+        Reserve amount tokens.
+        
+        Args:
+            amount (float): Tokens to take
+        
+        Returns:
+            float: Seconds to wait before using them
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= min(amount, self.capacity)
+            return max(0.0, -self._tokens / self.rate)
+    
+    def refund(self, amount):
+        """Return tokens reserved by a caller that gave up waiting."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + min(amount, self.capacity))
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """
+    Token bucket whose balance lives in a SQLite file shared by all worker
+    processes on the host; each reservation is one IMMEDIATE transaction.
+    """
+    def __init__(self, path, name, rate_per_minute, capacity=None):
+        super().__init__(rate_per_minute, capacity)
+        self.path = str(path)
+        self.name = name
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+                conn.execute(
+                    "INSERT OR IGNORE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                    (name, float(self.capacity), time.time())
+                )
+        finally:
+            conn.close()
+    
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+    
+    def _update(self, delta):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            tokens, updated = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)).fetchone()
+            now = time.time()
+            tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate) + delta
+            conn.execute("UPDATE buckets SET tokens = ?, updated = ? WHERE name = ?", (min(self.capacity, tokens), now, self.name))
+            conn.execute("COMMIT")
+            return tokens
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def reserve(self, amount):
+        tokens = self._update(-min(amount, self.capacity))
+        return max(0.0, -tokens / self.rate)
+    
+    def refund(self, amount):
+        self._update(min(amount, self.capacity))
+
+
+class FairLimiter:
+    """
+    FIFO semaphore shared by threads and event loops.
+    
+    Waiters are granted slots strictly in arrival order whether they block
+    a thread or await on an event loop, so the sync and async request paths
+    share one in-flight limit.
+    """
+    def __init__(self, limit):
+        self.limit = limit
+        self._in_use = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+    
+    def _try_acquire(self, waiter):
+        """Take a free slot, or enqueue waiter. Returns True if acquired."""
+        with self._lock:
+            if self._in_use < self.limit and not self._waiters:
+                self._in_use += 1
+                return True
+            self._waiters.append(waiter)
+            return False
+    
+    def _withdraw(self, waiter):
+        """Remove a waiter that gave up. Returns False if it was already granted."""
+        with self._lock:
+            try:
+                self._waiters.remove(waiter)
+                return True
+            except ValueError:
+                return False
+    
+    def acquire(self, timeout=None):
+        """
+        Block until a slot is free.
+        
+        Args:
+            timeout (float, optional): Maximum seconds to wait
+        
+        Returns:
+            bool: True if acquired, False on timeout
+        """
+        event = threading.Event()
+        if self._try_acquire(event):
+            return True
+        if event.wait(timeout) or not self._withdraw(event):
+            return True
+        return False
+    
+    async def aacquire(self, timeout=None):
+        """
+        Await a free slot without blocking the event loop.
+        
+        Returns:
+            bool: True if acquired, False on timeout
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if self._try_acquire((loop, future)):
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._abandon(loop, future)
+            return False
+        except asyncio.CancelledError:
+            self._abandon(loop, future)
+            raise
+    
+    def _abandon(self, loop, future):
+        """Give up an async wait; a slot granted in the meantime is passed on."""
+        if not self._withdraw((loop, future)):
+            future.add_done_callback(lambda f: self.release())
+    
+    def release(self):
+        """Free a slot, handing it to the oldest waiter if there is one."""
+        with self._lock:
+            if not self._waiters:
+                self._in_use -= 1
+                return
+            waiter = self._waiters.popleft()
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            loop, future = waiter
+            loop.call_soon_threadsafe(self._grant, future)
+    
+    def _grant(self, future):
+        if future.done():
+            # The waiter was cancelled after being dequeued
+            self.release()
+        else:
+            future.set_result(True)
+    
+    @property
+    def in_use(self):
+        return self._in_use
+    
+    @property
+    def waiting(self):
+        return len(self._waiters)
+
+
+class OutboundLimiter:
+    """
+    Admission control in front of AI Proxy.
+    
+    Every outbound call (including retries) first reserves one request and
+    its estimated tokens from the per-minute buckets, takes an in-flight
+    slot, then sleeps until the tokens are available. Taking the slot first
+    means a call never sleeps for tokens only to be refused. Waiting is FIFO
+    and bounded by the request deadline; queue time is recorded for stats().
+    """
+    def __init__(self, max_in_flight=32, requests_per_minute=0, tokens_per_minute=0, shared_path=None):
+        self.slots = FairLimiter(max_in_flight)
+        self.request_bucket = self._bucket('requests', requests_per_minute, shared_path)
+        self.token_bucket = self._bucket('tokens', tokens_per_minute, shared_path)
+        self._stats = {'admitted': 0, 'rejected': 0, 'queue_seconds': 0.0, 'max_queue_seconds': 0.0}
+        self._stats_lock = threading.Lock()
+    
+    @staticmethod
+    def _bucket(name, rate, shared_path):
+        if not rate:
+            return None
+        if shared_path:
+            return SQLiteTokenBucket(shared_path, name, rate)
+        return TokenBucket(rate)
+    
+    def _reserve(self, tokens):
+        """Reserve from both buckets and return the longer wait."""
+        waits = [0.0]
+        if self.request_bucket is not None:
+            waits.append(self.request_bucket.reserve(1))
+        if self.token_bucket is not None:
+            waits.append(self.token_bucket.reserve(tokens))
+        return max(waits)
+    
+    def _refund(self, tokens):
+        if self.request_bucket is not None:
+            self.request_bucket.refund(1)
+        if self.token_bucket is not None:
+            self.token_bucket.refund(tokens)
+    
+    def _reject(self, tokens, waited):
+        self._refund(tokens)
+        with self._stats_lock:
+            self._stats['rejected'] += 1
+        raise DeadlineExceeded(f"Deadline exceeded waiting {waited:.2f}s for an AI Proxy slot")
+    
+    @staticmethod
+    def _slot_timeout(wait, deadline):
+        """Time allowed for a slot, leaving room for the token wait that follows."""
+        if deadline is None:
+            return None
+        return max(0.0, deadline.remaining() - wait)
+    
+    def _record(self, waited):
+        with self._stats_lock:
+            self._stats['admitted'] += 1
+            self._stats['queue_seconds'] += waited
+            self._stats['max_queue_seconds'] = max(self._stats['max_queue_seconds'], waited)
+        if waited > 0.1:
+            logger.info(f"AI Proxy call queued for {waited:.2f}s")
+    
+    @contextmanager
+    def slot(self, tokens=0, deadline=None):
+        """
+        Hold admission for one outbound call.
+        
+        Args:
+            tokens (int): Estimated tokens the call will consume
+            deadline (Deadline, optional): Bounds the time spent queueing
+        """
+        start = time.monotonic()
+        wait = self._reserve(tokens)
+        if deadline is not None and wait >= deadline.remaining():
+            self._reject(tokens, wait)
+        if not self.slots.acquire(self._slot_timeout(wait, deadline)):
+            self._reject(tokens, time.monotonic() - start)
+        try:
+            if wait:
+                time.sleep(max(0.0, start + wait - time.monotonic()))
+            self._record(time.monotonic() - start)
+            yield
+        finally:
+            self.slots.release()
+    
+    @asynccontextmanager
+    async def aslot(self, tokens=0, deadline=None):
+        """
+        Async counterpart of slot().
+        """
+        start = time.monotonic()
+        wait = self._reserve(tokens)
+        if deadline is not None and wait >= deadline.remaining():
+            self._reject(tokens, wait)
+        if not await self.slots.aacquire(self._slot_timeout(wait, deadline)):
+            self._reject(tokens, time.monotonic() - start)
+        try:
+            if wait:
+                await asyncio.sleep(max(0.0, start + wait - time.monotonic()))
+            self._record(time.monotonic() - start)
+            yield
+        finally:
+            self.slots.release()
+    
+    def stats(self):
+        """
+        Return admission counters, queue times and current occupancy.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['mean_queue_seconds'] = stats['queue_seconds'] / stats['admitted'] if stats['admitted'] else 0.0
+        stats['in_flight'] = self.slots.in_use
+        stats['waiting'] = self.slots.waiting
+        stats['max_in_flight'] = self.slots.limit
+        return stats
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_outbound_limiter():
+    """
+    Return the process-wide OutboundLimiter configured from settings.
+    """
+    global _limiter
+    
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = OutboundLimiter(
+                    max_in_flight=getattr(settings, 'AIPROXY_MAX_IN_FLIGHT', 32),
+                    requests_per_minute=getattr(settings, 'AIPROXY_REQUESTS_PER_MINUTE', 0),
+                    tokens_per_minute=getattr(settings, 'AIPROXY_TOKENS_PER_MINUTE', 0),
+                    shared_path=getattr(settings, 'AIPROXY_RATE_LIMIT_PATH', None),
+                )
+    return _limiter
@@ -1,59 +1,257 @@
 import os
-import tempfile
-import requests
 import json
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from .aiproxy_client import apost_chat, post_chat
+from .answer_cache import get_answer_cache, make_cache_key
+from .prompt_builder import PromptBuilder, SYSTEM_PROMPT
+from .resilience import DeadlineExceeded
+from .single_flight import SingleFlight
+from ..utils.upload import Upload
+
+AIPROXY_MODEL = "gpt-4o-mini"
+# Bump whenever prompts or local solvers change so cached answers are not reused
+PROMPT_VERSION = "7"
 
 class RequestHandler:
     """
     Handles incoming requests by processing questions and files.
+    
+    Instances hold no per-request state; use RequestHandler.shared() to
+    reuse one per worker process. Identical concurrent requests are
+    coalesced through the class-level in_flight registry, so they share one
+    extraction and one AI Proxy call whichever instance receives them.
     """
+    _shared = None
+    in_flight = SingleFlight()
+    
+    @classmethod
+    def shared(cls):
+        """
+        Return the process-wide handler instance, creating it on first use.
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+    
     def __init__(self):
-        from .processors.file_processor import FileProcessor
-        self.file_processor = FileProcessor()
+        self._file_processor = None
         # Get AI Proxy token instead of OpenAI API key
         self.aiproxy_token = settings.AIPROXY_TOKEN or os.environ.get("AIPROXY_TOKEN", "")
+        self.answer_cache = get_answer_cache()
+        self.prompt_builder = PromptBuilder()
         
-    def process_request(self, question, file=None):
+    @property
+    def file_processor(self):
+        """
+        FileProcessor, imported on first use so questions without a file
+        never load pandas and the other parsing libraries.
+        """
+        if self._file_processor is None:
+            from .processors.file_processor import FileProcessor
+            self._file_processor = FileProcessor()
+        return self._file_processor
+    
+    def process_request(self, question, file=None, deadline=None):
         """
         Process the request using AI Proxy and specific processors.
         
+        Answers are looked up in the answer cache first; a hit skips file
+        extraction and the AI Proxy call entirely. On a miss, concurrent
+        requests with the same question and file wait for a single shared
+        computation.
+        
+        The upload is ingested once: the same in-memory bytes provide the
+        cache key digest and are parsed by the file processor.
+        
         Args:
             question (str): The question text
             file (InMemoryUploadedFile, optional): Uploaded file
+            deadline (Deadline, optional): Time by which to answer; raises
+                DeadlineExceeded once it has passed
             
         Returns:
             dict: Response with answer key
         """
+        upload = Upload.from_file(file) if file else None
+        try:
+            request_key, cached = self._check_cache(question, upload)
+            if cached is not None:
+                return cached
+            
+            return self.in_flight.do(request_key, self._answer_and_store, request_key, question, upload, deadline)
+        finally:
+            if upload is not None:
+                upload.close()
+    
+    def _answer_and_store(self, request_key, question, file=None, deadline=None):
+        """
+        Compute the answer and populate the cache with it.
+        """
+        result = self._answer(question, file, deadline)
+        self._store_answer(request_key, result)
+        return result
+    
+    def _answer(self, question, file=None, deadline=None):
+        """
+        Compute the answer for a request without consulting the cache.
+        """
         # If there's a file, process it first
-        file_content = None
         if file:
-            # Create a temporary directory to save the file
-            with tempfile.TemporaryDirectory() as temp_dir:
-                file_path = os.path.join(temp_dir, file.name)
-                
-                # Save the uploaded file
-                with open(file_path, 'wb+') as destination:
-                    for chunk in file.chunks():
-                        destination.write(chunk)
-                
-                # Extract file content using file processor
-                file_info = self.file_processor.extract_file_info(file_path)
-                
-                # Try to directly handle simple known question patterns
-                direct_answer = self.get_direct_answer(question, file_info)
-                if direct_answer:
-                    return {"answer": direct_answer}
-                
-                # Now send to AI Proxy with the file content
-                return self.query_aiproxy(question, file_info)
+            file_info, direct_answer = self._process_file(question, file, deadline)
+            if direct_answer:
+                return {"answer": direct_answer}
+            if file_info.get('limit'):
+                return self._limit_error(file_info)
+            
+            # Now send to AI Proxy with the file content
+            return self.query_aiproxy(question, file_info, deadline=deadline)
         
         # If no file, just send the question to AI Proxy
-        return self.query_aiproxy(question)
+        return self.query_aiproxy(question, deadline=deadline)
+    
+    async def aprocess_request(self, question, file=None, deadline=None):
+        """
+        Async counterpart of process_request for the ASGI endpoint.
+        
+        File extraction is disk and CPU bound, so it runs in a worker thread;
+        the AI Proxy round trip is awaited on the shared async client and does
+        not hold a thread while waiting on the network.
+        
+        Args:
+            question (str): The question text
+            file (UploadedFile, optional): Uploaded file
+            deadline (Deadline, optional): Time by which to answer
+            
+        Returns:
+            dict: Response with answer key
+        """
+        upload = await sync_to_async(Upload.from_file, thread_sensitive=False)(file) if file else None
+        handed_off = False
+        
+        def start():
+            # Only the leader starts the shared task, which then owns the
+            # upload: it outlives a cancelled leader under asyncio.shield
+            nonlocal handed_off
+            handed_off = True
+            return self._aanswer_and_store(request_key, question, upload, deadline, owns_file=True)
+        
+        try:
+            request_key, cached = await sync_to_async(self._check_cache, thread_sensitive=False)(question, upload)
+            if cached is not None:
+                return cached
+            
+            return await self.in_flight.ado(request_key, start)
+        finally:
+            if upload is not None and not handed_off:
+                upload.close()
+    
+    async def _aanswer_and_store(self, request_key, question, file=None, deadline=None, owns_file=False):
+        """
+        Async counterpart of _answer_and_store.
+        
+        With owns_file set, the upload is closed here once the answer is
+        stored, rather than by the caller that started this task.
+        """
+        try:
+            result = await self._aanswer(question, file, deadline)
+            await sync_to_async(self._store_answer, thread_sensitive=False)(request_key, result)
+            return result
+        finally:
+            if owns_file and file is not None:
+                file.close()
+    
+    async def _aanswer(self, question, file=None, deadline=None):
+        """
+        Async counterpart of _answer.
+        """
+        if file:
+            file_info, direct_answer = await sync_to_async(
+                self._process_file, thread_sensitive=False
+            )(question, file, deadline)
+            if direct_answer:
+                return {"answer": direct_answer}
+            if file_info.get('limit'):
+                return self._limit_error(file_info)
+            
+            return await self.aquery_aiproxy(question, file_info, deadline=deadline)
+        
+        return await self.aquery_aiproxy(question, deadline=deadline)
+    
+    def _limit_error(self, file_info):
+        """
+        Response for an upload rejected by the archive limits; the file is
+        not worth sending to AI Proxy.
+        """
+        return {"answer": f"Error: {file_info['error']}", "limit": file_info['limit']}
+    
+    def _check_cache(self, question, upload=None):
+        """
+        Compute the content-addressed request key and look it up.
+        
+        The key is also used to coalesce identical in-flight requests, so it
+        is computed even when the answer cache is disabled.
+        
+        Args:
+            question (str): The question text
+            upload (Upload, optional): Ingested upload
+            
+        Returns:
+            tuple: (request_key, cached response or None)
+        """
+        digest = upload.sha256 if upload else None
+        request_key = make_cache_key(question, digest, f"{AIPROXY_MODEL}:{PROMPT_VERSION}")
+        if self.answer_cache is None:
+            return request_key, None
+        return request_key, self.answer_cache.get(request_key)
+    
+    def _store_answer(self, request_key, result):
+        """
+        Cache a response unless it reports an error.
+        """
+        if self.answer_cache is None:
+            return
+        answer = result.get('answer')
+        if answer is None or str(answer).startswith('Error:'):
+            return
+        self.answer_cache.set(request_key, result)
+    
+    def _process_file(self, question, file, deadline=None):
+        """
+        Ingest the upload once and try the local solvers on it.
+        
+        The file is parsed a single time; the same file_info is handed to
+        the registered processors and, if none of them answers, returned for
+        the AI Proxy prompt. The exception is a CSV loaded with only the
+        columns its solvers declared: if they cannot answer, it is parsed
+        again in full for the prompt.
+        
+        Args:
+            question (str): The question text
+            file (Upload or UploadedFile): Uploaded file
+            deadline (Deadline, optional): Checked between stages
+            
+        Returns:
+            tuple: (file_info, direct_answer or None)
+        """
+        if deadline is not None:
+            deadline.check('file upload')
+        with self.file_processor.open_upload(file, question) as file_info:
+            if deadline is not None:
+                deadline.check('file extraction')
+            direct_answer = self.get_direct_answer(question, file_info)
+        
+        if direct_answer is None and file_info.get('projected'):
+            # Only the solvers' columns were loaded; the prompt gets them all
+            with self.file_processor.open_upload(file) as file_info:
+                pass
+        return file_info, direct_answer
     
     def get_direct_answer(self, question, file_info):
         """
-        Try to directly answer common question patterns without calling AI Proxy.
+        Try to directly answer the question with the local solvers, without
+        calling AI Proxy. Add new patterns by registering a processor in
+        processors.registry.
         
         Args:
             question (str): The question text
@@ -62,22 +260,19 @@ class RequestHandler:
         Returns:
             str or None: Direct answer if possible, None otherwise
         """
-        # Common pattern: "What is the value in the 'answer' column of the CSV file?"
-        if ("answer column" in question.lower() or "column" in question.lower() and "answer" in question.lower()) and file_info.get('type') == 'csv':
-            if file_info.get('data') is not None and 'answer' in file_info['data'].columns:
-                return str(file_info['data']['answer'].iloc[0])
-        
-        # Add more direct answer patterns here for common questions
-        
-        return None
+        return self.file_processor.solve(question, file_info)
     
-    def query_aiproxy(self, question, file_info=None):
+    def query_aiproxy(self, question, file_info=None, deadline=None):
         """
         Query AI Proxy with the question and file content.
         
+        Transient failures are retried with backoff within the deadline, and
+        calls fail fast while the circuit breaker is open.
+        
         Args:
             question (str): The question text
             file_info (dict, optional): Information extracted from the file
+            deadline (Deadline, optional): Caps every attempt and retry
             
         Returns:
             dict: Response with answer key
@@ -87,43 +282,84 @@ class RequestHandler:
             if not self.aiproxy_token:
                 return {"answer": "Error: AI Proxy token not configured"}
             
-            # Prepare the prompt
-            if file_info:
-                prompt = f"Question: {question}\n\nFile Content: {file_info['content']}\n\nAnswer the question based on the file content. Provide ONLY the answer, without any explanations or text."
-            else:
-                prompt = f"Question: {question}\n\nAnswer the question directly. Provide ONLY the answer, without any explanations or text."
-            
-            # Prepare the request to AI Proxy
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.aiproxy_token}"
-            }
+            headers, payload = self._build_aiproxy_request(question, file_info)
             
-            payload = {
-                "model": "gpt-4o-mini",
-                "messages": [
-                    {"role": "system", "content": "You are a helpful assistant for the IIT Madras Online Degree in Data Science. Your task is to answer questions accurately. Provide only the exact answer without any explanations or additional text."},
-                    {"role": "user", "content": prompt}
-                ]
-            }
+            # Call AI Proxy API over the shared keep-alive connection pool
+            response = post_chat(headers, payload, deadline=deadline)
             
-            # Call AI Proxy API
-            response = requests.post(
-                "https://aiproxy.sanand.workers.dev/openai/v1/chat/completions",
-                headers=headers,
-                json=payload
-            )
+            return self._parse_aiproxy_response(response.json())
+        
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            return {"answer": f"Error: {str(e)}"}
+    
+    async def aquery_aiproxy(self, question, file_info=None, deadline=None):
+        """
+        Query AI Proxy without blocking the event loop.
+        
+        Args:
+            question (str): The question text
+            file_info (dict, optional): Information extracted from the file
+            deadline (Deadline, optional): Caps every attempt and retry
             
-            # Check if the request was successful
-            response.raise_for_status()
+        Returns:
+            dict: Response with answer key
+        """
+        try:
+            if not self.aiproxy_token:
+                return {"answer": "Error: AI Proxy token not configured"}
             
-            # Parse the response
-            response_data = response.json()
+            headers, payload = self._build_aiproxy_request(question, file_info)
             
-            # Extract the answer from the response
-            answer = response_data['choices'][0]['message']['content'].strip()
+            response = await apost_chat(headers, payload, deadline=deadline)
             
-            return {"answer": answer}
+            return self._parse_aiproxy_response(response.json())
         
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            return {"answer": f"Error: {str(e)}"}
\ No newline at end of file
+            return {"answer": f"Error: {str(e)}"}
+    
+    def _build_aiproxy_request(self, question, file_info=None):
+        """
+        Build the headers and chat completion payload for AI Proxy.
+        
+        Args:
+            question (str): The question text
+            file_info (dict, optional): Information extracted from the file
+            
+        Returns:
+            tuple: (headers, payload)
+        """
+        # Prepare the prompt, summarizing the file to fit the token budget
+        prompt = self.prompt_builder.build(question, file_info)
+        
+        # Prepare the request to AI Proxy
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.aiproxy_token}"
+        }
+        
+        payload = {
+            "model": AIPROXY_MODEL,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ]
+        }
+        
+        return headers, payload
+    
+    def _parse_aiproxy_response(self, response_data):
+        """
+        Extract the answer from an AI Proxy chat completion response.
+        
+        Args:
+            response_data (dict): Decoded JSON response
+            
+        Returns:
+            dict: Response with answer key
+        """
+        answer = response_data['choices'][0]['message']['content'].strip()
+        return {"answer": answer}
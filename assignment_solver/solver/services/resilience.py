@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs past its deadline."""
+
+
+class CircuitOpenError(Exception):
+    """Raised when the upstream circuit breaker is open and calls fail fast."""
+
+
+class Deadline:
+    """
+    Absolute point in time by which a request must be answered.
+    
+    Created once per request in the view and passed down through file
+    processing into the AI Proxy call, so every stage works with the time
+    that is actually left rather than its own fixed timeout.
+    """
+    __slots__ = ('expires_at',)
+    
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+    
+    def remaining(self):
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+    
+    def check(self, stage='request'):
+        """
+        Raise DeadlineExceeded if the deadline has passed.
+        
+        Args:
+            stage (str): Name of the stage, used in the error message
+        """
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline exceeded during {stage}")
+    
+    def timeout(self, limit=None):
+        """
+        Return the time left, capped at limit if one is given.
+        """
+        remaining = self.remaining()
+        return remaining if limit is None else min(limit, remaining)
+
+
+def backoff_delay(attempt, base=0.5, cap=8.0):
+    """
+    Full-jitter exponential backoff delay for a retry attempt.
+    
+    Args:
+        attempt (int): Zero-based retry number
+        base (float): Delay scale in seconds
+        cap (float): Maximum delay in seconds
+    
+    Returns:
+        float: Seconds to wait before the next attempt
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Fails fast while the upstream is degraded.
+    
+    After failure_threshold consecutive failures the circuit opens and calls
+    are rejected without touching the network. Once reset_timeout has passed
+    a single trial call is let through (half-open): success closes the
+    circuit, failure opens it again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+    
+    def allow(self):
+        """
+        Raise CircuitOpenError unless a call may proceed now.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                raise CircuitOpenError("AI Proxy is unavailable (circuit open)")
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+    
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+    
+    def release_trial(self):
+        """
+        End a call that neither succeeded nor failed upstream (e.g. cancelled).
+        
+        A half-open trial is handed back so the next call may try again.
+        """
+        with self._lock:
+            self._trial_in_flight = False
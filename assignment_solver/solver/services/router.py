@@ -0,0 +1,168 @@
+from collections import deque
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of keywords.
+    
+    find() reports every keyword that occurs as a substring of the text in a
+    single pass, so the cost depends on the text length rather than on the
+    number of keywords.
+    """
+    def __init__(self, keywords):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for keyword in keywords:
+            self._add(keyword)
+        self._build_failure_links()
+    
+    def _add(self, keyword):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = self._output[state] + (keyword,)
+    
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def find(self, text):
+        """
+        Return the set of keywords found in text.
+        
+        Args:
+            text (str): Text to scan (already lowercased by the caller)
+        
+        Returns:
+            set: Keywords occurring in text
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class Rule:
+    """
+    A solver registration: every keyword must appear in the question and,
+    if file_types is set, the file type must be one of them.
+    """
+    __slots__ = ('name', 'keywords', 'file_types', 'priority', 'handler', 'order')
+    
+    def __init__(self, name, keywords, file_types=None, priority=0, handler=None):
+        self.name = name
+        self.keywords = frozenset(keyword.lower() for keyword in keywords)
+        self.file_types = frozenset(file_types) if file_types else None
+        self.priority = priority
+        self.handler = handler
+        self.order = 0
+    
+    def __repr__(self):
+        return f"Rule({self.name!r}, priority={self.priority})"
+
+
+class QuestionRouter:
+    """
+    Registry of question rules compiled into a single keyword matcher.
+    
+    Solvers register the keywords that trigger them, the file types they
+    need and a priority. candidates() scans the lowercased question once and
+    returns the matching rules, highest priority first (registration order
+    breaks ties). Rules without keywords match on file type alone.
+    """
+    def __init__(self):
+        self._rules = []
+        self._matcher = None
+        self._rules_by_keyword = {}
+        self._keywordless = []
+    
+    def add_rule(self, rule):
+        """
+        Register a Rule; the matcher is rebuilt on the next lookup.
+        """
+        rule.order = len(self._rules)
+        self._rules.append(rule)
+        self._matcher = None
+        return rule
+    
+    def rule(self, *keywords, file_types=None, priority=0, name=None):
+        """
+        Decorator registering a solver function under the given keywords.
+        
+        Args:
+            *keywords (str): Substrings that must all appear in the question
+            file_types (iterable, optional): Accepted file types; None for any
+            priority (int): Higher priorities are tried first
+            name (str, optional): Rule name, defaults to the function name
+        """
+        def decorator(handler):
+            self.add_rule(Rule(name or handler.__name__, keywords, file_types, priority, handler))
+            return handler
+        return decorator
+    
+    def compile(self):
+        """
+        Build the keyword automaton and the keyword to rule index.
+        """
+        self._rules_by_keyword = {}
+        self._keywordless = [rule for rule in self._rules if not rule.keywords]
+        for rule in self._rules:
+            for keyword in rule.keywords:
+                self._rules_by_keyword.setdefault(keyword, []).append(rule)
+        self._matcher = KeywordMatcher(self._rules_by_keyword)
+    
+    def candidates(self, question, file_type=None):
+        """
+        Return the rules matching a question, highest priority first.
+        
+        Args:
+            question (str): The question text
+            file_type (str, optional): Type of the uploaded file, if any
+        
+        Returns:
+            list: Matching Rule objects
+        """
+        if self._matcher is None:
+            self.compile()
+        
+        found = self._matcher.find(question.lower())
+        seen = set()
+        matched = [
+            rule for rule in self._keywordless
+            if rule.file_types is None or file_type in rule.file_types
+        ]
+        for keyword in found:
+            for rule in self._rules_by_keyword[keyword]:
+                if id(rule) in seen:
+                    continue
+                seen.add(id(rule))
+                if rule.keywords <= found and (rule.file_types is None or file_type in rule.file_types):
+                    matched.append(rule)
+        
+        matched.sort(key=lambda rule: (-rule.priority, rule.order))
+        return matched
+    
+    def __len__(self):
+        return len(self._rules)
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+
+class _Call:
+    """A computation in progress for one key on the sync path."""
+    __slots__ = ('done', 'result', 'error')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+    
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait and receive the same result, or the same
+    exception. Once the call finishes the key is forgotten, so later requests
+    run again (the answer cache handles reuse across time).
+    
+    Sync callers are coordinated with threading primitives; async callers
+    share one task per key on the running event loop.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._tasks = {}
+    
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) once for all concurrent callers with this key.
+        
+        Args:
+            key (str): Coalescing key
+            fn (callable): Function to run if no call is in flight
+        
+        Returns:
+            The result of the shared call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+    
+    async def ado(self, key, coro_fn, *args, **kwargs):
+        """
+        Await coro_fn(*args, **kwargs) once for all concurrent callers with this key.
+        
+        The shared task is shielded, so one caller being cancelled (e.g. a
+        client disconnect) does not cancel the work for the others.
+        
+        Args:
+            key (str): Coalescing key
+            coro_fn (callable): Coroutine function to run if no call is in flight
+        
+        Returns:
+            The result of the shared call
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = loop.create_task(coro_fn(*args, **kwargs))
+            self._tasks[task_key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(task_key, None))
+        return await asyncio.shield(task)
+    
+    def in_flight(self):
+        """Return the number of keys currently being computed."""
+        return len(self._calls) + len(self._tasks)
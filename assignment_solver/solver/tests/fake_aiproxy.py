@@ -0,0 +1,89 @@
+"""
+Local fake of the AI Proxy chat completions endpoint for tests.
+
+Responses are scripted: each queued step gives a status code, an optional
+delay before answering and optional headers. Once the script is used up the
+server answers 200 with a canned completion.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeAIProxy:
+    """
+    Threaded HTTP server that injects latency and errors on demand.
+    
+    Usage:
+        with FakeAIProxy() as proxy:
+            proxy.script(503, 503, 200)
+            ... point settings.AIPROXY_URL at proxy.url ...
+            assert proxy.calls == 3
+    """
+    def __init__(self, answer="42"):
+        self.answer = answer
+        self.calls = 0
+        self._steps = deque()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/openai/v1/chat/completions"
+    
+    def script(self, *steps):
+        """
+        Queue responses. Each step is a status code or a dict with
+        'status', 'delay' (seconds) and 'headers'.
+        """
+        for step in steps:
+            if isinstance(step, int):
+                step = {'status': step}
+            self._steps.append(step)
+    
+    def _next_step(self):
+        with self._lock:
+            self.calls += 1
+            return self._steps.popleft() if self._steps else {'status': 200}
+    
+    def _handler_class(self):
+        proxy = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+            
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                step = proxy._next_step()
+                time.sleep(step.get('delay', 0))
+                status = step.get('status', 200)
+                if status == 200:
+                    body = {"choices": [{"message": {"content": proxy.answer}}]}
+                else:
+                    body = {"error": {"message": f"injected {status}"}}
+                encoded = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    for name, value in step.get('headers', {}).items():
+                        self.send_header(name, value)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(encoded)))
+                    self.end_headers()
+                    self.wfile.write(encoded)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+    
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
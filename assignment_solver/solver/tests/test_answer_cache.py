@@ -0,0 +1,104 @@
+"""
+Unit tests for the tiered answer cache.
+"""
+
+import os
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import django
+django.setup()
+
+from django.test import override_settings
+from solver.services import answer_cache
+from solver.services.answer_cache import (
+    AnswerCache,
+    MemoryTier,
+    SQLiteTier,
+    make_cache_key,
+    normalize_question,
+)
+
+
+def test_key_ignores_whitespace_but_not_content():
+    """
+    Whitespace-only differences share a key; file digest and version do not.
+    """
+    assert normalize_question("  What is\n the   answer? ") == "What is the answer?"
+    base = make_cache_key("What is the answer?", "abc", "v1")
+    assert make_cache_key("What  is the\tanswer?", "abc", "v1") == base
+    assert make_cache_key("What is the answer?", "abd", "v1") != base
+    assert make_cache_key("What is the answer?", "abc", "v2") != base
+    assert make_cache_key("What is the answer?", None, "v1") != base
+
+
+def test_memory_tier_lru_and_ttl():
+    """
+    The memory tier evicts the least recently used entry and expires old ones.
+    """
+    tier = MemoryTier(max_entries=2, ttl=None)
+    tier.set('a', 1)
+    tier.set('b', 2)
+    tier.get('a')
+    tier.set('c', 3)
+    assert tier.get('b') is None
+    assert tier.get('a') == 1 and tier.get('c') == 3
+    
+    tier = MemoryTier(max_entries=2, ttl=0.01)
+    tier.set('a', 1)
+    time.sleep(0.02)
+    assert tier.get('a') is None
+
+
+def test_sqlite_tier_persists_and_evicts_by_size(tmp_path):
+    """
+    The SQLite tier survives a new instance and stays under its byte budget.
+    """
+    path = tmp_path / 'cache.sqlite3'
+    tier = SQLiteTier(path, max_bytes=100)
+    tier.set('a', {"answer": "x" * 30})
+    assert SQLiteTier(path).get('a') == {"answer": "x" * 30}
+    
+    tier.set('b', {"answer": "y" * 30})
+    tier.set('c', {"answer": "z" * 30})
+    assert tier.get('a') is None
+    assert tier.get('c') == {"answer": "z" * 30}
+
+
+def test_answer_cache_counts_hits_per_tier(tmp_path):
+    """
+    Disk hits are promoted to memory and counted separately from memory hits.
+    """
+    disk = SQLiteTier(tmp_path / 'cache.sqlite3')
+    disk.set('k', {"answer": "42"})
+    cache = AnswerCache(MemoryTier(), disk)
+    
+    assert cache.get('missing') is None
+    assert cache.get('k') == {"answer": "42"}
+    assert cache.get('k') == {"answer": "42"}
+    
+    stats = cache.stats()
+    assert stats['misses'] == 1
+    assert stats['disk_hits'] == 1
+    assert stats['memory_hits'] == 1
+    assert stats['hit_rate'] == 2 / 3
+
+
+def test_disk_tier_needs_a_private_directory(tmp_path, monkeypatch):
+    """
+    A cache file in a directory other users can write to is not opened.
+    """
+    shared = tmp_path / 'shared'
+    shared.mkdir()
+    shared.chmod(0o777)
+    private = tmp_path / 'private'
+    
+    monkeypatch.setattr(answer_cache, '_answer_cache', None)
+    with override_settings(ANSWER_CACHE_PATH=str(shared / 'cache.sqlite3')):
+        assert answer_cache.get_answer_cache().disk is None
+    
+    monkeypatch.setattr(answer_cache, '_answer_cache', None)
+    with override_settings(ANSWER_CACHE_PATH=str(private / 'cache.sqlite3')):
+        assert answer_cache.get_answer_cache().disk is not None
+    assert private.stat().st_mode & 0o777 == 0o700
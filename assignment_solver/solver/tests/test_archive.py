@@ -0,0 +1,178 @@
+"""
+Unit tests for lazy, random-access archive members and their resource limits.
+"""
+
+import gzip
+import hashlib
+import io
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pytest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+from solver.services.processors.archive_processor import (
+    CompareFilesProcessor,
+    EncodingsSumProcessor,
+    ReplacementHashProcessor,
+)
+from solver.services.processors.file_processor import FileProcessor, parse_member
+from solver.services.prompt_builder import PromptBuilder
+from solver.utils.archive import ArchiveBudget, ArchiveLimitExceeded, LazyMembers, ZipView
+from solver.utils.upload import Upload
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_walk_visits_nested_directories():
+    """
+    Members in nested folders are listed and walked like os.walk.
+    """
+    data = make_zip({'top.txt': 'x', 'a/one.csv': 'x', 'a/b/two.md': 'x', 'c/three.txt': 'x'})
+    view = ZipView(io.BytesIO(data))
+    
+    assert view.names() == ['top.txt', 'a/one.csv', 'a/b/two.md', 'c/three.txt']
+    assert list(view.walk()) == [
+        ('', ['a', 'c'], ['top.txt']),
+        ('a', ['b'], ['one.csv']),
+        ('a/b', [], ['two.md']),
+        ('c', [], ['three.txt']),
+    ]
+    assert list(view.walk('a/b')) == [('a/b', [], ['two.md'])]
+
+
+def test_only_members_a_solver_touches_are_parsed():
+    """
+    A question about two files in a 500-file archive parses just those two.
+    """
+    members = {f'noise/file{i}.txt': f'line {i}\n' for i in range(498)}
+    members['a.txt'] = 'same\nold\nsame\n'
+    members['b.txt'] = 'same\nnew\nsame\n'
+    with Upload('archive.zip', make_zip(members)) as upload:
+        info = FileProcessor().extract_file_info(upload)
+        lazy = info['extracted_content']
+        
+        assert len(info['extracted_files']) == 500
+        assert lazy.parsed == []
+        assert CompareFilesProcessor().solve("How many lines are different?", info) == "1"
+        assert sorted(lazy.parsed) == ['a.txt', 'b.txt']
+        
+        # The prompt manifest describes every member without parsing them
+        digest = PromptBuilder().digest(info, 2000)
+        assert 'Archive members (500)' in digest
+        assert len(lazy.parsed) < 500
+
+
+def test_prefetch_on_a_pool_keeps_archive_order():
+    """
+    Members parsed concurrently are returned in archive order, each parsed once.
+    """
+    names = [f'dir{i % 3}/file{i:03d}.txt' for i in range(60)]
+    view = ZipView(io.BytesIO(make_zip({name: name for name in names})))
+    calls = []
+    
+    def parse(view, name):
+        calls.append(name)
+        return {'content': view.read(name).decode()}
+    
+    with ThreadPoolExecutor(4) as pool:
+        lazy = LazyMembers(view, parse, executor=pool, min_parallel=1)
+        lazy.prefetch()
+        lazy.prefetch(names[:10])
+    
+    assert sorted(calls) == sorted(names)
+    assert list(lazy) == names
+    assert [lazy[name]['content'] for name in lazy] == names
+
+
+def test_replacement_hash_covers_member_bytes():
+    """
+    The hash is taken over the members' full bytes, line endings included,
+    concatenated in name order like cat *; archives with nothing to replace
+    or sum are declined.
+    """
+    first = ('IITM and iitm\r\n' * 2000).encode()
+    second = 'iitM\n'.encode('utf-16')
+    with Upload('files.zip', make_zip({'b.txt': second, 'a.txt': first})) as upload:
+        info = FileProcessor().extract_file_info(upload)
+        expected = hashlib.sha256(
+            first.replace(b'IITM', b'IIT Madras').replace(b'iitm', b'IIT Madras') + second
+        ).hexdigest()
+        assert ReplacementHashProcessor().solve("replace IITM, sha256sum", info) == expected
+    
+    with Upload('files.zip', make_zip({'a.txt': 'nothing here\n', 'data.csv': 'symbol,value\nx,1\n'})) as upload:
+        info = FileProcessor().extract_file_info(upload)
+        assert ReplacementHashProcessor().solve("replace IITM, sha256sum", info) is None
+        assert EncodingsSumProcessor().solve("different encodings, sum", info) is None
+
+
+def test_compression_bomb_is_rejected_before_inflating():
+    """
+    A member with an absurd compression ratio fails at the central directory.
+    """
+    data = make_zip({'zeros.bin': b'\0' * (20 * 1024 * 1024)})
+    with Upload('bomb.zip', data) as upload:
+        info = FileProcessor().extract_file_info(upload)
+    
+    assert info['limit']['limit'] == 'ratio'
+    assert info['limit']['member'] == 'zeros.bin'
+    assert 'extracted_content' not in info
+
+
+def test_member_count_and_depth_budgets_span_nested_archives():
+    """
+    Nested archives share the member budget and may only go so deep.
+    """
+    inner = make_zip({'leaf.txt': 'x'})
+    middle = make_zip({'inner.zip': inner, 'm.txt': 'y'})
+    outer = make_zip({'middle.zip': middle})
+    
+    with Upload('outer.zip', outer) as upload:
+        info = FileProcessor().extract_file_info(upload, ArchiveBudget(max_depth=1))
+        nested = info['extracted_content']['middle.zip']['extracted_content']
+        assert nested['m.txt']['content'] == 'y'
+        assert nested['inner.zip']['limit']['limit'] == 'depth'
+    
+    with Upload('outer.zip', outer) as upload:
+        info = FileProcessor().extract_file_info(upload, ArchiveBudget(max_members=2))
+        assert info['extracted_content']['middle.zip']['limit']['limit'] == 'members'
+
+
+def test_inflated_bytes_are_charged_while_streaming():
+    """
+    Reads stop mid-stream once the byte budget is spent.
+    """
+    budget = ArchiveBudget()
+    view = ZipView(io.BytesIO(make_zip({'a.txt': 'a' * 3000, 'b.txt': 'b' * 3000})), budget)
+    budget.max_bytes = 4000
+    
+    assert view.read('a.txt') == b'a' * 3000
+    with pytest.raises(ArchiveLimitExceeded) as excinfo:
+        view.read('b.txt')
+    assert excinfo.value.as_dict() == {'limit': 'bytes', 'value': 6000, 'maximum': 4000, 'member': 'b.txt'}
+
+
+def test_process_pool_charges_compressed_members_to_the_archive_budget():
+    """
+    Gzip members parsed for a process pool still share one byte budget.
+    """
+    bomb = gzip.compress(b'\0' * (2 * 1024 * 1024))
+    names = [f'part{i}.gz' for i in range(8)]
+    budget = ArchiveBudget(max_bytes=8 * 1024 * 1024, max_ratio=10 ** 6)
+    view = ZipView(io.BytesIO(make_zip({name: bomb for name in names})), budget)
+    
+    with ProcessPoolExecutor(2) as pool:
+        lazy = LazyMembers(view, FileProcessor()._extract_member, executor=pool, remote_parse=parse_member, min_parallel=1)
+        lazy.prefetch()
+    
+    limited = [name for name in names if lazy[name].get('limit')]
+    assert limited and limited[0] != names[0]
+    assert all(lazy[name]['limit']['limit'] == 'bytes' for name in limited)
+    assert len(names) - len(limited) <= 4
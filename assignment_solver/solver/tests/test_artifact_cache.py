@@ -0,0 +1,184 @@
+"""
+Unit tests for the on-disk cache of parsed uploads.
+"""
+
+import mmap
+import os
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import django
+django.setup()
+
+import numpy as np
+import pandas as pd
+from django.test import override_settings
+from solver.services import artifact_cache
+from solver.services.artifact_cache import ArtifactCache, artifact_key, cached_parse
+from solver.services.processors import file_processor
+from solver.services.processors.file_processor import FileProcessor
+from solver.utils.upload import Upload
+
+
+def is_mapped(array):
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def make_frame():
+    return pd.DataFrame({
+        'id': np.arange(4, dtype=np.int32),
+        'price': [1.5, 2.0, None, 4.25],
+        'paid': [True, False, True, True],
+        'when': pd.to_datetime(['2024-01-01', '2024-01-02', None, '2024-01-04']),
+        'city': pd.Categorical(['Pune', 'Delhi', 'Pune', 'Goa']),
+        'note': pd.Series(['a', None, 'c', 'd'], dtype='str'),
+    })
+
+
+def test_key_depends_on_digest_params_and_parser_version(monkeypatch):
+    """
+    Different bytes, options or parser versions never share an artifact.
+    """
+    base = artifact_key('abc', 'csv', columns=['a'])
+    assert artifact_key('abc', 'csv', columns=['a']) == base
+    assert artifact_key('abd', 'csv', columns=['a']) != base
+    assert artifact_key('abc', 'csv', columns=None) != base
+    assert artifact_key('abc', 'json') != artifact_key('abc', 'csv')
+    
+    monkeypatch.setitem(artifact_cache.PARSER_VERSIONS, 'csv', 99)
+    assert artifact_key('abc', 'csv', columns=['a']) != base
+
+
+def test_frames_round_trip_memory_mapped(tmp_path):
+    """
+    Frames come back equal, with numeric columns mapped from disk.
+    """
+    cache = ArtifactCache(tmp_path)
+    df = make_frame()
+    assert cache.put_frame('k', df, {'header': list(df.columns)})
+    
+    loaded, extra = cache.get_frame('k')
+    pd.testing.assert_frame_equal(loaded, df)
+    assert extra == {'header': list(df.columns)}
+    assert is_mapped(loaded['id'].to_numpy())
+    assert is_mapped(loaded['city'].array.codes)
+    
+    # Mapped pages are private: writes never reach the cached file
+    loaded.loc[0, 'id'] = 7
+    assert cache.get_frame('k')[0].loc[0, 'id'] == 0
+
+
+def test_cache_directory_must_be_private(tmp_path):
+    """
+    A directory other users can write to disables the cache instead of being trusted.
+    """
+    shared = tmp_path / 'shared'
+    shared.mkdir()
+    shared.chmod(0o777)
+    private = tmp_path / 'private'
+    
+    with override_settings(ARTIFACT_CACHE_DIR=str(shared)):
+        assert artifact_cache.get_artifact_cache() is None
+    with override_settings(ARTIFACT_CACHE_DIR=str(private)):
+        assert artifact_cache.get_artifact_cache() is not None
+    assert private.stat().st_mode & 0o777 == 0o700
+
+
+def test_object_columns_round_trip_as_json(tmp_path):
+    """
+    Mixed object columns and nullable extension columns come back as stored;
+    values JSON cannot hold are simply not cached.
+    """
+    cache = ArtifactCache(tmp_path)
+    df = pd.DataFrame({
+        'mixed': pd.Series(['a', 1, None, 2.5], dtype=object),
+        'count': pd.array([1, None, 3, 4], dtype='Int64'),
+    })
+    assert cache.put_frame('k', df)
+    pd.testing.assert_frame_equal(cache.get_frame('k')[0], df)
+    
+    df['mixed'] = pd.Series([pd.Timestamp('2024-01-01')] * 4, dtype=object)
+    assert not cache.put_frame('t', df)
+    assert cache.get_frame('t') is None
+
+
+def test_values_and_misses(tmp_path):
+    """
+    Values round-trip; unknown keys and kind mismatches are misses.
+    """
+    cache = ArtifactCache(tmp_path)
+    data = {"items": [{"id": 1, "tags": ["x"]}], "total": 1}
+    cache.put_value('v', data, {'encoding': 'utf-8'})
+    
+    assert cache.get_value('v') == (data, {'encoding': 'utf-8'})
+    assert cache.get_value('missing') is None
+    assert cache.get_frame('v') is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """
+    Past the quota the entry read longest ago goes first.
+    """
+    probe = ArtifactCache(tmp_path / 'probe')
+    probe.put_value('x', 'x' * 1000)
+    entry = sum(f.stat().st_size for f in (tmp_path / 'probe' / 'x').iterdir())
+    
+    cache = ArtifactCache(tmp_path / 'cache', max_bytes=entry * 2)
+    cache.put_value('a', 'x' * 1000)
+    cache.put_value('b', 'x' * 1000)
+    old = time.time() - 60
+    os.utime(tmp_path / 'cache' / 'a', (old, old))
+    os.utime(tmp_path / 'cache' / 'b', (old, old))
+    cache.get_value('a')
+    cache.put_value('c', 'x' * 1000)
+    
+    assert cache.get_value('b') is None
+    assert cache.get_value('a') is not None
+    assert cache.get_value('c') is not None
+
+
+def test_cached_parse_skips_small_uploads(tmp_path):
+    """
+    Below the size threshold the parser always runs and nothing is stored.
+    """
+    calls = []
+    
+    def parse():
+        calls.append(1)
+        return {"a": 1}, {}
+    
+    with override_settings(ARTIFACT_CACHE_DIR=str(tmp_path), ARTIFACT_CACHE_MIN_BYTES=100):
+        cached_parse('abc', 10, 'json', parse)
+        cached_parse('abc', 10, 'json', parse)
+        assert len(calls) == 2
+        cached_parse('abc', 100, 'json', parse)
+        assert cached_parse('abc', 100, 'json', parse) == ({"a": 1}, {})
+        assert len(calls) == 3
+
+
+def test_repeated_csv_upload_is_not_reparsed(tmp_path, monkeypatch):
+    """
+    A second upload of the same CSV is served from the cache, header,
+    encoding and projection included.
+    """
+    calls = []
+    load_csv = file_processor.load_csv
+    monkeypatch.setattr(file_processor, 'load_csv', lambda *args, **kwargs: calls.append(1) or load_csv(*args, **kwargs))
+    data = "answer,city,n\n" + "".join(f"{i},Pune,{i}\n" for i in range(50))
+    
+    with override_settings(ARTIFACT_CACHE_DIR=str(tmp_path), ARTIFACT_CACHE_MIN_BYTES=0):
+        first = FileProcessor().extract_file_info(Upload('data.csv', data.encode()), columns=['answer'])
+        second = FileProcessor().extract_file_info(Upload('data.csv', data.encode()), columns=['answer'])
+        full = FileProcessor().extract_file_info(Upload('data.csv', data.encode()))
+    
+    assert len(calls) == 2
+    pd.testing.assert_frame_equal(second['data'], first['data'])
+    assert second['columns'] == ['answer', 'city', 'n']
+    assert second['projected'] == ['answer']
+    assert second['encoding'] == first['encoding']
+    assert list(full['data'].columns) == ['answer', 'city', 'n']
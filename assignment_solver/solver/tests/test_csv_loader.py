@@ -0,0 +1,138 @@
+"""
+Unit tests for compact, column-projected CSV loading.
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+from solver.services.processors.file_processor import FileProcessor
+from solver.services.processors.registry import processors
+from solver.services.request_handler import RequestHandler
+from solver.utils import csv_loader
+from solver.utils.csv_loader import load_csv, optimize, read_parallel, record_ends, split_ranges
+from solver.utils.upload import Upload
+
+
+def make_csv(rows=1000):
+    lines = ['id,answer,city,score,note']
+    for i in range(rows):
+        lines.append(f"{i},{i * 7},{['Chennai', 'Delhi', 'Pune'][i % 3]},{i / 4},note {i}")
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def test_optimize_downcasts_and_categorizes():
+    """
+    Ints shrink, floats keep full precision, repetitive strings become
+    categoricals and unique strings stay objects.
+    """
+    df = optimize(pd.DataFrame({
+        'small': [1, 2, 3, 4],
+        'ratio': [0.1, 0.2, 0.3, 0.4],
+        'city': ['a', 'b', 'a', 'b'],
+        'name': ['w', 'x', 'y', 'z'],
+    }))
+    assert df['small'].dtype == 'int8'
+    assert df['ratio'].dtype == 'float64'
+    assert isinstance(df['city'].dtype, pd.CategoricalDtype)
+    assert not isinstance(df['name'].dtype, pd.CategoricalDtype)
+
+
+def test_projection_reads_only_requested_columns():
+    """
+    Only the requested columns are parsed; the full header is still
+    reported, and unknown names do not project at all.
+    """
+    data = make_csv()
+    df, header = load_csv(data.decode(), raw=data, columns=['answer', 'missing'])
+    assert list(df.columns) == ['answer']
+    assert header == ['id', 'answer', 'city', 'score', 'note']
+    
+    df, _ = load_csv(data.decode(), raw=data, columns=['missing'])
+    assert list(df.columns) == header
+
+
+def test_chunked_load_matches_single_pass():
+    """
+    Chunked parsing gives the same values as one read, with categoricals
+    unioned across chunks.
+    """
+    data = make_csv()
+    whole, _ = load_csv(data.decode(), raw=data)
+    chunked, _ = load_csv(data.decode(), raw=data, chunk_bytes=0, chunk_rows=64)
+    
+    assert isinstance(chunked['city'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(
+        chunked.astype({'city': object}), whole.astype({'city': object}), check_dtype=False
+    )
+    assert chunked['answer'].sum() == sum(i * 7 for i in range(1000))
+
+
+def test_solvers_get_their_columns_and_the_llm_gets_all():
+    """
+    The answer-column solver loads one column; when no solver can answer,
+    the prompt sees every column.
+    """
+    question = "What is the value in the 'answer' column?"
+    assert processors.columns_for(question, 'csv') == {'answer'}
+    assert processors.columns_for("Summarize this file", 'csv') is None
+    
+    with Upload('data.csv', make_csv()) as upload:
+        with FileProcessor().open_upload(upload, question) as file_info:
+            assert file_info['projected'] == ['answer']
+            assert FileProcessor().solve(question, file_info) == '0'
+    
+    handler = RequestHandler()
+    handler.answer_cache = None
+    prompts = []
+    handler.get_direct_answer = lambda question, file_info: None
+    handler.query_aiproxy = lambda question, file_info=None, deadline=None: prompts.append(file_info) or {"answer": "llm"}
+    
+    handler.process_request(question, SimpleUploadedFile('data.csv', make_csv()))
+    assert list(prompts[0]['data'].columns) == ['id', 'answer', 'city', 'score', 'note']
+    assert 'projected' not in prompts[0]
+
+
+def test_ranges_never_split_a_quoted_newline(monkeypatch):
+    """
+    Range boundaries land only on record ends, even inside quoted fields
+    spanning scan blocks.
+    """
+    monkeypatch.setattr(csv_loader, 'SCAN_BYTES', 5)
+    data = b'a,b\n1,"x\ny"\n2,"""q""\n\nz"\n3,plain\n'
+    assert record_ends(data, [0, 5, 13, 14]) == [4, 12, 25, 25]
+    
+    header_end, ranges = split_ranges(data, 3)
+    assert header_end == 4
+    assert ranges[0][0] == 4 and ranges[-1][1] == len(data)
+    assert all(end in (12, 25, 33) for _, end in ranges)
+
+
+def test_parallel_reader_matches_serial(tmp_path):
+    """
+    Parsing byte ranges on a process pool gives the same frame as one
+    serial read, including quoted newlines and a column that only turns
+    out to be text in a later range.
+    """
+    rng = random.Random(3)
+    lines = ['id,code,text,value']
+    for i in range(5000):
+        code = str(i) if i < 4000 else f"C{i}"
+        text = rng.choice(['plain', '"two\nlines"', '"has ""quotes"", and commas"', ''])
+        lines.append(f"{i},{code},{text},{rng.random():.6f}")
+    path = tmp_path / 'big.csv'
+    path.write_bytes(('\n'.join(lines) + '\n').encode())
+    
+    serial = pd.read_csv(path)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        for workers in (1, 3, 8):
+            parallel = read_parallel(str(path), executor, workers)
+            pd.testing.assert_frame_equal(
+                parallel.astype({'code': object, 'text': object}),
+                serial.astype({'code': object, 'text': object}),
+                check_dtype=False,
+            )
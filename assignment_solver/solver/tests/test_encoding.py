@@ -0,0 +1,68 @@
+"""
+Unit tests for single-read encoding detection.
+"""
+
+import codecs
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+from solver.services.processors.archive_processor import EncodingsSumProcessor
+from solver.services.processors.file_processor import FileProcessor
+from solver.utils import encoding
+from solver.utils.encoding import decode_bytes
+from solver.utils.upload import Upload
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'test_data', 'encoding_files')
+
+
+def test_bom_and_utf8_fast_paths_skip_detection(monkeypatch):
+    """
+    BOMs and valid UTF-8 never reach the statistical detector.
+    """
+    def refuse(sample):
+        raise AssertionError("the detector should not run")
+    monkeypatch.setattr(encoding, 'guess_encoding', refuse)
+    
+    assert decode_bytes(codecs.BOM_UTF8 + 'naïve'.encode()) == ('naïve', 'utf-8-sig', 'bom')
+    assert decode_bytes('naïve — ok'.encode('utf-16')).text == 'naïve — ok'
+    assert decode_bytes('naïve — ok'.encode('utf-32')).encoding == 'utf-32'
+    assert decode_bytes('naïve — ok'.encode()) == ('naïve — ok', 'utf-8', 'utf-8')
+
+
+def test_ambiguous_western_text_prefers_cp1252():
+    """
+    Short cp1252 files like data1.csv are not mistaken for cp1250 or cp850,
+    while clearly Cyrillic or Central European text keeps its code page.
+    """
+    with open(os.path.join(DATA_DIR, 'data1.csv'), 'rb') as f:
+        decoded = decode_bytes(f.read())
+    assert decoded.encoding == 'cp1252'
+    assert '›' in decoded.text and 'œ' in decoded.text
+    
+    assert decode_bytes('Größe, Straße, café — “quoted”'.encode('cp1252')).encoding == 'cp1252'
+    assert decode_bytes('Привет, как дела? Это тест кодировки.'.encode('cp1251')).encoding == 'cp1251'
+
+
+def test_upload_is_decoded_once_and_shared(monkeypatch):
+    """
+    Every consumer of an upload gets the same decoded text.
+    """
+    calls = []
+    monkeypatch.setattr('solver.utils.upload.decode_bytes', lambda data: calls.append(1) or decode_bytes(data))
+    with open(os.path.join(DATA_DIR, 'data3.txt'), 'rb') as f:
+        upload = Upload('data3.txt', f.read())
+    with upload:
+        file_info = FileProcessor().extract_file_info(upload)
+        assert upload.decode() is upload.decode()
+    assert len(calls) == 1
+    assert file_info['encoding'] == 'utf-16'
+    assert file_info['data'].startswith('symbol\tvalue')
+
+
+def test_encodings_sum_over_mixed_encodings():
+    """
+    The Q12 archive sums to the same total whatever each file's encoding.
+    """
+    info = FileProcessor().extract_file_info(os.path.join(DATA_DIR, 'encoding_files.zip'))
+    assert EncodingsSumProcessor().solve("sum of values", info) == '3000'
@@ -0,0 +1,69 @@
+"""
+Unit tests for the lazy, dict-compatible FileInfo.
+"""
+
+import json
+import os
+import pickle
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import pandas as pd
+from solver.services.processors.file_processor import FileProcessor
+from solver.utils.file_info import FileInfo, frame_preview, json_preview
+from solver.utils.upload import Upload
+
+
+def test_dict_compatible_access():
+    """
+    FileInfo reads and writes like the dicts solvers were written against.
+    """
+    info = FileInfo(name='a.txt', type='text', data='hello', encoding='utf-8')
+    assert info['name'] == 'a.txt' and info.get('encoding') == 'utf-8'
+    assert info.get('missing') is None and 'missing' not in info
+    assert info['content'] is None and 'content' in info
+    
+    info['access_log'] = 1
+    assert info.setdefault('frames', {}) == {} and 'frames' in info
+    info['data'] = 'bye'
+    assert info.data == 'bye'
+    del info['access_log']
+    assert 'access_log' not in info
+    assert set(info) >= {'path', 'name', 'type', 'size', 'data', 'content', 'encoding', 'frames'}
+    assert 'bye' not in repr(info)
+
+
+def test_previews_render_on_first_read_only():
+    """
+    Text previews are not built until asked for, then kept.
+    """
+    text = 'x' * 50000
+    with Upload('big.txt', text.encode()) as upload:
+        info = FileProcessor().extract_file_info(upload)
+    
+    assert info.data == text
+    assert not info.is_rendered('content')
+    content = info['content']
+    assert content == text[:10000]
+    assert info.is_rendered('content') and info['content'] is content
+
+
+def test_json_preview_stops_encoding_at_the_limit():
+    """
+    Large JSON previews match the eager rendering without encoding it all.
+    """
+    data = {'rows': [{'id': i, 'name': f"row {i}"} for i in range(10000)]}
+    assert json_preview(data) == json.dumps(data, indent=2)[:2000]
+
+
+def test_lazy_values_survive_pickling():
+    """
+    Member infos parsed in worker processes are pickled with their pending
+    previews.
+    """
+    info = FileInfo(name='a.csv', type='csv', data=pd.DataFrame({'a': range(30)}))
+    info.lazy('content', frame_preview, info.data)
+    
+    copy = pickle.loads(pickle.dumps(info))
+    assert not copy.is_rendered('content')
+    assert copy['content'] == info.data.head(20).to_string()
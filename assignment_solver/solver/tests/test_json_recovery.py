@@ -0,0 +1,140 @@
+"""
+Unit tests for salvaging records from truncated or malformed JSON.
+"""
+
+import json
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import django
+django.setup()
+
+import pytest
+from django.test import override_settings
+from solver.services.processors.file_processor import FileProcessor
+from solver.services.processors.registry import processors
+from solver.services.prompt_builder import PromptBuilder
+from solver.utils.json_recovery import RecoverySummary, recover_records, tally
+from solver.utils.upload import Upload
+
+DAMAGED = '\n'.join([
+    '{"city": "A", "sales": 10, "id": 1}',
+    '{"city": "B", "sales": 20, "id',
+    '{"city": "C", "sales": 30.5, "id": 3}',
+    '{"city": "D", "sales": 40, "id": 4',
+    '{"city": "E", "sales": 50, "meta": {"tags": [1, 2',
+    '{"city": "F", "sales": 60, "id": 6}',
+    '{"city": "G", "sal',
+])
+
+QUESTION = "Sum the sales values across all rows. What is the total sales value?"
+
+
+def recover(text, size=None):
+    chunks = [text[i:i + size] for i in range(0, len(text), size)] if size else [text]
+    return list(recover_records(chunks))
+
+
+@pytest.mark.parametrize('size', [1, 4, 9, None])
+def test_complete_fields_are_salvaged_at_any_chunk_size(size):
+    """
+    Damaged records keep every field completed before the break, and the
+    next line's record is read intact.
+    """
+    pairs = recover(DAMAGED, size)
+    assert [record for record, _ in pairs] == [
+        {"city": "A", "sales": 10, "id": 1},
+        {"city": "B", "sales": 20},
+        {"city": "C", "sales": 30.5, "id": 3},
+        {"city": "D", "sales": 40, "id": 4},
+        {"city": "E", "sales": 50},
+        {"city": "F", "sales": 60, "id": 6},
+        {"city": "G"},
+    ]
+    damaged = [(damage.record, damage.line, damage.reason) for _, damage in pairs if damage]
+    assert damaged == [
+        (1, 2, "Unterminated string"),
+        (3, 4, "Unexpected '{'"),
+        (4, 5, "Unexpected '{'"),
+        (6, 7, "Unterminated string"),
+    ]
+
+
+def test_truncated_array_keeps_earlier_records():
+    """
+    A pretty-printed array cut mid-record yields the records before it
+    and the fields of the cut one.
+    """
+    text = json.dumps([{"sales": i, "id": i} for i in range(3)], indent=2)
+    cut = text[:text.rindex('"id"') + 2]
+    pairs = recover(cut)
+    assert [record for record, _ in pairs] == [{"sales": 0, "id": 0}, {"sales": 1, "id": 1}, {"sales": 2}]
+    assert pairs[-1][1].reason == "Unterminated string"
+    assert all(damage is None for _, damage in recover(text))
+
+
+@pytest.mark.parametrize('size', [1, 3, None])
+def test_number_at_end_of_stream_is_dropped(size):
+    """
+    A number the file ends in may have been cut short, so it is not kept;
+    one followed by a delimiter is.
+    """
+    pairs = recover('{"sales": 9, "id": 35}\n{"sales": 9, "id": 3', size)
+    assert [record for record, _ in pairs] == [{"sales": 9, "id": 35}, {"sales": 9}]
+    assert pairs[-1][1].reason == "Truncated record"
+    assert recover('{"sales": 9, "id": 3\n', size)[0][0] == {"sales": 9, "id": 3}
+
+
+def test_summary_totals_in_one_pass():
+    """
+    Numeric fields are totalled and damaged records listed as they stream by.
+    """
+    summary = RecoverySummary(max_damaged=2)
+    records = list(tally(recover_records([DAMAGED]), summary))
+    assert len(records) == summary.records == 7
+    assert summary.totals == {'sales': 210.5, 'id': 14}
+    assert summary.counts == {'sales': 6, 'id': 4}
+    assert summary.damaged_count == 4
+    assert summary.damaged[0]['kept'] == ['city', 'sales']
+    assert len(summary.damaged) == 2
+
+
+def test_loaded_file_is_salvaged_instead_of_failing():
+    """
+    A malformed upload yields its salvaged records, not just an error,
+    and the prompt reports the damage and the totals.
+    """
+    info = FileProcessor().extract_file_info(Upload('truncated_sales.json', DAMAGED.encode()))
+    
+    assert 'error' not in info
+    assert info['json_format'] == 'recovered'
+    assert info['recovery']['damaged_count'] == 4
+    assert processors.solve(QUESTION, info) == '210.5'
+    digest = PromptBuilder().digest(info, 500)
+    assert "7 records salvaged, 4 damaged" in digest
+    assert "'sales': 210.5" in digest
+
+
+def test_streamed_file_falls_back_to_salvage(tmp_path):
+    """
+    Large malformed files are salvaged by the same single streaming pass
+    that answers the question.
+    """
+    path = tmp_path / 'truncated_sales.json'
+    path.write_text(DAMAGED)
+    with override_settings(JSON_STREAM_BYTES=0):
+        with Upload.from_path(str(path)) as upload:
+            info = FileProcessor().extract_file_info(upload)
+    
+    assert info['content'].startswith('{\n  "city": "A"')
+    assert processors.solve(QUESTION, info) == '210.5'
+    assert info['recovery']['damaged_count'] == 4
+
+
+def test_unrecoverable_file_still_reports_the_error():
+    """
+    Text with no records to salvage keeps the original parse error.
+    """
+    info = FileProcessor().extract_file_info(Upload('broken.json', b'[1, 2,'))
+    assert 'Expecting value' in info['error']
@@ -0,0 +1,141 @@
+"""
+Unit tests for the streaming JSON tokenizer and structural queries.
+"""
+
+import json
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import django
+django.setup()
+
+import pytest
+from django.test import override_settings
+from solver.services.processors.file_processor import FileProcessor
+from solver.services.processors.registry import processors
+from solver.utils.json_stream import (
+    JSONSource,
+    JSONStreamError,
+    count_keys,
+    events,
+    list_paths,
+    object_events,
+    preview,
+    sum_field,
+)
+from solver.utils.upload import Upload
+
+DOCUMENT = (
+    '{"a": [1, 2.5, {"b": "x\\"y", "c": []}, {}], "d": null, "e": true,'
+    ' "f": -1e3, "g": "\\u00e9", "h": [[], [{"a": "a"}]]}'
+)
+
+LOGS = {
+    "logs": [
+        {"event": {"DX": 1, "type": "DX"}, "sales": 10},
+        {"event": {"nested": {"DX": {"DX": "DX"}}}, "sales": 2.5},
+        {"event": None, "sales": "n/a"},
+    ],
+}
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def snapshot(stream):
+    return [(list(path), event, value) for path, event, value in stream]
+
+
+@pytest.mark.parametrize('size', [1, 2, 5, 17, 10000])
+def test_events_match_the_parsed_document_at_any_chunk_size(size):
+    """
+    Tokens cut at chunk boundaries give the same events and paths as
+    walking the json.loads result.
+    """
+    expected = snapshot(object_events(json.loads(DOCUMENT)))
+    assert snapshot(events(chunked(DOCUMENT, size))) == expected
+
+
+def test_ndjson_and_duplicate_keys():
+    """
+    Back-to-back documents are all read; repeated keys are all reported.
+    """
+    stream = events(['{"k": 1, "k": 2}\n{"k": {"k": "k"}}\n', '[3]'])
+    assert count_keys(stream, 'k') == 4
+    assert sum_field(events(['{"s": 1}\n{"s": 2}\n{"s": 0.5}']), 's') == (3.5, 3)
+
+
+@pytest.mark.parametrize('text, position', [
+    ('{"a" 1}', 5),
+    ('[1,]', 3),
+    ('[1 2]', 3),
+    ('{"a": 1}}', 8),
+    ('[tru]', 1),
+    ('{"a": [1, 2', 11),
+])
+def test_malformed_input_reports_its_position(text, position):
+    """
+    Syntax errors and truncation raise with the offset of the problem.
+    """
+    with pytest.raises(JSONStreamError) as error:
+        list(events(chunked(text, 3)))
+    assert error.value.position == position
+
+
+def test_queries():
+    """
+    Keys are counted only as keys, sums only take numbers, paths collapse
+    array indices.
+    """
+    text = json.dumps(LOGS)
+    assert count_keys(events([text]), 'DX') == 3
+    assert sum_field(events([text]), 'sales') == (12.5, 2)
+    assert list(list_paths(events([text]))) == [
+        '.', '.logs', '.logs[]', '.logs[].event', '.logs[].event.DX', '.logs[].event.type',
+        '.logs[].sales', '.logs[].event.nested', '.logs[].event.nested.DX', '.logs[].event.nested.DX.DX',
+    ]
+    assert len(list_paths(events([text]), limit=3)) == 3
+
+
+@pytest.mark.parametrize('limit', [1, 40, 100000])
+def test_preview_matches_indented_dump(limit):
+    """
+    The streamed preview is the json.dumps(indent=2) text, cut at limit.
+    """
+    expected = json.dumps(json.loads(DOCUMENT), indent=2)[:limit]
+    assert preview(events([DOCUMENT]), limit) == expected
+
+
+def test_large_json_is_streamed_not_loaded(tmp_path):
+    """
+    Above JSON_STREAM_BYTES the file is left on disk; the preview and
+    queries stream it, also after the upload is closed.
+    """
+    path = tmp_path / 'nested_logs.json'
+    path.write_text(json.dumps(LOGS))
+    question = "How many times does DX appear as a key?"
+    
+    with override_settings(JSON_STREAM_BYTES=0):
+        with Upload.from_path(str(path)) as upload:
+            info = FileProcessor().extract_file_info(upload)
+    
+    assert info['data'] is None
+    assert isinstance(info['json_source'], JSONSource)
+    assert info['content'] == json.dumps(LOGS, indent=2)[:2000]
+    assert processors.solve(question, info) == '3'
+
+
+def test_small_json_and_ndjson_use_the_parsed_data():
+    """
+    Loaded documents answer the same queries; NDJSON loads as a list.
+    """
+    lines = '\n'.join(json.dumps(record) for record in LOGS['logs'])
+    info = FileProcessor().extract_file_info(Upload('logs.jsonl', lines.encode()))
+    
+    assert info['json_format'] == 'ndjson'
+    assert len(info['data']) == 3
+    assert processors.solve("How many times does DX appear as a key?", info) == '3'
+    assert processors.solve("Sum the sales values across all rows.", info) == '12.5'
+    assert processors.solve("What is the capital of France?", info) is None
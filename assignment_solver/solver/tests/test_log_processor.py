@@ -0,0 +1,217 @@
+"""
+Unit tests for the Apache access log engine.
+"""
+
+import gzip
+import io
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import django
+django.setup()
+
+import errno
+import pytest
+from django.test import override_settings
+from solver.services.processors import file_processor
+from solver.services.processors.file_processor import FileProcessor
+from solver.services.processors.log_processor import ApacheLogProcessor, LogQuery
+from solver.utils.access_log import looks_like_access_log, read_access_log
+from solver.utils.gzip_index import open_or_build
+from solver.utils.upload import Upload
+
+IST = timezone(timedelta(hours=5, minutes=30))
+PATHS = ['/telugu/index.html', '/telugu/songs/a.mp3', '/kannada/b.mp3', '/kannada/', '/hindi/c.mp3', '/teluguish/x']
+
+
+def make_log(n=2000, seed=7, ordered=False):
+    """
+    Synthetic combined log plus the parsed records, for computing
+    expectations; ordered logs advance in time like a real server's.
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 4, 28, tzinfo=IST)
+    lines, records = [], []
+    for i in range(n):
+        if ordered:
+            when = start + timedelta(seconds=i * 14 * 24 * 3600 // n)
+        else:
+            when = start + timedelta(seconds=rng.randrange(14 * 24 * 3600))
+        record = {
+            'ip': f"10.0.0.{rng.randrange(12)}",
+            'when': when,
+            'method': rng.choice(['GET', 'GET', 'GET', 'POST']),
+            'path': rng.choice(PATHS),
+            'status': rng.choice([200, 200, 206, 304, 404, 500]),
+            'size': rng.randrange(0, 50000),
+        }
+        size = '-' if record['size'] == 0 else record['size']
+        agent = rng.choice(['Mozilla/5.0 (X11; Linux)', 'curl/8.0', 'say \\"hi\\"'])
+        lines.append(
+            f"{record['ip']} - - [{when.strftime('%d/%b/%Y:%H:%M:%S %z')}] "
+            f"\"{record['method']} {record['path']} HTTP/1.1\" {record['status']} {size} \"-\" \"{agent}\""
+        )
+        records.append(record)
+    lines.insert(n // 2, 'this line is not a log entry')
+    return ('\n'.join(lines) + '\n').encode(), records
+
+
+def test_read_access_log_parses_columns():
+    """
+    Quoted fields with escaped quotes, '-' sizes and zone offsets are parsed;
+    malformed lines are dropped.
+    """
+    data, records = make_log(200)
+    log = read_access_log(gzip.GzipFile(fileobj=io.BytesIO(gzip.compress(data))))
+    
+    assert len(log) == len(records)
+    assert log.table['size'].sum() == sum(r['size'] for r in records)
+    assert list(log.table['path'].astype(str)[:3]) == [r['path'] for r in records[:3]]
+    assert log.local_time()[0].to_pydatetime() == records[0]['when'].replace(tzinfo=None)
+
+
+def test_question_parsing():
+    """
+    Filters and aggregates are read from GA5-style questions.
+    """
+    query = LogQuery.parse(
+        "What is the number of successful GET requests for pages under /telugu/ "
+        "from 12:00 until before 21:00 on Sundays during May 2024?"
+    )
+    assert (query.aggregate, query.prefix, query.methods) == ('count', '/telugu/', {'GET'})
+    assert (query.status, query.weekdays, query.minutes) == ((200, 299), {6}, (720, 1260))
+    
+    query = LogQuery.parse(
+        "Across all requests under kannada/ on 2024-05-04, how many bytes did the top IP address "
+        "(by volume of downloads) download?"
+    )
+    assert (query.aggregate, query.group, query.measure, query.output) == ('top', 'ip', 'size', 'value')
+    assert LogQuery.parse("What is the average response size?") is None
+
+
+def test_ga5_questions_match_a_straightforward_count():
+    """
+    The vectorized answers agree with a line-by-line computation, through
+    a gzipped upload and the processor registry.
+    """
+    data, records = make_log()
+    with Upload('s-anand.net-May-2024.gz', gzip.compress(data)) as upload:
+        file_info = FileProcessor().extract_file_info(upload)
+    assert looks_like_access_log(file_info['content'])
+    
+    expected = sum(
+        1 for r in records
+        if r['path'].startswith('/telugu/') and r['method'] == 'GET' and 200 <= r['status'] < 300
+        and r['when'].weekday() == 6 and 12 <= r['when'].hour < 21 and r['when'].month == 5
+    )
+    question = ("What is the number of successful GET requests for pages under /telugu/ "
+                "from 12:00 until before 21:00 on Sundays during May 2024?")
+    assert FileProcessor().solve(question, file_info) == str(expected)
+    
+    totals = {}
+    for r in records:
+        if r['path'].startswith('/kannada/') and r['when'].date().isoformat() == '2024-05-04':
+            totals[r['ip']] = totals.get(r['ip'], 0) + r['size']
+    question = "Across all requests under kannada/ on 2024-05-04, how many bytes did the top IP address download?"
+    assert ApacheLogProcessor().solve(question, file_info) == str(max(totals.values()))
+    question = "Which IP address downloaded the most bytes under kannada/ on 2024-05-04?"
+    assert ApacheLogProcessor().solve(question, file_info) == max(totals, key=totals.get)
+    
+    # Reading the times in UTC shifts the window
+    utc = sum(1 for r in records if r['when'].astimezone(timezone.utc).date().isoformat() == '2024-05-04')
+    question = "How many requests were made on 2024-05-04 in UTC?"
+    assert ApacheLogProcessor().solve(question, file_info) == str(utc)
+
+
+def test_other_text_is_left_alone():
+    """
+    Plain text uploads are declined so the question falls through to the LLM.
+    """
+    file_info = {'type': 'text', 'content': 'hello\nworld\n', 'data': 'hello\nworld\n'}
+    assert ApacheLogProcessor().solve("How many lines are there?", file_info) is None
+
+
+def test_gzip_index_frames_are_independent_and_cached(tmp_path):
+    """
+    Frames end on line boundaries, inflate on their own, still form one
+    valid gzip file, and the index is reused for the same digest.
+    """
+    data, records = make_log()
+    index = open_or_build('digest', lambda: io.BytesIO(data), str(tmp_path), span=16 * 1024)
+    
+    assert len(index.frames) > 5
+    assert all(index.read(frame).endswith(b'\n') for frame in index.frames)
+    assert b''.join(index.read(frame) for frame in index.frames) == data
+    assert gzip.decompress((tmp_path / 'digest.gz').read_bytes()) == data
+    assert open_or_build('digest', None, str(tmp_path)).frames == index.frames
+    
+    # Each frame's hour range covers its requests
+    frame = index.frames[2]
+    lines = index.read(frame).decode().splitlines()
+    stamps = [datetime.strptime(line.split('[')[1].split(']')[0], '%d/%b/%Y:%H:%M:%S %z').timestamp()
+              for line in lines if '[' in line]
+    assert frame.first <= min(stamps) and max(stamps) < frame.last
+
+
+def test_gzip_index_directory_is_private_and_capped(tmp_path):
+    """
+    Past the size cap the least recently used index is deleted, and a
+    directory other users can write to is refused.
+    """
+    data, _ = make_log(n=200)
+    directory = tmp_path / 'indexes'
+    open_or_build('a', lambda: io.BytesIO(data), str(directory))
+    entry = sum(f.stat().st_size for f in directory.iterdir())
+    open_or_build('b', lambda: io.BytesIO(data), str(directory))
+    old = time.time() - 60
+    for path in directory.iterdir():
+        os.utime(path, (old, old))
+    open_or_build('a', None, str(directory))
+    open_or_build('c', lambda: io.BytesIO(data), str(directory), max_bytes=entry * 2)
+    
+    assert sorted(path.name for path in directory.iterdir()) == ['a.gz', 'a.json', 'c.gz', 'c.json']
+    assert directory.stat().st_mode & 0o777 == 0o700
+    
+    directory.chmod(0o777)
+    with pytest.raises(PermissionError):
+        open_or_build('a', None, str(directory))
+
+
+def test_large_gzip_logs_are_answered_from_the_index(tmp_path):
+    """
+    Indexed logs give the same answers while only parsing the frames a
+    date filter can touch.
+    """
+    data, records = make_log(ordered=True)
+    with override_settings(GZIP_INDEX_DIR=str(tmp_path), GZIP_INDEX_MIN_BYTES=0, GZIP_INDEX_SPAN=16 * 1024):
+        with Upload('big.log.gz', gzip.compress(data)) as upload:
+            file_info = FileProcessor().extract_file_info(upload)
+    assert file_info['data'] is None and 'gzip_index' in file_info
+    
+    expected = sum(1 for r in records if r['when'].date().isoformat() == '2024-05-04')
+    assert ApacheLogProcessor().solve("How many requests were made on 2024-05-04?", file_info) == str(expected)
+    assert 0 < len(file_info['access_log_frames']) < len(file_info['gzip_index'].frames)
+    
+    expected = sum(1 for r in records if r['method'] == 'POST')
+    assert ApacheLogProcessor().solve("How many POST requests are there?", file_info) == str(expected)
+    assert len(file_info['access_log_frames']) == len(file_info['gzip_index'].frames)
+
+
+def test_gzip_index_failures_fall_back_to_inflating(tmp_path, monkeypatch):
+    """
+    A cache directory that cannot be written leaves the log parsed in memory.
+    """
+    def full_disk(*args, **kwargs):
+        raise OSError(errno.ENOSPC, "No space left on device")
+    
+    monkeypatch.setattr(file_processor, 'open_or_build', full_disk)
+    data, records = make_log()
+    with override_settings(GZIP_INDEX_DIR=str(tmp_path), GZIP_INDEX_MIN_BYTES=0):
+        with Upload('big.log.gz', gzip.compress(data)) as upload:
+            file_info = FileProcessor().extract_file_info(upload)
+    assert 'gzip_index' not in file_info and file_info['compression'] == 'gzip'
+    assert ApacheLogProcessor().solve("How many POST requests are there?", file_info) == str(sum(1 for r in records if r['method'] == 'POST'))
@@ -0,0 +1,65 @@
+"""
+Tests for the lazily loaded processor registry.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from solver.services.processors.registry import ProcessorRegistry, processors
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def test_registry_import_does_not_load_parsing_libraries():
+    """
+    Declaring processors must not import pandas, bs4 or chardet.
+    """
+    code = (
+        "import sys\n"
+        "from solver.services.processors.registry import processors\n"
+        "heavy = [m for m in ('pandas', 'bs4', 'chardet') if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+        "assert processors.loaded() == []\n"
+        "processors.get('hidden_input')\n"
+        "assert 'bs4' in sys.modules and 'pandas' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR, check=True)
+
+
+def test_registry_routes_and_reuses_instances():
+    """
+    Matching processors are tried in priority order and instantiated once.
+    """
+    html = '<div class="foo" data-value="3"></div><div class="foo" data-value="4"></div>'
+    file_info = {'type': 'html', 'content': html}
+    question = "Sum the data-value attributes of every div with the foo class"
+    
+    assert processors.candidates(question, 'html') == ['css_selector']
+    assert processors.solve(question, file_info) == '7'
+    assert processors.get('css_selector') is processors.get('css_selector')
+    assert processors.solve(question, {'type': 'csv'}) is None
+
+
+def test_processors_decline_when_nothing_matches():
+    """
+    A processor with nothing to work on returns None, leaving the question
+    to the next candidate and the LLM rather than answering "0".
+    """
+    question = "Sum the data-value attributes of every div with the foo class"
+    assert processors.solve(question, {'type': 'html', 'data': '<div class="bar" data-value="3"></div>'}) is None
+    
+    # The whole document counts, not just the preview
+    html = '<p>' + 'x' * 20000 + '</p><div class="foo" data-value="5"></div>'
+    assert processors.solve(question, {'type': 'html', 'data': html, 'content': html[:10000]}) == '5'
+
+
+def test_duplicate_names_are_rejected():
+    """
+    Registering two processors under one name is an error.
+    """
+    registry = ProcessorRegistry()
+    registry.register('a', 'solver.services.processors.csv_processor.AnswerColumnProcessor', ["x"])
+    with pytest.raises(ValueError):
+        registry.register('a', 'solver.services.processors.csv_processor.AnswerColumnProcessor', ["y"])
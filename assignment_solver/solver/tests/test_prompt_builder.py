@@ -0,0 +1,62 @@
+"""
+Unit tests for the token-budgeted prompt builder.
+"""
+
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import numpy as np
+import pandas as pd
+from solver.services.prompt_builder import PromptBuilder, estimate_tokens
+
+
+def test_large_inputs_stay_within_budget():
+    """
+    Prompts never exceed the budget, whatever the size of the file.
+    """
+    builder = PromptBuilder(budget_tokens=800)
+    df = pd.DataFrame({
+        'id': np.arange(200000),
+        'city': np.random.choice(['Chennai', 'Delhi', 'Mumbai'], 200000),
+        'sales': np.random.rand(200000),
+    })
+    file_infos = [
+        {'name': 'big.csv', 'type': 'csv', 'data': df},
+        {'name': 'big.txt', 'type': 'text', 'data': 'a log line\n' * 100000},
+        {'name': 'big.json', 'type': 'json', 'data': [{'id': i} for i in range(50000)]},
+        {'name': 'big.zip', 'type': 'zip', 'extracted_content': {
+            f'part{i}.csv': {'name': f'part{i}.csv', 'type': 'csv', 'data': df.head(1000), 'size': 1}
+            for i in range(200)
+        }},
+    ]
+    for file_info in file_infos:
+        prompt = builder.build("What is the total?", file_info)
+        assert estimate_tokens(prompt) <= 800, file_info['name']
+
+
+def test_csv_digest_reports_full_table_statistics():
+    """
+    Column statistics cover every row, not just the rows that fit in the prompt.
+    """
+    df = pd.DataFrame({'value': np.arange(1, 10001), 'label': ['x', 'y'] * 5000})
+    prompt = PromptBuilder(budget_tokens=400).build("Sum the values", {'name': 'v.csv', 'type': 'csv', 'data': df})
+    
+    assert "Rows: 10000, Columns: 2" in prompt
+    assert "sum=5.0005e+07" in prompt
+    assert "unique=2" in prompt
+
+
+def test_zip_digest_lists_every_member():
+    """
+    The archive manifest names each member with its type and size.
+    """
+    file_info = {'name': 'q.zip', 'type': 'zip', 'extracted_content': {
+        'a.txt': {'name': 'a.txt', 'type': 'text', 'data': 'alpha', 'size': 5},
+        'b.csv': {'name': 'b.csv', 'type': 'csv', 'data': pd.DataFrame({'n': [1]}), 'size': 4},
+    }}
+    prompt = PromptBuilder(budget_tokens=400).build("Which files?", file_info)
+    
+    assert "- a.txt: text, 5 bytes" in prompt
+    assert "- b.csv: csv, 4 bytes" in prompt
+    assert "alpha" in prompt
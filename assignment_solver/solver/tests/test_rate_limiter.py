@@ -0,0 +1,116 @@
+"""
+Unit tests for the AI Proxy outbound limiter.
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from solver.services.rate_limiter import FairLimiter, OutboundLimiter, SQLiteTokenBucket, TokenBucket
+from solver.services.resilience import Deadline, DeadlineExceeded
+
+
+def test_token_bucket_queues_reservations():
+    """
+    Once the burst is spent each reservation waits one refill interval longer.
+    """
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+    assert bucket.reserve(1) == pytest.approx(2.0, abs=0.05)
+    bucket.refund(1)
+    assert bucket.reserve(1) == pytest.approx(2.0, abs=0.05)
+
+
+def test_sqlite_bucket_is_shared_between_instances(tmp_path):
+    """
+    Two buckets on the same file (as in two workers) draw from one balance.
+    """
+    path = tmp_path / 'limits.sqlite3'
+    first = SQLiteTokenBucket(path, 'requests', rate_per_minute=60, capacity=1)
+    second = SQLiteTokenBucket(path, 'requests', rate_per_minute=60, capacity=1)
+    assert first.reserve(1) == 0
+    assert second.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_fair_limiter_grants_in_arrival_order():
+    """
+    Blocked threads are admitted first come, first served.
+    """
+    limiter = FairLimiter(1)
+    assert limiter.acquire()
+    order = []
+    
+    def worker(n):
+        limiter.acquire()
+        order.append(n)
+        limiter.release()
+    
+    threads = []
+    for n in range(5):
+        thread = threading.Thread(target=worker, args=(n,))
+        thread.start()
+        threads.append(thread)
+        while limiter.waiting <= n:
+            time.sleep(0.001)
+    limiter.release()
+    for thread in threads:
+        thread.join()
+    
+    assert order == [0, 1, 2, 3, 4]
+    assert limiter.in_use == 0
+
+
+def test_fair_limiter_shares_slots_between_threads_and_event_loop():
+    """
+    A slot released by a thread is handed to a coroutine waiting on a loop.
+    """
+    limiter = FairLimiter(1)
+    assert limiter.acquire()
+    
+    async def waiter():
+        assert not await limiter.aacquire(timeout=0.01)
+        threading.Timer(0.02, limiter.release).start()
+        assert await limiter.aacquire(timeout=1)
+        limiter.release()
+    
+    asyncio.run(waiter())
+    assert limiter.in_use == 0 and limiter.waiting == 0
+
+
+def test_outbound_limiter_rejects_waits_past_the_deadline():
+    """
+    A call that would queue beyond its deadline fails fast and refunds its tokens.
+    """
+    limiter = OutboundLimiter(max_in_flight=4, requests_per_minute=60, tokens_per_minute=6000)
+    with limiter.slot(tokens=100):
+        pass
+    
+    with pytest.raises(DeadlineExceeded):
+        with limiter.slot(tokens=6000, deadline=Deadline(0.5)):
+            pass
+    
+    stats = limiter.stats()
+    assert stats['admitted'] == 1
+    assert stats['rejected'] == 1
+    assert stats['in_flight'] == 0
+    assert limiter.token_bucket.reserve(0) == 0
+
+
+def test_outbound_limiter_takes_the_slot_before_sleeping_for_tokens():
+    """
+    A call that cannot get an in-flight slot is refused before it sleeps for tokens.
+    """
+    limiter = OutboundLimiter(max_in_flight=1, requests_per_minute=60)
+    limiter.request_bucket.reserve(60)
+    assert limiter.slots.acquire()
+    start = time.monotonic()
+    
+    with pytest.raises(DeadlineExceeded):
+        with limiter.slot(deadline=Deadline(1.5)):
+            pass
+    
+    assert time.monotonic() - start < 0.6
+    assert limiter.stats()['rejected'] == 1
+    assert limiter.request_bucket.reserve(1) <= 1.0
@@ -0,0 +1,64 @@
+"""
+Tests for the ingestion and dispatch pipeline in RequestHandler.
+"""
+
+import os
+from pathlib import Path
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from solver.services.request_handler import RequestHandler
+
+TEST_DATA_DIR = Path(__file__).parent / 'test_data'
+
+
+def make_handler():
+    """Build a handler with the answer cache off that records AI Proxy calls."""
+    handler = RequestHandler()
+    handler.answer_cache = None
+    handler.llm_calls = []
+    
+    def fake_query(question, file_info=None, deadline=None):
+        handler.llm_calls.append(question)
+        return {"answer": "from llm"}
+    
+    handler.query_aiproxy = fake_query
+    return handler
+
+
+def upload(relative_path):
+    path = TEST_DATA_DIR / relative_path
+    return SimpleUploadedFile(path.name, path.read_bytes())
+
+
+def test_local_solver_answers_without_llm():
+    """
+    Questions a registered processor can answer never reach AI Proxy.
+    """
+    handler = make_handler()
+    
+    result = handler.process_request(
+        "Write SQL to calculate the total sales of all items in the Gold ticket type",
+        upload('sql_files/tickets.db'),
+    )
+    assert result == {"answer": "617.5"}
+    
+    result = handler.process_request(
+        "How many lines are different between a.txt and b.txt?",
+        upload('zip_files/q-compare-files.zip'),
+    )
+    assert result == {"answer": "8"}
+    assert handler.llm_calls == []
+
+
+def test_unmatched_question_falls_back_to_llm():
+    """
+    When no processor answers, the same extracted file goes to AI Proxy.
+    """
+    handler = make_handler()
+    
+    result = handler.process_request("Summarise this archive", upload('zip_files/q-compare-files.zip'))
+    
+    assert result == {"answer": "from llm"}
+    assert handler.llm_calls == ["Summarise this archive"]
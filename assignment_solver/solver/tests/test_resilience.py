@@ -0,0 +1,203 @@
+"""
+Tests for deadlines, retries and the circuit breaker against a fake AI Proxy.
+"""
+
+import asyncio
+import os
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import django
+django.setup()
+
+import httpx
+import pytest
+from django.test import override_settings
+from solver.services import aiproxy_client
+from solver.services.rate_limiter import OutboundLimiter
+from solver.services.request_handler import RequestHandler
+from solver.services.resilience import CircuitBreaker, CircuitOpenError, Deadline, DeadlineExceeded
+from .fake_aiproxy import FakeAIProxy
+
+FAST_RETRIES = {'AIPROXY_BACKOFF_BASE': 0.01, 'AIPROXY_BACKOFF_CAP': 0.05, 'AIPROXY_MAX_RETRIES': 3}
+
+
+@pytest.fixture
+def proxy():
+    with FakeAIProxy() as fake:
+        with override_settings(AIPROXY_URL=fake.url, **FAST_RETRIES):
+            yield fake
+
+
+@pytest.fixture(autouse=True)
+def fresh_breaker(monkeypatch):
+    monkeypatch.setattr(aiproxy_client, '_circuit_breaker', CircuitBreaker(failure_threshold=5, reset_timeout=30))
+
+
+def make_handler():
+    handler = RequestHandler()
+    handler.aiproxy_token = 'test-token'
+    handler.answer_cache = None
+    return handler
+
+
+def test_retries_transient_errors_then_succeeds(proxy):
+    """
+    429 and 5xx responses are retried until the upstream answers.
+    """
+    proxy.script(503, {'status': 429, 'headers': {'Retry-After': '0'}}, 502)
+    
+    result = make_handler().query_aiproxy("What is 6 x 7?")
+    
+    assert result == {"answer": "42"}
+    assert proxy.calls == 4
+
+
+def test_gives_up_after_max_retries(proxy):
+    """
+    Persistent failures stop after the configured number of retries.
+    """
+    proxy.script(*[500] * 10)
+    
+    result = make_handler().query_aiproxy("What is 6 x 7?")
+    
+    assert result['answer'].startswith("Error:")
+    assert proxy.calls == 4
+
+
+def test_client_errors_are_not_retried(proxy):
+    """
+    A 4xx other than 429 is returned immediately.
+    """
+    proxy.script(401)
+    
+    result = make_handler().query_aiproxy("What is 6 x 7?")
+    
+    assert result['answer'].startswith("Error:")
+    assert proxy.calls == 1
+
+
+def test_deadline_caps_a_stalled_upstream(proxy):
+    """
+    A slow upstream is cut off at the request deadline instead of hanging.
+    """
+    proxy.script({'status': 200, 'delay': 2})
+    start = time.monotonic()
+    
+    with pytest.raises(DeadlineExceeded):
+        make_handler().query_aiproxy("What is 6 x 7?", deadline=Deadline(0.3))
+    
+    assert time.monotonic() - start < 1.5
+
+
+def test_circuit_opens_and_fails_fast(proxy, monkeypatch):
+    """
+    After repeated failures calls are rejected without reaching the upstream,
+    and a successful trial after the reset timeout closes the circuit again.
+    """
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.2)
+    monkeypatch.setattr(aiproxy_client, '_circuit_breaker', breaker)
+    proxy.script(*[503] * 3)
+    
+    with override_settings(AIPROXY_MAX_RETRIES=2):
+        result = make_handler().query_aiproxy("What is 6 x 7?")
+    assert result['answer'].startswith("Error:")
+    assert breaker.state == CircuitBreaker.OPEN
+    assert proxy.calls == 3
+    
+    with pytest.raises(CircuitOpenError):
+        aiproxy_client.post_chat({}, {})
+    assert proxy.calls == 3
+    
+    time.sleep(0.25)
+    assert make_handler().query_aiproxy("What is 6 x 7?") == {"answer": "42"}
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_interrupted_trial_does_not_wedge_the_circuit(proxy, monkeypatch):
+    """
+    A half-open trial ended by a non-retryable exception hands the trial back.
+    """
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    monkeypatch.setattr(aiproxy_client, '_circuit_breaker', breaker)
+    proxy.script(503)
+    with override_settings(AIPROXY_MAX_RETRIES=0):
+        with pytest.raises(httpx.HTTPStatusError):
+            aiproxy_client.post_chat({}, {})
+    time.sleep(0.1)
+    
+    class BrokenClient:
+        def post(self, *args, **kwargs):
+            raise httpx.DecodingError("bad body")
+    
+    with monkeypatch.context() as patch:
+        patch.setattr(aiproxy_client, 'get_client', lambda: BrokenClient())
+        with pytest.raises(httpx.DecodingError):
+            aiproxy_client.post_chat({}, {})
+    assert aiproxy_client.post_chat({}, {}).status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+    
+    breaker.record_failure()
+    time.sleep(0.1)
+    proxy.script({'status': 200, 'delay': 2})
+    
+    async def cancelled_trial():
+        task = asyncio.ensure_future(aiproxy_client.apost_chat({}, {}))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    
+    asyncio.run(cancelled_trial())
+    breaker.allow()
+
+
+def test_refused_limiter_slot_hands_back_the_trial(proxy, monkeypatch):
+    """
+    A half-open trial refused by the outbound limiter does not keep the circuit open.
+    """
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.1)
+    limiter = OutboundLimiter(max_in_flight=1)
+    assert limiter.slots.acquire()
+    
+    with pytest.raises(DeadlineExceeded):
+        aiproxy_client.post_chat({}, {}, deadline=Deadline(0.1), breaker=breaker, limiter=limiter)
+    
+    limiter.slots.release()
+    assert aiproxy_client.post_chat({}, {}, breaker=breaker, limiter=limiter).status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_async_path_retries_and_honours_deadline(proxy):
+    """
+    The async client retries the same way and respects the deadline.
+    """
+    handler = make_handler()
+    proxy.script(503, 504)
+    assert asyncio.run(handler.aquery_aiproxy("What is 6 x 7?")) == {"answer": "42"}
+    assert proxy.calls == 3
+    
+    proxy.script({'status': 200, 'delay': 2})
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(handler.aquery_aiproxy("What is 6 x 7?", deadline=Deadline(0.3)))
+
+
+def test_deadline_is_checked_before_file_processing():
+    """
+    An already expired deadline stops the request before the upload is parsed.
+    """
+    deadline = Deadline(0)
+    with pytest.raises(DeadlineExceeded):
+        make_handler().process_request("What is 6 x 7?", deadline=deadline)
+
+
+def test_transport_errors_are_retried():
+    """
+    Connection failures count as transient and are retried.
+    """
+    with override_settings(AIPROXY_URL="http://127.0.0.1:9/unreachable", **FAST_RETRIES):
+        with pytest.raises(httpx.TransportError):
+            aiproxy_client.post_chat({}, {}, breaker=CircuitBreaker(failure_threshold=10))
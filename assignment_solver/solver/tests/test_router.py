@@ -0,0 +1,68 @@
+"""
+Unit tests for the compiled question router.
+"""
+
+from solver.services.router import KeywordMatcher, QuestionRouter, Rule
+
+
+def test_matcher_finds_overlapping_keywords_in_one_pass():
+    """
+    Keywords that overlap or nest inside each other are all reported.
+    """
+    matcher = KeywordMatcher(["he", "she", "his", "hers", "sha256sum", "sum"])
+    assert matcher.find("ushers") == {"she", "he", "hers"}
+    assert matcher.find("run sha256sum") == {"sha256sum", "sum"}
+    assert matcher.find("nothing here") == {"he"}
+    assert matcher.find("") == set()
+
+
+def test_router_requires_all_keywords_and_file_type():
+    """
+    A rule matches only when every keyword appears and the file type fits.
+    """
+    router = QuestionRouter()
+    router.add_rule(Rule('sql_gold', ["sql", "gold", "ticket"], file_types={'sqlite'}))
+    router.add_rule(Rule('any_file', ["total"]))
+    
+    names = [rule.name for rule in router.candidates("SQL total for GOLD Ticket", 'sqlite')]
+    assert names == ['sql_gold', 'any_file']
+    assert [rule.name for rule in router.candidates("SQL total for GOLD Ticket", 'csv')] == ['any_file']
+    assert router.candidates("SQL for silver tickets", 'sqlite') == []
+
+
+def test_router_orders_by_priority_then_registration():
+    """
+    Higher priorities come first; equal priorities keep registration order.
+    """
+    router = QuestionRouter()
+    
+    @router.rule("sum", priority=1)
+    def low(question, file_info):
+        return None
+    
+    @router.rule("sum", "encodings", priority=5)
+    def high(question, file_info):
+        return None
+    
+    @router.rule("sum", priority=1)
+    def low_later(question, file_info):
+        return None
+    
+    @router.rule(file_types={'zip'})
+    def zip_fallback(question, file_info):
+        return None
+    
+    names = [rule.name for rule in router.candidates("Sum across different encodings", 'zip')]
+    assert names == ['high', 'low', 'low_later', 'zip_fallback']
+
+
+def test_router_scales_to_many_rules():
+    """
+    Hundreds of rules compile into one automaton and dispatch stays exact.
+    """
+    router = QuestionRouter()
+    for i in range(500):
+        router.add_rule(Rule(f'rule_{i}', [f"ga question {i:03d}", "dataset"]))
+    
+    names = [rule.name for rule in router.candidates("Answer GA question 042 using the dataset")]
+    assert names == ['rule_42']
@@ -0,0 +1,148 @@
+"""
+Tests for coalescing identical concurrent requests into one upstream call.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from solver.services.request_handler import RequestHandler
+from solver.services.single_flight import SingleFlight
+
+CONCURRENCY = 16
+QUESTION = "What is the total of the value column?"
+CSV_BYTES = b'id,value\n1,10\n2,32\n'
+
+
+def make_handler():
+    """Build a handler with the answer cache off and a counting fake AI Proxy."""
+    handler = RequestHandler()
+    handler.answer_cache = None
+    handler.calls = 0
+    lock = threading.Lock()
+    
+    def fake_query(question, file_info=None, deadline=None):
+        with lock:
+            handler.calls += 1
+        time.sleep(0.2)
+        return {"answer": "42"}
+    
+    async def fake_aquery(question, file_info=None, deadline=None):
+        handler.calls += 1
+        await asyncio.sleep(0.2)
+        return {"answer": "42"}
+    
+    handler.query_aiproxy = fake_query
+    handler.aquery_aiproxy = fake_aquery
+    return handler
+
+
+def test_concurrent_identical_requests_make_one_upstream_call():
+    """
+    N threads posting the same question and file share one AI Proxy call.
+    """
+    handler = make_handler()
+    
+    def submit(_):
+        return handler.process_request(QUESTION, SimpleUploadedFile('data.csv', CSV_BYTES))
+    
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        results = list(pool.map(submit, range(CONCURRENCY)))
+    
+    assert handler.calls == 1
+    assert results == [{"answer": "42"}] * CONCURRENCY
+    assert RequestHandler.in_flight.in_flight() == 0
+
+
+def test_concurrent_identical_async_requests_make_one_upstream_call():
+    """
+    N coroutines posting the same question and file share one AI Proxy call.
+    """
+    handler = make_handler()
+    
+    async def run():
+        return await asyncio.gather(*[
+            handler.aprocess_request(QUESTION, SimpleUploadedFile('data.csv', CSV_BYTES))
+            for _ in range(CONCURRENCY)
+        ])
+    
+    results = asyncio.run(run())
+    
+    assert handler.calls == 1
+    assert results == [{"answer": "42"}] * CONCURRENCY
+
+
+def test_cancelled_leader_leaves_the_upload_to_the_shared_task():
+    """
+    A follower still gets the file content after the leader is cancelled.
+    """
+    handler = make_handler()
+    prompts = []
+    process_file = handler._process_file
+    
+    def slow_process_file(*args, **kwargs):
+        time.sleep(0.5)
+        return process_file(*args, **kwargs)
+    
+    async def fake_aquery(question, file_info=None, deadline=None):
+        prompts.append(file_info.get('content'))
+        return {"answer": "42"}
+    
+    handler._process_file = slow_process_file
+    handler.aquery_aiproxy = fake_aquery
+    
+    async def run():
+        leader = asyncio.create_task(handler.aprocess_request(QUESTION, SimpleUploadedFile('notes.txt', b'value is 42')))
+        await asyncio.sleep(0.2)
+        follower = asyncio.create_task(handler.aprocess_request(QUESTION, SimpleUploadedFile('notes.txt', b'value is 42')))
+        await asyncio.sleep(0.2)
+        leader.cancel()
+        return await follower
+    
+    assert asyncio.run(run()) == {"answer": "42"}
+    assert prompts == ['value is 42']
+
+
+def test_different_files_are_not_coalesced():
+    """
+    Requests that differ in file content each get their own upstream call.
+    """
+    handler = make_handler()
+    
+    def submit(i):
+        return handler.process_request(QUESTION, SimpleUploadedFile('data.csv', CSV_BYTES + f'{i},0\n'.encode()))
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(submit, range(4)))
+    
+    assert handler.calls == 4
+
+
+def test_followers_receive_the_leader_exception():
+    """
+    An exception raised by the shared call reaches every waiting caller.
+    """
+    flight = SingleFlight()
+    started = threading.Event()
+    
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("upstream failed")
+    
+    def call(_):
+        try:
+            flight.do('k', fail)
+        except ValueError as e:
+            return str(e)
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(call, range(4)))
+    
+    assert results == ["upstream failed"] * 4
+    assert flight.in_flight() == 0
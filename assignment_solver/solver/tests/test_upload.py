@@ -0,0 +1,124 @@
+"""
+Unit tests for upload ingestion, type sniffing and transparent decompression.
+"""
+
+import bz2
+import gzip
+import hashlib
+import lzma
+import os
+from pathlib import Path
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+import django
+django.setup()
+
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from solver.services.processors.file_processor import FileProcessor
+from solver.utils.upload import Upload, sniff
+
+TEST_DATA_DIR = Path(__file__).parent / 'test_data'
+
+
+def test_sniff_prefers_magic_bytes_over_extension():
+    """
+    Archives and databases are recognised even under the wrong name.
+    """
+    assert sniff(b'PK\x03\x04rest', 'notes.txt') == 'zip'
+    assert sniff(b'SQLite format 3\x00', 'data.bin') == 'sqlite'
+    assert sniff(b'a,b\n1,2\n', 'data.CSV') == 'csv'
+    assert sniff(b'', 'archive.rar') == 'unknown'
+
+
+def test_sniff_recognises_text_content_without_an_extension():
+    """
+    Files with no useful extension are classified from their leading bytes.
+    """
+    assert sniff(b'  {"a": 1}', 'payload') == 'json'
+    assert sniff(b'<!DOCTYPE html><html>', 'page') == 'html'
+    assert sniff(b'127.0.0.1 - - [01/May/2024:00:00:01 -0500] "GET /', 'apache_log') == 'text'
+    assert sniff(b'BZh but not bzip2', 'notes') == 'text'
+    assert sniff(b'\x00\x01\x02binary', 'blob') == 'unknown'
+
+
+def test_compressed_files_are_routed_by_their_inner_content():
+    """
+    gzip, bz2 and xz uploads are inflated in memory and parsed as the file inside.
+    """
+    csv_bytes = b'name,answer\nx,42\n'
+    for name, compress in [('data.csv.gz', gzip.compress), ('data.csv.bz2', bz2.compress), ('data.csv.xz', lzma.compress)]:
+        with Upload(name, compress(csv_bytes)) as upload:
+            info = FileProcessor().extract_file_info(upload)
+        assert info['type'] == 'csv', name
+        assert info['name'] == 'data.csv'
+        assert info['compressed_name'] == name
+        assert info['columns'] == ['name', 'answer']
+        assert info['path'] is None
+    
+    log = b'127.0.0.1 - - [01/May/2024:00:00:01 -0500] "GET / HTTP/1.1" 200 512\n'
+    with Upload('apache_log.gz', gzip.compress(log * 3)) as upload:
+        info = FileProcessor().extract_file_info(upload)
+    assert info['type'] == 'text' and info['compression'] == 'gzip'
+    assert info['data'].count('\n') == 3
+
+
+def test_gzip_bomb_aborts_while_inflating():
+    """
+    The expansion ratio of a compressed stream is checked as it inflates.
+    """
+    with Upload('zeros.log.gz', gzip.compress(b'\0' * (20 * 1024 * 1024))) as upload:
+        info = FileProcessor().extract_file_info(upload)
+    
+    assert info['type'] == 'gzip'
+    assert info['limit']['limit'] == 'ratio'
+
+
+def test_in_memory_upload_is_hashed_without_touching_disk():
+    """
+    Small uploads are read in place; a path is only created on demand.
+    """
+    data = (TEST_DATA_DIR / 'zip_files' / 'q-compare-files.zip').read_bytes()
+    upload = Upload.from_file(SimpleUploadedFile('archive.zip', data))
+    
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+    assert upload.kind == 'zip' and upload.size == len(data)
+    assert upload.disk_path is None
+    
+    path = upload.path()
+    assert Path(path).read_bytes() == data
+    upload.close()
+    assert not os.path.exists(path)
+
+
+def test_spooled_upload_is_mapped_in_place():
+    """
+    Uploads Django already wrote to disk reuse that file instead of a copy.
+    """
+    data = (TEST_DATA_DIR / 'sql_files' / 'tickets.db').read_bytes()
+    file = TemporaryUploadedFile('tickets.db', 'application/octet-stream', len(data), None)
+    file.write(data)
+    file.flush()
+    
+    with Upload.from_file(file) as upload:
+        assert upload.path() == file.temporary_file_path()
+        assert upload.sha256 == hashlib.sha256(data).hexdigest()
+        info = FileProcessor().extract_file_info(upload)
+    
+    assert info['type'] == 'sqlite'
+    assert 'tickets' in info['data']
+    file.close()
+
+
+def test_zip_members_are_parsed_from_memory():
+    """
+    Archive members are read from the upload's bytes, not extracted to disk.
+    """
+    data = (TEST_DATA_DIR / 'zip_files' / 'q-extract-csv-zip.zip').read_bytes()
+    with Upload('q-extract-csv-zip.zip', data) as upload:
+        info = FileProcessor().extract_file_info(upload)
+    
+    assert info['type'] == 'zip'
+    member = info['extracted_content']['extract.csv']
+    assert member['type'] == 'csv' and 'answer' in member['columns']
+    assert member['path'] is None
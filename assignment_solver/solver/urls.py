@@ -3,4 +3,7 @@ from . import views
 
 urlpatterns = [
     path('api/', views.api_endpoint, name='api_endpoint'),
+    path('api/async/', views.async_api_endpoint, name='async_api_endpoint'),
+    path('api/cache/stats/', views.cache_stats, name='cache_stats'),
+    path('api/aiproxy/stats/', views.aiproxy_stats, name='aiproxy_stats'),
 ]
\ No newline at end of file
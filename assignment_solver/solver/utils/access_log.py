@@ -0,0 +1,283 @@
+import io
+import re
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from .gzip_index import read_frame
+
+# Apache common/combined log line: host ident user [time] "request" status size ...
+# Quoted fields may contain backslash-escaped quotes.
+LINE = re.compile(r'^(\S+) \S+ \S+ \[([^\]]+)\] "((?:[^"\\]|\\.)*)" (\d{3}|-) (\d+|-)')
+
+CHUNK_ROWS = 500000
+
+# Fields kept: host, [time, zone], "request", status, size
+USED_FIELDS = {0, 3, 4, 5, 6, 7}
+
+COLUMNS = ['ip', 'time', 'offset', 'method', 'path', 'protocol', 'status', 'size']
+
+# '[05/May/2024:20:38:46' as fixed-width character positions
+TIME_WIDTH = 21
+TIME_DIGITS = [1, 2, 8, 9, 10, 11, 13, 14, 16, 17, 19, 20]
+TIME_SEPARATORS = {0: '[', 3: '/', 7: '/', 12: ':', 15: ':', 18: ':'}
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+MONTH_KEYS = np.array([(ord(m[0]) << 16) | (ord(m[1]) << 8) | ord(m[2]) for m in MONTH_NAMES], dtype=np.int64)
+
+
+def looks_like_access_log(text, lines=5):
+    """
+    Return True if most of the first non-blank lines of text are access
+    log lines.
+    """
+    sample = [line for line in text.splitlines()[:lines * 2] if line.strip()][:lines]
+    return bool(sample) and sum(1 for line in sample if LINE.match(line)) * 2 > len(sample)
+
+
+def _leading_junk(stream, limit=1000):
+    """
+    Count the lines before the first log line, then rewind.
+    
+    read_csv sizes the table from the first row it parses, so a banner or
+    blank-ish first line would hide every column after it.
+    """
+    start = stream.tell()
+    skipped = 0
+    for line in stream:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        if skipped >= limit or LINE.match(line):
+            break
+        skipped += 1
+    stream.seek(start)
+    return skipped
+
+
+def _parse_times(values):
+    """
+    Parse '[dd/Mon/yyyy:HH:MM:SS' tokens into datetime64 without strptime.
+    
+    The tokens are fixed width, so they are viewed as a 2-D array of code
+    points and every field is decoded with whole-column arithmetic.
+    Malformed tokens become NaT.
+    """
+    chars = np.asarray(values, dtype=f'U{TIME_WIDTH}')
+    grid = chars.view(np.uint32).reshape(len(chars), TIME_WIDTH).astype(np.int64)
+    digits = grid - ord('0')
+    
+    def number(start, stop):
+        value = np.zeros(len(chars), dtype=np.int64)
+        for column in range(start, stop):
+            value = value * 10 + digits[:, column]
+        return value
+    
+    day, year = number(1, 3), number(8, 12)
+    hour, minute, second = number(13, 15), number(16, 18), number(19, 21)
+    key = (grid[:, 4] << 16) | (grid[:, 5] << 8) | grid[:, 6]
+    order = np.argsort(MONTH_KEYS)
+    month = order[np.searchsorted(MONTH_KEYS[order], key).clip(0, 11)]
+    
+    valid = MONTH_KEYS[month] == key
+    for column, separator in TIME_SEPARATORS.items():
+        valid &= grid[:, column] == ord(separator)
+    valid &= ((digits[:, TIME_DIGITS] >= 0) & (digits[:, TIME_DIGITS] <= 9)).all(axis=1)
+    valid &= (day >= 1) & (day <= 31) & (hour < 24) & (minute < 60) & (second < 61)
+    
+    months = ((year - 1970) * 12 + month).astype('datetime64[M]')
+    seconds = (day - 1) * 86400 + hour * 3600 + minute * 60 + second
+    times = months.astype('datetime64[ns]') + seconds.astype('timedelta64[s]')
+    times[~valid] = np.datetime64('NaT')
+    return times
+
+
+def _offset_minutes(zones):
+    """Convert a categorical of '-0500]' tokens to signed minutes."""
+    categories = zones.cat.categories
+    values = []
+    for zone in categories:
+        match = re.match(r'([+-])(\d{2}):?(\d{2})', str(zone))
+        if match is None:
+            values.append(0)
+        else:
+            minutes = int(match.group(2)) * 60 + int(match.group(3))
+            values.append(-minutes if match.group(1) == '-' else minutes)
+    lookup = np.append(np.array(values, dtype=np.int16), np.int16(0))
+    return lookup[zones.cat.codes.to_numpy()]
+
+
+def _recode(codes, values):
+    """Categorical of values[code] for each row code, without rehashing rows."""
+    value_codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    value_codes = np.append(value_codes, -1)
+    return pd.Categorical.from_codes(value_codes[codes], uniques)
+
+
+def _split_requests(requests):
+    """
+    Split a categorical of request lines into method, path and protocol.
+    
+    Each distinct request line is split once; rows then map through the
+    category codes, so millions of repeated requests cost one split each.
+    """
+    methods, paths, protocols = [], [], []
+    for request in requests.cat.categories:
+        parts = str(request).split(' ')
+        valid = len(parts) >= 2
+        methods.append(parts[0] if valid else None)
+        paths.append(parts[1] if valid else None)
+        protocols.append(parts[2] if len(parts) > 2 else None)
+    codes = requests.cat.codes.to_numpy()
+    return _recode(codes, methods), _recode(codes, paths), _recode(codes, protocols)
+
+
+def _compact(chunk):
+    """Turn one raw read_csv chunk into typed, columnar form."""
+    local = _parse_times(chunk[3])
+    method, path, protocol = _split_requests(chunk[5])
+    status = pd.to_numeric(chunk[6], errors='coerce')
+    size = pd.to_numeric(chunk[7], errors='coerce')
+    return pd.DataFrame({
+        'ip': chunk[0],
+        'time': local,
+        'offset': _offset_minutes(chunk[4]),
+        'method': method,
+        'path': path,
+        'protocol': protocol,
+        'status': status.fillna(0).astype(np.int16),
+        'size': size.fillna(0).astype(np.int64),
+    })
+
+
+def _concat(frames):
+    """Concatenate chunks, unioning categoricals so they stay categorical."""
+    if not frames:
+        return pd.DataFrame({column: pd.Series(dtype=object) for column in COLUMNS})
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    data = {}
+    for column in COLUMNS:
+        series = [frame[column] for frame in frames]
+        if isinstance(series[0].dtype, pd.CategoricalDtype):
+            data[column] = pd.Series(union_categoricals(series))
+        else:
+            data[column] = pd.concat(series, ignore_index=True)
+    return pd.DataFrame(data)
+
+
+def read_access_log(stream, chunk_rows=CHUNK_ROWS):
+    """
+    Stream-parse an Apache common/combined log into compact columns.
+    
+    pandas' C tokenizer splits each line on spaces, honouring quoted fields
+    with backslash-escaped quotes; the bracketed timestamp arrives as two
+    tokens (time and zone). Lines are processed chunk_rows at a time so
+    peak memory is one chunk of raw strings plus the compact result.
+    
+    Args:
+        stream: Seekable binary or text file object over the log
+        chunk_rows (int): Lines per parsing chunk
+    
+    Returns:
+        AccessLog: Parsed log; malformed lines are dropped
+    """
+    reader = pd.read_csv(
+        stream,
+        sep=' ',
+        header=None,
+        skiprows=_leading_junk(stream),
+        usecols=sorted(USED_FIELDS),
+        dtype={0: 'category', 3: str, 4: 'category', 5: 'category', 6: str, 7: str},
+        quotechar='"',
+        escapechar='\\',
+        doublequote=False,
+        na_filter=False,
+        on_bad_lines='skip',
+        encoding_errors='replace',
+        chunksize=chunk_rows,
+        engine='c',
+    )
+    frames = [_compact(chunk) for chunk in reader]
+    table = _concat(frames)
+    return AccessLog(table[table['time'].notna()].reset_index(drop=True))
+
+
+def parse_frame(path, offset, length):
+    """
+    Inflate and parse one GzipIndex frame; module-level so process pools
+    can run it.
+    
+    Returns:
+        DataFrame: The frame's rows, as in AccessLog.table
+    """
+    return read_access_log(io.BytesIO(read_frame(path, offset, length))).table
+
+
+def read_indexed_log(index, frames, executor=None, cache=None):
+    """
+    Parse frames of an indexed gzip log, concurrently when given a pool.
+    
+    Args:
+        index (GzipIndex): Index over the log
+        frames (list): Frames to parse, from index.select()
+        executor (Executor, optional): Thread or process pool
+        cache (dict, optional): Parsed frames by offset, reused and filled
+            so repeated queries only parse frames they have not seen
+        
+    Returns:
+        AccessLog: Rows of the given frames in log order
+    """
+    cache = {} if cache is None else cache
+    missing = [frame for frame in frames if frame.offset not in cache]
+    if executor is None or len(missing) < 2:
+        tables = map(lambda frame: parse_frame(index.path, frame.offset, frame.length), missing)
+    else:
+        tables = executor.map(
+            parse_frame,
+            [index.path] * len(missing),
+            [frame.offset for frame in missing],
+            [frame.length for frame in missing],
+        )
+    for frame, table in zip(missing, tables):
+        cache[frame.offset] = table
+    return AccessLog(_concat([cache[frame.offset] for frame in frames if len(cache[frame.offset])]))
+
+
+class AccessLog:
+    """
+    Columnar access log: one row per request.
+    
+    Columns: ip, method, path, protocol (categorical), time (wall-clock
+    time as written in the log), offset (its UTC offset in minutes),
+    status (int16) and size (int64 bytes, '-' as 0).
+    """
+    def __init__(self, table):
+        self.table = table
+    
+    def __len__(self):
+        return len(self.table)
+    
+    def utc(self):
+        """Request times in UTC, as naive datetime64."""
+        return self.table['time'] - pd.to_timedelta(self.table['offset'].astype(np.int64), unit='m')
+    
+    def local_time(self, tz=None):
+        """
+        Request times as naive wall-clock datetimes.
+        
+        Args:
+            tz (tzinfo or str, optional): Convert to this zone; by default
+                times stay in the offset each line was logged with
+        """
+        if tz is None:
+            return self.table['time']
+        return self.utc().dt.tz_localize('UTC').dt.tz_convert(tz).dt.tz_localize(None)
+    
+    def prefix_mask(self, column, prefix):
+        """Boolean mask of rows whose categorical column starts with prefix."""
+        values = self.table[column]
+        categories = values.cat.categories.astype(str)
+        hits = np.append(categories.str.startswith(prefix), False)
+        return hits[values.cat.codes.to_numpy()]
+    
+    def isin_mask(self, column, allowed):
+        """Boolean mask of rows whose categorical column is one of allowed."""
+        return self.table[column].isin(list(allowed)).to_numpy()
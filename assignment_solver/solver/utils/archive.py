@@ -0,0 +1,345 @@
+import posixpath
+import threading
+import zipfile
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import Future
+from .upload import sniff
+
+# Members smaller than this are exempt from the ratio check; tiny repetitive
+# files routinely compress far better than any sane bomb threshold
+RATIO_MIN_BYTES = 1024 * 1024
+
+READ_CHUNK = 1024 * 1024
+
+# Member types parsed in-process even with a process pool: inflating them
+# must be charged to the parent archive's budget, which stays here
+LOCAL_KINDS = frozenset({'zip', 'gzip', 'bz2', 'xz'})
+
+
+class ArchiveLimitExceeded(Exception):
+    """
+    Raised when an archive goes over one of its ArchiveBudget limits.
+    
+    Attributes:
+        limit (str): 'bytes', 'ratio', 'members' or 'depth'
+        value: The value that went over
+        maximum: The configured limit
+        member (str): Archive member involved, if any
+    """
+    def __init__(self, limit, value, maximum, member=None):
+        self.limit = limit
+        self.value = value
+        self.maximum = maximum
+        self.member = member
+        where = f" at {member}" if member else ''
+        super().__init__(f"Archive {limit} limit exceeded{where}: {value} > {maximum}")
+    
+    def as_dict(self):
+        return {'limit': self.limit, 'value': self.value, 'maximum': self.maximum, 'member': self.member}
+
+
+class ArchiveBudget:
+    """
+    Resource limits for one upload, shared by every archive nested in it.
+    
+    Declared sizes, ratios, member counts and depth are checked when a
+    central directory is read, before anything is inflated; inflated bytes
+    are charged as they are read, so headers that lie about sizes are still
+    caught mid-stream.
+    """
+    def __init__(self, max_bytes=512 * 1024 * 1024, max_ratio=100, max_members=10000, max_depth=3):
+        self.max_bytes = max_bytes
+        self.max_ratio = max_ratio
+        self.max_members = max_members
+        self.max_depth = max_depth
+        self.depth = 0
+        self._used = {'bytes': 0, 'members': 0}
+        self._lock = threading.Lock()
+    
+    def child(self):
+        """Return the budget for an archive nested one level deeper."""
+        child = ArchiveBudget.__new__(ArchiveBudget)
+        child.__dict__.update(self.__dict__)
+        child.depth = self.depth + 1
+        return child
+    
+    @property
+    def used_bytes(self):
+        return self._used['bytes']
+    
+    def check_directory(self, infos):
+        """
+        Validate an archive's central directory against the budget.
+        
+        Args:
+            infos (list): ZipInfo entries for the archive's members
+        """
+        if self.depth > self.max_depth:
+            raise ArchiveLimitExceeded('depth', self.depth, self.max_depth)
+        with self._lock:
+            self._used['members'] += len(infos)
+            if self._used['members'] > self.max_members:
+                raise ArchiveLimitExceeded('members', self._used['members'], self.max_members)
+            declared = self._used['bytes']
+        for info in infos:
+            declared += info.file_size
+            if declared > self.max_bytes:
+                raise ArchiveLimitExceeded('bytes', declared, self.max_bytes, info.filename)
+            if info.file_size >= RATIO_MIN_BYTES:
+                ratio = info.file_size / max(info.compress_size, 1)
+                if ratio > self.max_ratio:
+                    raise ArchiveLimitExceeded('ratio', round(ratio, 1), self.max_ratio, info.filename)
+    
+    def charge(self, size, member=None):
+        """Account for size inflated bytes, raising once over max_bytes."""
+        with self._lock:
+            self._used['bytes'] += size
+            used = self._used['bytes']
+        if used > self.max_bytes:
+            raise ArchiveLimitExceeded('bytes', used, self.max_bytes, member)
+
+
+class GuardedReader:
+    """
+    File-like wrapper charging every byte read to an ArchiveBudget.
+    
+    When compressed_size is given (streams without a central directory,
+    such as gzip), the running expansion ratio is checked as well.
+    """
+    def __init__(self, stream, budget, member, compressed_size=None):
+        self._stream = stream
+        self._budget = budget
+        self._member = member
+        self._compressed_size = compressed_size
+        self._read = 0
+    
+    def read(self, size=-1):
+        if size is None or size < 0:
+            chunks = []
+            while True:
+                chunk = self.read(READ_CHUNK)
+                if not chunk:
+                    return b''.join(chunks)
+                chunks.append(chunk)
+        data = self._stream.read(size)
+        self._budget.charge(len(data), self._member)
+        self._read += len(data)
+        if self._compressed_size and self._read >= RATIO_MIN_BYTES:
+            ratio = self._read / self._compressed_size
+            if ratio > self._budget.max_ratio:
+                raise ArchiveLimitExceeded('ratio', round(ratio, 1), self._budget.max_ratio, self._member)
+        return data
+    
+    def close(self):
+        self._stream.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class ZipView:
+    """
+    Random-access view over a zip archive.
+    
+    The central directory is read once when the view is created; member
+    data is only inflated when a member is opened or read. Directory
+    entries are skipped, and members in nested folders are listed by their
+    full archive path. With a budget, the directory is validated up front
+    and reads abort with ArchiveLimitExceeded as soon as a limit is hit.
+    """
+    def __init__(self, source, budget=None):
+        """
+        Args:
+            source: Path or seekable binary file object holding the archive
+            budget (ArchiveBudget, optional): Limits enforced while reading
+        """
+        self._zip = zipfile.ZipFile(source, 'r')
+        self._infos = {info.filename: info for info in self._zip.infolist() if not info.is_dir()}
+        self.budget = budget
+        if budget is not None:
+            budget.check_directory(list(self._infos.values()))
+    
+    def names(self):
+        """Return member paths in archive order."""
+        return list(self._infos)
+    
+    def info(self, name):
+        """Return the ZipInfo for a member."""
+        return self._infos[name]
+    
+    def open(self, name):
+        """Return a stream that inflates the member as it is read."""
+        stream = self._zip.open(self._infos[name])
+        if self.budget is None:
+            return stream
+        return GuardedReader(stream, self.budget, name)
+    
+    def read(self, name):
+        """Inflate a member into bytes."""
+        with self.open(name) as stream:
+            return stream.read()
+    
+    def walk(self, top=''):
+        """
+        Walk the archive tree like os.walk, top-down.
+        
+        Yields:
+            tuple: (dirpath, dirnames, filenames) with '' as the archive root
+        """
+        tree = {}
+        for name in self._infos:
+            parts = name.split('/')
+            for depth in range(len(parts)):
+                directory = '/'.join(parts[:depth])
+                entries = tree.setdefault(directory, ([], []))
+                if depth == len(parts) - 1:
+                    entries[1].append(parts[depth])
+                else:
+                    child = parts[depth]
+                    if child not in entries[0]:
+                        entries[0].append(child)
+        
+        top = top.strip('/')
+        pending = [top] if top in tree else []
+        while pending:
+            dirpath = pending.pop(0)
+            dirnames, filenames = tree[dirpath]
+            yield dirpath, dirnames, filenames
+            pending[:0] = [posixpath.join(dirpath, d) if dirpath else d for d in dirnames]
+    
+    def close(self):
+        self._zip.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def __len__(self):
+        return len(self._infos)
+
+
+class LazyMembers(Mapping):
+    """
+    Read-only mapping of archive member path to its extracted file_info.
+    
+    A member is inflated and parsed on first access and memoized, so a
+    question about one member of a large archive parses only that one.
+    Iterating keys, len() and describe() never inflate anything. Solvers
+    that need many members call prefetch() to parse them concurrently.
+    """
+    def __init__(self, view, parse, executor=None, remote_parse=None, min_parallel=8):
+        """
+        Args:
+            view (ZipView): The archive
+            parse (callable): parse(view, name) -> file_info dict
+            executor (Executor, optional): Pool used by prefetch()
+            remote_parse (callable, optional): Picklable parse(name, data)
+                used instead of parse when executor is a process pool
+            min_parallel (int): Fewer members than this are parsed inline
+        """
+        self.view = view
+        self._parse = parse
+        self.executor = executor
+        self._remote_parse = remote_parse
+        self.min_parallel = min_parallel
+        self._parsed = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+    
+    def __getitem__(self, name):
+        if name in self._parsed:
+            return self._parsed[name]
+        self.view.info(name)
+        with self._lock:
+            member_lock = self._locks.setdefault(name, threading.Lock())
+        with member_lock:
+            if name not in self._parsed:
+                self._parsed[name] = self._parse(self.view, name)
+        return self._parsed[name]
+    
+    def __iter__(self):
+        return iter(self.view.names())
+    
+    def __len__(self):
+        return len(self.view)
+    
+    def __contains__(self, name):
+        try:
+            self.view.info(name)
+        except KeyError:
+            return False
+        return True
+    
+    def prefetch(self, names=None):
+        """
+        Parse members concurrently on the executor.
+        
+        At most twice the pool size is in flight at once, bounding the
+        inflated bytes held in memory. Results are stored by name, so
+        iteration stays in archive order whatever order parses finish in.
+        
+        Args:
+            names (iterable, optional): Members to parse; defaults to all
+        """
+        pending = [name for name in (self.view.names() if names is None else names) if name not in self._parsed]
+        if self.executor is None or len(pending) < self.min_parallel:
+            for name in pending:
+                self[name]
+            return
+        
+        window = 2 * getattr(self.executor, '_max_workers', 4)
+        in_flight = deque()
+        for name in pending:
+            if len(in_flight) >= window:
+                self._collect(*in_flight.popleft())
+            in_flight.append((name, self._submit(name)))
+        while in_flight:
+            self._collect(*in_flight.popleft())
+    
+    def _submit(self, name):
+        if self._remote_parse is None:
+            return self.executor.submit(self.__getitem__, name)
+        try:
+            with self.view.open(name) as stream:
+                head = stream.read(32)
+                if sniff(head, posixpath.basename(name)) not in LOCAL_KINDS:
+                    return self.executor.submit(self._remote_parse, name, head + stream.read())
+        except ArchiveLimitExceeded:
+            # Parsed below, which reports the limit as the member's error
+            pass
+        # Nested archives also hold an open ZipView, which cannot cross
+        # processes
+        future = Future()
+        future.set_result(self[name])
+        return future
+    
+    def _collect(self, name, future):
+        info = future.result()
+        if name not in self._parsed:
+            self._parsed[name] = info
+    
+    def describe(self, name):
+        """
+        Return the member's type and size without inflating it, unless it
+        has already been parsed.
+        """
+        if name in self._parsed:
+            return self._parsed[name]
+        return {'type': sniff(b'', posixpath.basename(name)), 'size': self.view.info(name).file_size}
+    
+    @property
+    def parsed(self):
+        """Names of the members parsed so far."""
+        return list(self._parsed)
+    
+    def __repr__(self):
+        return f"<LazyMembers {self.view.names()!r}>"
@@ -0,0 +1,54 @@
+import bz2
+import gzip
+import lzma
+import os
+from .archive import GuardedReader
+
+# Single-file compression formats opened transparently, by sniffed type
+OPENERS = {
+    'gzip': lambda fileobj: gzip.GzipFile(fileobj=fileobj, mode='rb'),
+    'bz2': lambda fileobj: bz2.BZ2File(fileobj, mode='rb'),
+    'xz': lambda fileobj: lzma.LZMAFile(fileobj, mode='rb'),
+}
+
+SUFFIXES = {
+    'gzip': {'.gz': '', '.gzip': '', '.tgz': '.tar'},
+    'bz2': {'.bz2': '', '.tbz2': '.tar'},
+    'xz': {'.xz': '', '.txz': '.tar'},
+}
+
+
+def inner_name(name, kind):
+    """
+    Name of the file inside a compressed stream, e.g. apache_log.csv.gz ->
+    apache_log.csv.
+    """
+    root, ext = os.path.splitext(name)
+    replacement = SUFFIXES.get(kind, {}).get(ext.lower())
+    if replacement is None:
+        return name
+    return root + replacement
+
+
+def open_decompressed(kind, fileobj, budget=None, name=None, compressed_size=None):
+    """
+    Open a streaming decompressor over fileobj.
+    
+    Nothing is written to disk; the stream inflates as it is read. With a
+    budget, inflated bytes and the expansion ratio are charged as they are
+    produced, so a bomb aborts with ArchiveLimitExceeded mid-stream.
+    
+    Args:
+        kind (str): 'gzip', 'bz2' or 'xz'
+        fileobj: Binary file object over the compressed bytes
+        budget (ArchiveBudget, optional): Limits to enforce
+        name (str, optional): Reported in limit errors
+        compressed_size (int, optional): Enables the ratio check
+    
+    Returns:
+        Binary file object yielding the decompressed bytes
+    """
+    stream = OPENERS[kind](fileobj)
+    if budget is None:
+        return stream
+    return GuardedReader(stream, budget, name, compressed_size)
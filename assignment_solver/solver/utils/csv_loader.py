@@ -0,0 +1,292 @@
+import csv
+import io
+import logging
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from .upload import BufferReader
+
+logger = logging.getLogger(__name__)
+
+# Files above this many bytes are parsed chunk by chunk
+CHUNK_BYTES = 64 * 1024 * 1024
+CHUNK_ROWS = 250000
+
+# String columns with at most this share of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+
+# Files above this many bytes are split into ranges parsed on a process pool
+PARALLEL_BYTES = 128 * 1024 * 1024
+
+# Bytes scanned per step when aligning ranges to record ends
+SCAN_BYTES = 16 * 1024 * 1024
+
+# Encodings whose bytes the parsers can read without a decoded copy
+UTF8_ENCODINGS = {'utf-8', 'ascii'}
+
+_pyarrow = None
+
+
+def pyarrow_available():
+    """Return True if pandas can use the pyarrow CSV engine."""
+    global _pyarrow
+    
+    if _pyarrow is None:
+        try:
+            import pyarrow  # noqa: F401
+            _pyarrow = True
+        except ImportError:
+            logger.debug("pyarrow is not installed; CSVs are read with the C engine")
+            _pyarrow = False
+    return _pyarrow
+
+
+def read_header(text):
+    """Column names from the first record of CSV text."""
+    return next(csv.reader(io.StringIO(text[:64 * 1024])), [])
+
+
+def optimize(df, category_ratio=CATEGORY_RATIO):
+    """
+    Shrink the integer and string columns of a DataFrame.
+    
+    Integers are downcast to the smallest type that holds them; floats are
+    left at float64 so sums and means are unchanged. String columns with
+    few distinct values become categoricals.
+    
+    Args:
+        df (DataFrame): Frame to shrink; modified and returned
+        category_ratio (float): Largest distinct/rows share to categorize
+    
+    Returns:
+        DataFrame: The same frame
+    """
+    rows = len(df)
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_integer_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype):
+            df[column] = pd.to_numeric(series, downcast='integer')
+        elif (series.dtype == object or isinstance(series.dtype, pd.StringDtype)) and rows:
+            if series.nunique(dropna=False) <= max(1, rows * category_ratio):
+                df[column] = series.astype('category')
+    return df
+
+
+def _concat(frames):
+    """Concatenate optimized chunks, keeping categoricals categorical."""
+    if len(frames) == 1:
+        return frames[0]
+    data = {}
+    for column in frames[0].columns:
+        series = [frame[column] for frame in frames]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in series):
+            data[column] = pd.Series(union_categoricals(series, ignore_order=True), name=column)
+        else:
+            data[column] = pd.concat(
+                [part.astype(object) if isinstance(part.dtype, pd.CategoricalDtype) else part for part in series],
+                ignore_index=True,
+            )
+    return pd.DataFrame(data)
+
+
+def record_ends(data, targets):
+    """
+    For each target offset, the offset just past the first record end at
+    or after it.
+    
+    A newline ends a record only outside quotes, i.e. when an even number
+    of '"' bytes precede it ('""' escapes count twice, so they keep the
+    parity). The quote parity is a running XOR computed with NumPy one
+    SCAN_BYTES block at a time, so memory stays bounded however large or
+    heavily quoted the file is.
+    
+    Args:
+        data (bytes-like): UTF-8 or ASCII CSV bytes
+        targets (list): Byte offsets to align, ascending
+    
+    Returns:
+        list: Aligned offsets, len(data) where no record end follows
+    """
+    array = np.frombuffer(data, dtype=np.uint8)
+    size = len(array)
+    aligned = []
+    pending = list(targets)
+    parity = 0
+    for offset in range(0, size, SCAN_BYTES):
+        if not pending:
+            break
+        block = array[offset:offset + SCAN_BYTES]
+        inside = np.bitwise_xor.accumulate((block == ord('"')).astype(np.uint8)) ^ parity
+        parity = int(inside[-1])
+        ends = np.flatnonzero((block == ord('\n')) & (inside == 0)) + offset + 1
+        while pending and pending[0] < offset + len(block):
+            position = np.searchsorted(ends, pending[0])
+            if position == len(ends):
+                break
+            aligned.append(int(ends[position]))
+            pending.pop(0)
+    return aligned + [size] * len(pending)
+
+
+def split_ranges(data, parts):
+    """
+    Split CSV bytes into the header and up to `parts` record-aligned ranges.
+    
+    Returns:
+        tuple: (header_end, [(start, end), ...]) covering the records after
+            the header in order
+    """
+    size = len(data)
+    header_end = record_ends(data, [0])[0]
+    body = size - header_end
+    targets = [header_end + body * i // parts for i in range(1, parts)]
+    cuts = [header_end] + record_ends(data, targets) + [size]
+    ranges = [(start, end) for start, end in zip(cuts, cuts[1:]) if end > start]
+    return header_end, ranges
+
+
+def parse_range(path, start, end, names, usecols=None, dtype=None, category_ratio=CATEGORY_RATIO):
+    """
+    Parse the records in [start, end) of a CSV file; module-level so
+    process pools can run it.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    df = pd.read_csv(io.BytesIO(data), header=None, names=names, usecols=usecols, dtype=dtype, engine='c')
+    return optimize(df, category_ratio)
+
+
+def _kind(dtype):
+    """Coarse dtype family; ranges of one column must agree on it."""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return 'string'
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'bool'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return 'number'
+    return 'string'
+
+
+def read_parallel(path, executor, workers, usecols=None, category_ratio=CATEGORY_RATIO, data=None):
+    """
+    Parse a CSV file as record-aligned byte ranges on a process pool.
+    
+    Each worker reads and parses its own range and returns a compact
+    frame; the frames are concatenated in file order. Type inference runs
+    per range, so a column that reads as numbers in one range and text in
+    another is re-parsed as text in the numeric ranges, matching what a
+    single pass infers.
+    
+    Args:
+        path (str): CSV file on disk, UTF-8 or ASCII
+        executor (Executor): Pool to parse ranges on
+        workers (int): Ranges to split into
+        usecols (list, optional): Columns to keep
+        category_ratio (float): See optimize()
+        data (bytes-like, optional): The file's bytes, if already mapped
+    
+    Returns:
+        DataFrame: Same values as pd.read_csv(path, usecols=usecols)
+    """
+    if data is None:
+        with open(path, 'rb') as f:
+            data = f.read()
+    header_end, ranges = split_ranges(data, workers)
+    names = list(pd.read_csv(io.BytesIO(bytes(data[:header_end])), nrows=0).columns)
+    if not ranges:
+        return pd.read_csv(io.BytesIO(bytes(data[:header_end])), usecols=usecols)
+    
+    def submit(dtype=None):
+        return [
+            executor.submit(parse_range, path, start, end, names, usecols, dtype, category_ratio)
+            for start, end in ranges
+        ]
+    
+    futures = submit()
+    frames = [future.result() for future in futures]
+    
+    mixed = [
+        column for column in frames[0].columns
+        if len({_kind(frame[column].dtype) for frame in frames}) > 1
+    ]
+    if mixed:
+        logger.debug(f"Re-parsing columns {mixed} as text in ranges that inferred another type")
+        retry = {
+            i: executor.submit(parse_range, path, start, end, names, usecols, {column: str for column in mixed}, category_ratio)
+            for i, (start, end) in enumerate(ranges)
+            if any(_kind(frames[i][column].dtype) != 'string' for column in mixed)
+        }
+        for i, future in retry.items():
+            frames[i] = future.result()
+    return _concat(frames)
+
+
+def load_csv(text, raw=None, encoding='utf-8', columns=None, chunk_bytes=CHUNK_BYTES,
+             chunk_rows=CHUNK_ROWS, engine='auto', category_ratio=CATEGORY_RATIO,
+             path=None, executor=None, workers=1, parallel_bytes=PARALLEL_BYTES):
+    """
+    Parse CSV into a compact DataFrame, reading only the columns needed.
+    
+    UTF-8 files are parsed straight from their bytes; other encodings from
+    the already decoded text. Small files go through the pyarrow engine when
+    it is installed; files over chunk_bytes are parsed chunk_rows at a time
+    with the C engine and shrunk chunk by chunk, so peak memory is one raw
+    chunk plus the compact result.
+    
+    Args:
+        text (str): Decoded file contents
+        raw (bytes-like, optional): Original bytes, used if encoding is UTF-8
+        encoding (str): Encoding text was decoded with
+        columns (iterable, optional): Columns to keep; others are skipped
+            by the parser. Names missing from the header are ignored.
+        chunk_bytes (int): Size above which the file is read in chunks
+        chunk_rows (int): Rows per chunk
+        engine (str): 'auto', 'pyarrow' or 'c'
+        category_ratio (float): See optimize()
+        path (str, optional): The file on disk, for parallel parsing
+        executor (Executor, optional): Process pool for parallel parsing
+        workers (int): Byte ranges to split a parallel parse into
+        parallel_bytes (int): Size above which UTF-8 files on disk are
+            parsed in parallel, when an executor is given
+    
+    Returns:
+        tuple: (DataFrame, header) where header lists every column in the file
+    """
+    header = read_header(text)
+    usecols = None
+    if columns is not None:
+        wanted = set(columns)
+        # Without any wanted column the solver cannot answer and the
+        # prompt needs every column, so projecting would only cost a reread
+        usecols = [column for column in header if column in wanted] or None
+    
+    use_bytes = raw is not None and encoding in UTF8_ENCODINGS
+    size = len(raw) if use_bytes else len(text)
+    # Bytes are read in place through a BufferReader, never copied whole
+    source = (lambda: BufferReader(raw)) if use_bytes else (lambda: io.StringIO(text))
+    
+    if use_bytes and path and executor is not None and workers > 1 and size > parallel_bytes:
+        df = read_parallel(path, executor, workers, usecols, category_ratio, data=raw)
+    elif size > chunk_bytes:
+        reader = pd.read_csv(source(), usecols=usecols, chunksize=chunk_rows, engine='c')
+        frames = [optimize(chunk.reset_index(drop=True), category_ratio) for chunk in reader]
+        df = _concat(frames) if frames else pd.read_csv(source(), usecols=usecols)
+    else:
+        if engine == 'auto':
+            engine = 'pyarrow' if use_bytes and pyarrow_available() else 'c'
+        try:
+            df = pd.read_csv(source(), usecols=usecols, engine=engine)
+        except (ValueError, ImportError) as e:
+            if engine != 'pyarrow':
+                raise
+            # The pyarrow engine rejects some files the C engine accepts
+            logger.debug(f"pyarrow CSV engine failed ({str(e)}); retrying with the C engine")
+            df = pd.read_csv(source(), usecols=usecols, engine='c')
+        df = optimize(df, category_ratio)
+    return df, header
+
+
+def memory_usage(df):
+    """Deep memory footprint of a DataFrame in bytes."""
+    return int(np.sum(df.memory_usage(deep=True)))
@@ -0,0 +1,153 @@
+import codecs
+import logging
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# Byte order marks, longest first: UTF-32 LE starts with the UTF-16 LE mark
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Bytes handed to the statistical detectors; they slow down sharply beyond this
+SAMPLE_BYTES = 64 * 1024
+
+# Legacy default for undeclared Western text (as in the WHATWG Encoding
+# standard); wins ties between equally plausible single-byte code pages
+PREFERRED = 'cp1252'
+
+_detector = None
+
+
+class Decoded(NamedTuple):
+    text: str
+    encoding: str
+    method: str   # 'bom', 'utf-8', 'detected' or 'fallback'
+
+
+def _get_detector():
+    """
+    Return 'charset_normalizer', 'chardet' or False, whichever is installed.
+    """
+    global _detector
+    
+    if _detector is None:
+        _detector = False
+        for name in ('charset_normalizer', 'chardet'):
+            try:
+                __import__(name)
+                _detector = name
+                break
+            except ImportError:
+                continue
+        if not _detector:
+            logger.debug("Neither charset-normalizer nor chardet is installed; falling back to cp1252")
+    return _detector
+
+
+def _sample(data, size):
+    """Up to size leading bytes, trimmed back to a line end where possible."""
+    sample = bytes(data[:size])
+    if len(data) > size:
+        cut = sample.rfind(b'\n')
+        if cut > size // 2:
+            sample = sample[:cut + 1]
+    return sample
+
+
+def _decodes(sample, encoding):
+    try:
+        codecs.decode(sample, encoding)
+    except (UnicodeDecodeError, LookupError):
+        return False
+    return True
+
+
+def guess_encoding(sample):
+    """
+    Guess the encoding of a sample that is not valid UTF-8.
+    
+    charset-normalizer is preferred over chardet. cp1252 wins over
+    candidates the detector ranks as equally plausible, and over a pick
+    that decodes the sample to the same text: short Western samples (e.g.
+    a few '›' and 'œ' symbols) otherwise come back as cp1250 or cp850.
+    
+    Args:
+        sample (bytes): Leading bytes of the file
+    
+    Returns:
+        str or None: Python codec name, or None if nothing fits
+    """
+    detector = _get_detector()
+    if detector == 'charset_normalizer':
+        from charset_normalizer import from_bytes
+        matches = list(from_bytes(sample))
+        if not matches:
+            return None
+        best = matches[0]
+        for match in matches:
+            if match.percent_chaos > best.percent_chaos or match.percent_coherence < best.percent_coherence:
+                break
+            if codecs.lookup(match.encoding).name == PREFERRED:
+                return PREFERRED
+        try:
+            if str(best) == sample.decode(PREFERRED):
+                return PREFERRED
+        except UnicodeDecodeError:
+            pass
+        return best.encoding
+    
+    if detector == 'chardet':
+        import chardet
+        detected = chardet.detect(sample)
+        encoding = detected.get('encoding')
+        if encoding and detected.get('confidence', 0) >= 0.5:
+            return encoding
+        return PREFERRED if _decodes(sample, PREFERRED) else encoding
+    
+    return PREFERRED if _decodes(sample, PREFERRED) else None
+
+
+def decode_bytes(data, sample_bytes=SAMPLE_BYTES):
+    """
+    Decode a whole buffer, reading it once in the common cases.
+    
+    1. A byte order mark decides the encoding outright.
+    2. Otherwise the buffer is decoded as strict UTF-8, which succeeds for
+       most uploads and validates at memory speed.
+    3. Only then is a bounded sample given to charset-normalizer or
+       chardet, and the buffer decoded with their answer. If the guess
+       fails further in, the remainder is decoded with replacement
+       characters rather than re-trying other encodings.
+    
+    Args:
+        data (bytes-like): The file contents
+        sample_bytes (int): Bytes shown to the statistical detector
+    
+    Returns:
+        Decoded: Text, the codec used and how it was chosen
+    """
+    head = bytes(data[:4])
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return Decoded(str(data, encoding, 'replace'), encoding, 'bom')
+    
+    try:
+        return Decoded(str(data, 'utf-8'), 'utf-8', 'utf-8')
+    except UnicodeDecodeError:
+        pass
+    
+    encoding = guess_encoding(_sample(data, sample_bytes))
+    if encoding:
+        try:
+            return Decoded(str(data, encoding), encoding, 'detected')
+        except (UnicodeDecodeError, LookupError):
+            pass
+    
+    encoding = encoding if encoding and _decodes(b'', encoding) else PREFERRED
+    logger.info(f"Decoding with replacement characters as {encoding}")
+    return Decoded(str(data, encoding, 'replace'), encoding, 'fallback')
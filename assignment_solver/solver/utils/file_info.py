@@ -0,0 +1,135 @@
+import json
+from collections.abc import MutableMapping
+from .json_recovery import source_records
+from .json_stream import JSONStreamError, object_events, preview
+
+# Characters of text kept in previews
+TEXT_PREVIEW_CHARS = 10000
+JSON_PREVIEW_CHARS = 2000
+FRAME_PREVIEW_ROWS = 20
+
+
+def text_preview(text, limit=TEXT_PREVIEW_CHARS):
+    """Leading characters of text."""
+    return text[:limit]
+
+
+def frame_preview(df, rows=FRAME_PREVIEW_ROWS):
+    """First rows of a DataFrame as a table string."""
+    return df.head(rows).to_string()
+
+
+def json_preview(data, limit=JSON_PREVIEW_CHARS):
+    """
+    Indented JSON, cut at limit characters; encoding stops as soon as the
+    limit is reached instead of rendering the whole document first.
+    """
+    parts = []
+    length = 0
+    for part in json.JSONEncoder(indent=2).iterencode(data):
+        parts.append(part)
+        length += len(part)
+        if length >= limit:
+            break
+    return ''.join(parts)[:limit]
+
+
+def json_source_preview(source, limit=JSON_PREVIEW_CHARS):
+    """
+    Like json_preview, for a JSONSource; reads only as far as the limit.
+    Malformed documents are previewed from their salvaged records.
+    """
+    try:
+        return preview(source.events(), limit)
+    except JSONStreamError:
+        return preview(object_events((record for record, _ in source_records(source)), multiple=True), limit)
+
+
+def archive_manifest(archive):
+    """One 'name (size bytes)' line per archive member."""
+    return '\n'.join(f"{name} ({archive.info(name).file_size} bytes)" for name in archive.names())
+
+
+class FileInfo(MutableMapping):
+    """
+    Information extracted from a file, with dict-style access.
+    
+    path, name, type, size and data are slots; other keys live in a small
+    side dict. Derived values such as the 'content' preview are registered
+    with lazy() and only rendered the first time they are read, then kept,
+    so an upload no longer carries a stringified copy of itself that no
+    consumer asked for. Lazy values are module-level functions plus their
+    arguments, so FileInfo objects pickle for process pools.
+    """
+    __slots__ = ('path', 'name', 'type', 'size', 'data', '_fields', '_lazy')
+    
+    SLOTS = ('path', 'name', 'type', 'size', 'data')
+    
+    def __init__(self, path=None, name=None, type=None, size=None, data=None, content=None, **fields):
+        self.path = path
+        self.name = name
+        self.type = type
+        self.size = size
+        self.data = data
+        self._fields = {'content': content, **fields}
+        self._lazy = {}
+    
+    def lazy(self, key, function, *args):
+        """
+        Compute key as function(*args) when it is first read.
+        
+        Args:
+            key (str): Key to define
+            function (callable): Module-level function rendering the value
+            *args: Its arguments
+        """
+        self._fields.pop(key, None)
+        self._lazy[key] = (function, args)
+    
+    def __getitem__(self, key):
+        if key in self.SLOTS:
+            return getattr(self, key)
+        try:
+            return self._fields[key]
+        except KeyError:
+            pending = self._lazy.get(key)
+            if pending is None:
+                raise
+        function, args = pending
+        value = self._fields[key] = function(*args)
+        self._lazy.pop(key, None)
+        return value
+    
+    def __setitem__(self, key, value):
+        if key in self.SLOTS:
+            setattr(self, key, value)
+        else:
+            self._lazy.pop(key, None)
+            self._fields[key] = value
+    
+    def __delitem__(self, key):
+        if key in self.SLOTS:
+            setattr(self, key, None)
+        elif key in self._lazy:
+            del self._lazy[key]
+        else:
+            del self._fields[key]
+    
+    def __contains__(self, key):
+        return key in self.SLOTS or key in self._fields or key in self._lazy
+    
+    def __iter__(self):
+        yield from self.SLOTS
+        yield from self._fields
+        yield from (key for key in list(self._lazy) if key not in self._fields)
+    
+    def __len__(self):
+        return len(self.SLOTS) + len(self._fields) + len(self._lazy)
+    
+    def is_rendered(self, key):
+        """True unless key is a lazy value that has not been read yet."""
+        return key not in self._lazy
+    
+    def __repr__(self):
+        # Never render data or previews here; they can be very large
+        return f"FileInfo(name={self.name!r}, type={self.type!r}, size={self.size!r}, keys={list(self)})"
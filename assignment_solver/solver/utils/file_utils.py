@@ -1,8 +1,30 @@
 import os
-import zipfile
+import stat
 
-def extract_zip(zip_path, extract_to):
-    """Extract a ZIP file to a directory"""
-    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(extract_to)
-    return extract_to
\ No newline at end of file
+def private_directory(path):
+    """
+    Create path as a directory only the current user can use, or check that
+    an existing one is.
+    
+    Caches that load back what they find on disk must not share a directory
+    other local users can write to.
+    
+    Args:
+        path (str): Directory to create or check
+    
+    Returns:
+        str: path
+    
+    Raises:
+        PermissionError: If path is a symlink, owned by someone else, or
+            open to group or other users
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"{path} is not a directory")
+    if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by another user")
+    if hasattr(os, 'getuid') and info.st_mode & 0o077:
+        raise PermissionError(f"{path} is accessible to other users (mode {info.st_mode & 0o777:o})")
+    return path
\ No newline at end of file
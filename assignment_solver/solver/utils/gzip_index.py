@@ -0,0 +1,276 @@
+import calendar
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import zlib
+from typing import NamedTuple, Optional
+from .file_utils import private_directory
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes; stale indexes are rebuilt
+INDEX_VERSION = 1
+
+# Uncompressed bytes per frame
+DEFAULT_SPAN = 8 * 1024 * 1024
+
+READ_CHUNK = 1024 * 1024
+
+# Temporary files left behind by a crashed builder are removed after this
+STALE_SECONDS = 3600
+
+# Access log timestamps, to the hour: [dd/Mon/yyyy:HH ...:MM:SS +zzzz]
+HOUR_STAMP = re.compile(rb'\[(\d{2})/(\w{3})/(\d{4}):(\d{2}):\d{2}:\d{2} ([+-])(\d{2})(\d{2})\]')
+MONTHS = {name.encode(): number for number, name in enumerate(calendar.month_abbr) if name}
+
+
+class Frame(NamedTuple):
+    """One independently decompressible slice of the framed file."""
+    offset: int                   # Byte offset of the gzip member in the framed file
+    length: int                   # Compressed length of the member
+    start: int                    # Offset of its first byte in the uncompressed stream
+    size: int                     # Uncompressed length, always whole lines
+    first: Optional[int] = None   # Earliest access log hour in the frame, UTC epoch seconds
+    last: Optional[int] = None    # End of the latest hour, UTC epoch seconds
+
+
+def hour_bounds(text):
+    """
+    UTC (start, end) epoch seconds covering every access log timestamp in
+    text, rounded out to whole hours, or (None, None) if there are none.
+    
+    Only distinct hour stamps are converted, so this stays cheap on
+    megabytes of log lines.
+    """
+    hours = []
+    for day, month, year, hour, sign, zone_h, zone_m in set(HOUR_STAMP.findall(text)):
+        if month not in MONTHS:
+            continue
+        local = calendar.timegm((int(year), MONTHS[month], int(day), int(hour), 0, 0))
+        offset = (int(zone_h) * 60 + int(zone_m)) * 60
+        hours.append(local + offset if sign == b'-' else local - offset)
+    if not hours:
+        return None, None
+    return min(hours), max(hours) + 3600
+
+
+def read_frame(path, offset, length):
+    """
+    Decompress one frame; module-level so process pools can run it.
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return zlib.decompress(f.read(length), wbits=31)
+
+
+class GzipIndex:
+    """
+    Random-access copy of a gzip stream, split into checkpointed frames.
+    
+    Python's zlib cannot resume inflating at an arbitrary bit offset, so
+    instead of zran-style window checkpoints the stream is re-framed once:
+    the inflated bytes are cut at line boundaries every `span` bytes and
+    each piece is written as its own gzip member (as bgzip does). The
+    result is still one valid gzip file, and any frame can be inflated on
+    its own, so frames are parsed concurrently and time-filtered queries
+    only inflate the frames whose hour range overlaps.
+    """
+    def __init__(self, path, frames):
+        self.path = path
+        self.frames = frames
+    
+    @property
+    def size(self):
+        """Total uncompressed size."""
+        return sum(frame.size for frame in self.frames)
+    
+    def read(self, frame):
+        return read_frame(self.path, frame.offset, frame.length)
+    
+    def head(self, n):
+        """First n uncompressed bytes."""
+        return self.read(self.frames[0])[:n] if self.frames else b''
+    
+    def select(self, start=None, end=None):
+        """
+        Frames that may hold requests in [start, end), in stream order.
+        
+        Args:
+            start (int, optional): UTC epoch seconds, inclusive
+            end (int, optional): UTC epoch seconds, exclusive
+        
+        Returns:
+            list: Frames; those without timestamps are always included
+        """
+        return [
+            frame for frame in self.frames
+            if frame.first is None
+            or ((start is None or frame.last > start) and (end is None or frame.first < end))
+        ]
+    
+    @classmethod
+    def build(cls, stream, path, span=DEFAULT_SPAN, level=1):
+        """
+        Re-frame a decompressed stream into path and index it.
+        
+        Args:
+            stream: Binary file object yielding the uncompressed bytes
+            path (str): Where to write the framed gzip file
+            span (int): Target uncompressed bytes per frame
+            level (int): zlib compression level for the frames
+        
+        Returns:
+            GzipIndex: Index over the new file
+        """
+        frames = []
+        pending = bytearray()
+        start = 0
+        
+        with open(path, 'wb') as out:
+            def flush(piece):
+                nonlocal start
+                data = zlib.compressobj(level, zlib.DEFLATED, 31)
+                member = data.compress(piece) + data.flush()
+                first, last = hour_bounds(piece)
+                frames.append(Frame(out.tell(), len(member), start, len(piece), first, last))
+                out.write(member)
+                start += len(piece)
+            
+            while True:
+                chunk = stream.read(READ_CHUNK)
+                if chunk:
+                    pending += chunk
+                while len(pending) >= span or (not chunk and pending):
+                    cut = pending.rfind(b'\n', 0, span) + 1 if chunk else len(pending)
+                    if cut <= 0:
+                        # A line longer than the span; keep it whole
+                        cut = pending.find(b'\n', span) + 1 or len(pending)
+                    flush(bytes(pending[:cut]))
+                    del pending[:cut]
+                if not chunk:
+                    break
+        return cls(path, frames)
+    
+    def save(self, path):
+        """Write the frame table next to the data as JSON."""
+        with open(path, 'w') as f:
+            json.dump({'version': INDEX_VERSION, 'frames': [list(frame) for frame in self.frames]}, f)
+    
+    @classmethod
+    def load(cls, data_path, index_path):
+        with open(index_path) as f:
+            stored = json.load(f)
+        if stored.get('version') != INDEX_VERSION or not os.path.exists(data_path):
+            return None
+        return cls(data_path, [Frame(*frame) for frame in stored['frames']])
+
+
+def open_or_build(digest, open_stream, directory, span=DEFAULT_SPAN, max_bytes=None):
+    """
+    Return the cached index for a gzip upload, building it on first use.
+    
+    Indexes are stored as <digest>.gz (framed data) and <digest>.json
+    (frame table) under directory, so every worker and every later upload
+    of the same bytes reuses them. Both files are written to temporary
+    names and renamed into place, so concurrent builders never expose a
+    partial index. Hits refresh an index's mtime, and after a build the
+    least recently used indexes are deleted until the directory fits in
+    max_bytes.
+    
+    Args:
+        digest (str): SHA-256 of the compressed upload
+        open_stream (callable): Returns a binary stream of the decompressed
+            bytes; only called when the index has to be built
+        directory (str): Cache directory, private to this user (see
+            private_directory)
+        span (int): Uncompressed bytes per frame
+        max_bytes (int, optional): Size cap for the directory
+    
+    Returns:
+        GzipIndex: Index over the framed copy
+    
+    Raises:
+        PermissionError: If directory is not private
+    """
+    private_directory(directory)
+    data_path = os.path.join(directory, f"{digest}.gz")
+    index_path = os.path.join(directory, f"{digest}.json")
+    if os.path.exists(index_path):
+        try:
+            index = GzipIndex.load(data_path, index_path)
+            if index is not None:
+                os.utime(index_path)
+                return index
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable gzip index {index_path}: {str(e)}")
+    
+    fd, tmp_data = tempfile.mkstemp(dir=directory, suffix='.gz.tmp')
+    os.close(fd)
+    tmp_index = tmp_data[:-len('.gz.tmp')] + '.json.tmp'
+    try:
+        with open_stream() as stream:
+            index = GzipIndex.build(stream, tmp_data, span)
+        index.save(tmp_index)
+        os.replace(tmp_data, data_path)
+        os.replace(tmp_index, index_path)
+    finally:
+        for leftover in (tmp_data, tmp_index):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    index.path = data_path
+    if max_bytes is not None:
+        evict(directory, max_bytes, keep=digest)
+    return index
+
+
+def evict(directory, max_bytes, keep=None):
+    """
+    Delete least recently used indexes until directory fits in max_bytes.
+    
+    An index counts as used when its frame table was last loaded (its
+    mtime). Temporary files older than STALE_SECONDS are removed too.
+    
+    Args:
+        directory (str): Cache directory
+        max_bytes (int): Size cap
+        keep (str, optional): Digest never evicted, e.g. the index just built
+    """
+    entries = {}
+    now = time.time()
+    for entry in os.scandir(directory):
+        try:
+            info = entry.stat()
+        except FileNotFoundError:
+            continue
+        if entry.name.endswith('.tmp'):
+            if info.st_mtime < now - STALE_SECONDS:
+                _remove(entry.path)
+            continue
+        digest, ext = os.path.splitext(entry.name)
+        if ext not in ('.gz', '.json'):
+            continue
+        used, size = entries.get(digest, (0.0, 0))
+        if ext == '.json':
+            used = info.st_mtime
+        entries[digest] = (used, size + info.st_size)
+    
+    total = sum(size for _, size in entries.values())
+    for used, size, digest in sorted((used, size, digest) for digest, (used, size) in entries.items()):
+        if total <= max_bytes:
+            break
+        if digest == keep:
+            continue
+        # The frame table goes first, so a half-evicted index reads as a miss
+        _remove(os.path.join(directory, f"{digest}.json"))
+        _remove(os.path.join(directory, f"{digest}.gz"))
+        total -= size
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
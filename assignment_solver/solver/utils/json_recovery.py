@@ -0,0 +1,298 @@
+import json
+from typing import NamedTuple
+from .json_stream import (
+    COLON, COMMA, FIRST_KEY, FIRST_VALUE, KEY, LITERALS, NUMBER_TAIL, TOKEN, VALUE, partial_token, text_chunks,
+)
+
+# Damaged records listed in a summary; later ones are only counted
+MAX_DAMAGED = 100
+
+# Records a summary keeps as a sample
+SAMPLE_RECORDS = 20
+
+# Separators and array brackets allowed between records
+BETWEEN = ' \t\r\n,[]'
+
+DECODER = json.JSONDecoder()
+
+
+class Damage(NamedTuple):
+    """Where a record broke and why; line is 1-based, offset in characters."""
+    record: int
+    line: int
+    offset: int
+    reason: str
+
+
+class RecordRecovery:
+    """
+    Salvages the records of malformed or truncated JSON, fed in chunks.
+    
+    Records are the objects of an NDJSON file or of a top-level array.
+    Each is decoded by the json module when it is intact; otherwise it is
+    rebuilt token by token, with json_stream's grammar, keeping every field
+    whose value was complete when the record broke (a record cut off in
+    its 'id' keeps its 'sales'). A number the stream ends in may itself
+    have been cut short, so it is dropped.
+    After a break, scanning resumes at the next line that can start a
+    record. Only the unfinished token at the end of a chunk is carried
+    over, so memory is bounded by the largest record.
+    """
+    def __init__(self):
+        self.records = 0
+        self._buffer = ''
+        self._offset = 0
+        self._line = 1
+        self._line_pos = 0
+        self._stack = None
+        self._state = None
+        self._record = None
+        self._record_start = -1
+        self._record_line = 0
+        self._resume = 0
+        self._skipping = False
+    
+    def feed(self, text):
+        """
+        Yield (record, damage) for each record text completes; damage is
+        None for intact records. Exhaust before feeding more text.
+        """
+        self._buffer += text
+        return self._scan(final=False)
+    
+    def close(self):
+        """Finish the stream; a record still open is reported as truncated."""
+        yield from self._scan(final=True)
+        if self._stack:
+            yield self._broken("Truncated record", len(self._buffer))
+        self._buffer = ''
+    
+    def _line_at(self, pos):
+        """1-based line number of buffer position pos (moving forward only)."""
+        self._line += self._buffer.count('\n', self._line_pos, pos)
+        self._line_pos = pos
+        return self._line
+    
+    def _scan(self, final):
+        buffer = self._buffer
+        end = len(buffer)
+        pos = 0
+        while pos < end:
+            if self._skipping:
+                newline = buffer.find('\n', pos)
+                if newline < 0:
+                    pos = end
+                    break
+                pos = newline + 1
+                self._skipping = False
+            
+            if self._stack is None:
+                # Between records
+                while pos < end and buffer[pos] in BETWEEN:
+                    pos += 1
+                if pos == end:
+                    break
+                if buffer[pos] != '{':
+                    # Not a record: skip the rest of the line
+                    self._skipping = True
+                    continue
+                try:
+                    record, after = DECODER.raw_decode(buffer, pos)
+                except ValueError:
+                    # Cut by the chunk end, or damaged: rebuild it token by token
+                    self._record_line = self._line_at(pos)
+                    self._stack = [[{}, None]]
+                    self._state = FIRST_KEY
+                    self._record_start = pos
+                    pos += 1
+                else:
+                    self.records += 1
+                    yield record, None
+                    pos = after
+                continue
+            
+            match = TOKEN.match(buffer, pos)
+            if match is None:
+                rest = buffer[pos:].lstrip(' \t\r\n')
+                if not rest or not final and partial_token(rest):
+                    break
+                if rest[0] == '"':
+                    reason = "Unterminated string"
+                else:
+                    reason = "Unexpected " + repr(rest.split('\n', 1)[0][:20])
+                yield from self._recover(end - len(rest), reason)
+                pos = self._resume
+                continue
+            if match.lastindex >= 3 and NUMBER_TAIL.fullmatch(buffer, match.end()):
+                if not final:
+                    # A number or literal running to the end of the chunk may continue
+                    break
+                if match.group(3) is not None:
+                    # The stream ends inside this number, which may be cut short;
+                    # close() reports the record as truncated without it
+                    break
+            
+            error = self._token(match)
+            if error:
+                token = match.group(0).lstrip(' \t\r\n')
+                yield from self._recover(match.end() - len(token), error)
+                pos = self._resume
+                continue
+            pos = match.end()
+            if not self._stack:
+                self._stack = None
+                self.records += 1
+                yield self._record, None
+        
+        self._line_at(pos)
+        self._line_pos = 0
+        self._record_start = -1
+        self._buffer = buffer[pos:]
+        self._offset += pos
+    
+    def _token(self, match):
+        """Apply one token to the record being rebuilt; return an error or None."""
+        stack = self._stack
+        state = self._state
+        punct = match.group(1)
+        if punct is None:
+            if match.group(2) is not None:
+                value = match.group(2)
+                if '\\' in value:
+                    try:
+                        value = json.loads(f'"{value}"')
+                    except ValueError:
+                        return "Invalid escape"
+                if state == KEY or state == FIRST_KEY:
+                    stack[-1][1] = value
+                    self._state = COLON
+                    return None
+            elif match.group(3) is not None:
+                number = match.group(3)
+                value = float(number) if match.group(4) or match.group(5) else int(number)
+            else:
+                value = LITERALS[match.group(6)][1]
+            if state != VALUE and state != FIRST_VALUE:
+                return "Unexpected " + repr(match.group(0).strip())
+            self._add(value)
+        elif punct in '{[':
+            if state != VALUE and state != FIRST_VALUE:
+                return f"Unexpected {punct!r}"
+            stack.append([{} if punct == '{' else [], None])
+            self._state = FIRST_KEY if punct == '{' else FIRST_VALUE
+        elif punct in '}]':
+            container = stack[-1][0]
+            closable = (FIRST_KEY, COMMA) if isinstance(container, dict) else (FIRST_VALUE, COMMA)
+            if (punct == '}') != isinstance(container, dict) or state not in closable:
+                return f"Unexpected {punct!r}"
+            stack.pop()
+            if stack:
+                self._add(container)
+            else:
+                self._record = container
+        elif punct == ':':
+            if state != COLON:
+                return "Unexpected ':'"
+            self._state = VALUE
+        else:
+            if state != COMMA:
+                return "Unexpected ','"
+            self._state = KEY if isinstance(stack[-1][0], dict) else VALUE
+        return None
+    
+    def _add(self, value):
+        """Store a complete value in the innermost open container."""
+        container, key = self._stack[-1]
+        if isinstance(container, dict):
+            container[key] = value
+        else:
+            container.append(value)
+        self._state = COMMA
+    
+    def _broken(self, reason, pos):
+        """The salvaged part of the open record, with its damage report."""
+        record = self._stack[0][0]
+        damage = Damage(self.records, self._record_line, self._offset + pos, reason)
+        self.records += 1
+        self._stack = None
+        return record, damage
+    
+    def _recover(self, pos, reason):
+        """
+        Report the open record as damaged at pos and choose where to resume:
+        the start of pos's line if the record began on an earlier line (that
+        line may hold the next record), else the line after.
+        """
+        yield self._broken(reason, pos)
+        # A record carried over from an earlier chunk began before the buffer
+        line_start = self._buffer.rfind('\n', max(self._record_start, 0), pos)
+        if line_start >= 0:
+            self._resume = line_start + 1
+        else:
+            self._resume = pos
+            self._skipping = True
+
+
+def recover_records(chunks):
+    """
+    Salvage records from text chunks of malformed JSON or NDJSON.
+    
+    Yields:
+        tuple: (record, damage), damage being None for intact records
+    """
+    recovery = RecordRecovery()
+    for chunk in chunks:
+        yield from recovery.feed(chunk)
+    yield from recovery.close()
+
+
+def source_records(source):
+    """Salvage (record, damage) pairs from a malformed JSONSource."""
+    return recover_records(text_chunks(source.blocks()))
+
+
+def tally(pairs, summary):
+    """Pass salvaged records through, adding each to summary on the way."""
+    for record, damage in pairs:
+        summary.add(record, damage)
+        yield record
+
+
+class RecoverySummary:
+    """
+    Totals over salvaged records, accumulated in the same pass.
+    
+    Numeric top-level fields are summed and counted; damaged records are
+    listed (up to max_damaged) with the fields they kept.
+    """
+    def __init__(self, max_damaged=MAX_DAMAGED, sample_records=SAMPLE_RECORDS):
+        self.max_damaged = max_damaged
+        self.sample_records = sample_records
+        self.records = 0
+        self.damaged_count = 0
+        self.damaged = []
+        self.totals = {}
+        self.counts = {}
+        self.sample = []
+    
+    def add(self, record, damage=None):
+        self.records += 1
+        if len(self.sample) < self.sample_records:
+            self.sample.append(record)
+        if damage is not None:
+            self.damaged_count += 1
+            if len(self.damaged) < self.max_damaged:
+                self.damaged.append(dict(damage._asdict(), kept=list(record)))
+        for field, value in record.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.totals[field] = self.totals.get(field, 0) + value
+                self.counts[field] = self.counts.get(field, 0) + 1
+    
+    def as_dict(self):
+        return {
+            'records': self.records,
+            'damaged_count': self.damaged_count,
+            'damaged': self.damaged,
+            'totals': self.totals,
+            'counts': self.counts,
+        }
@@ -0,0 +1,428 @@
+import codecs
+import json
+import math
+import re
+
+# Bytes read and tokenized per step
+CHUNK_BYTES = 1024 * 1024
+
+# Distinct paths list_paths keeps before it stops adding new ones
+MAX_PATHS = 1000
+
+# Strings may not contain raw control characters (RFC 8259), so a string
+# cut off at the end of a line never swallows the lines after it
+TOKEN = re.compile(r'''[ \t\r\n]*(?:
+    ([{}\[\],:])                                        # 1: punctuation
+  | "([^"\\\x00-\x1f]*(?:\\.[^"\\\x00-\x1f]*)*)"        # 2: string body
+  | (-?(?:0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?)           # 3: number, 4: fraction, 5: exponent
+  | (true|false|null)                                   # 6: literal
+)''', re.VERBOSE | re.DOTALL)
+
+# What may follow a number that was cut off by the end of a chunk
+NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+
+# The start of a string that more text could still complete
+OPEN_STRING = re.compile(r'"[^"\\\x00-\x1f]*(?:\\.[^"\\\x00-\x1f]*)*\\?')
+
+LITERALS = {'true': ('boolean', True), 'false': ('boolean', False), 'null': ('null', None)}
+
+# Parser states: what the next token may be
+VALUE, FIRST_VALUE, KEY, FIRST_KEY, COLON, COMMA = range(6)
+
+
+class Pairs(list):
+    """An object decoded as its (key, value) pairs, keeping duplicate keys."""
+    __slots__ = ()
+
+
+def _reject_constant(name):
+    raise ValueError(f"{name} is not valid JSON")
+
+
+# C-accelerated decoder for values that fit in the buffer
+DECODER = json.JSONDecoder(object_pairs_hook=Pairs, parse_constant=_reject_constant)
+
+
+class JSONStreamError(ValueError):
+    """Malformed JSON, with the character offset of the problem."""
+    def __init__(self, message, position):
+        super().__init__(f"{message} at character {position}")
+        self.position = position
+
+
+def text_chunks(blocks):
+    """
+    Decode byte blocks incrementally.
+    
+    JSON is UTF-8 (RFC 8259); a leading BOM is skipped and invalid bytes
+    are replaced rather than failing the scan.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    for block in blocks:
+        yield decoder.decode(block)
+    yield decoder.decode(b'', final=True)
+
+
+def partial_token(rest):
+    """True if rest could be the start of a token cut off by the chunk end."""
+    if rest[0] == '"':
+        return OPEN_STRING.fullmatch(rest) is not None
+    if rest[0] in 'tfn':
+        return any(literal.startswith(rest) for literal in LITERALS)
+    return rest == '-'
+
+
+def decode_values(text):
+    """
+    Parse every top-level value in text (NDJSON, JSON Lines, or documents
+    simply placed one after another).
+    
+    Returns:
+        list: The parsed values, in order
+    """
+    decoder = json.JSONDecoder()
+    values = []
+    pos = 0
+    end = len(text)
+    while True:
+        while pos < end and text[pos] in ' \t\r\n':
+            pos += 1
+        if pos == end:
+            return values
+        value, pos = decoder.raw_decode(text, pos)
+        values.append(value)
+
+
+class JSONTokenizer:
+    """
+    Incremental JSON parser producing ijson-style events.
+    
+    Text is fed in chunks of any size; only the unfinished token at the
+    end of a chunk is carried over, so memory is bounded by the longest
+    single token, not the document. Several top-level values (NDJSON, or
+    any whitespace-separated stream of documents) are accepted.
+    
+    Events are (event, value) pairs: start_map, map_key, end_map,
+    start_array, end_array, string, number, boolean and null. While an
+    event is handled, path holds the keys and array indices leading to
+    it; the list is updated in place, so copy it to keep it.
+    
+    Objects and arrays that are complete in the buffer are decoded by the
+    json module's C scanner and replayed as events; the token-by-token
+    scanner only walks containers cut by a chunk boundary (or malformed),
+    so typical documents stream at close to json.loads speed.
+    """
+    def __init__(self):
+        self.path = []
+        self._stack = []
+        self._state = VALUE
+        self._buffer = ''
+        self._offset = 0
+        self.values = 0
+    
+    def feed(self, text):
+        """
+        Tokenize text, yielding the events it completes.
+        
+        Exhaust the generator before feeding more text.
+        """
+        self._buffer += text
+        return self._scan(final=False)
+    
+    def close(self):
+        """
+        Finish the stream, yielding the last events; raises
+        JSONStreamError if the document is incomplete.
+        """
+        yield from self._scan(final=True)
+        if self._stack or self._state != VALUE:
+            raise JSONStreamError("Unexpected end of JSON", self._offset)
+    
+    def _scan(self, final):
+        buffer = self._buffer
+        end = len(buffer)
+        path = self.path
+        stack = self._stack
+        pos = 0
+        while True:
+            match = TOKEN.match(buffer, pos)
+            if match is None:
+                # Unfinished token, or an error
+                rest = buffer[pos:].lstrip(' \t\r\n')
+                if rest and (final or not partial_token(rest)):
+                    self._fail(f"Unexpected {rest[:20]!r}", end - len(rest))
+                break
+            if not final and match.lastindex >= 3 and NUMBER_TAIL.fullmatch(buffer, match.end()):
+                # A number or literal running to the end of the chunk may continue
+                break
+            pos = match.end()
+            state = self._state
+            punct = match.group(1)
+            
+            if punct is None:
+                string = match.group(2)
+                if string is not None:
+                    if '\\' in string:
+                        string = json.loads(f'"{string}"')
+                    if state == KEY or state == FIRST_KEY:
+                        path[-1] = string
+                        self._state = COLON
+                        yield 'map_key', string
+                        continue
+                    event = ('string', string)
+                elif match.group(3) is not None:
+                    number = match.group(3)
+                    event = ('number', float(number) if match.group(4) or match.group(5) else int(number))
+                else:
+                    event = LITERALS[match.group(6)]
+                if state != VALUE and state != FIRST_VALUE:
+                    token = match.group(0).lstrip(' \t\r\n')
+                    self._fail(f"Unexpected {token!r}", pos - len(token))
+                if stack and stack[-1] == '[':
+                    path[-1] += 1
+                yield event
+                self._end_value()
+            
+            elif punct == '{' or punct == '[':
+                if state != VALUE and state != FIRST_VALUE:
+                    self._fail(f"Unexpected {punct!r}", match.start(1))
+                if stack and stack[-1] == '[':
+                    path[-1] += 1
+                try:
+                    value, pos = DECODER.raw_decode(buffer, match.start(1))
+                except ValueError:
+                    # Runs past the buffer, or is malformed: walk it token by token
+                    pass
+                else:
+                    yield from _walk(value, path)
+                    self._end_value()
+                    continue
+                yield ('start_map' if punct == '{' else 'start_array'), None
+                stack.append(punct)
+                path.append(None if punct == '{' else -1)
+                self._state = FIRST_KEY if punct == '{' else FIRST_VALUE
+            
+            elif punct == '}' or punct == ']':
+                opener = '{' if punct == '}' else '['
+                closable = (FIRST_KEY, COMMA) if opener == '{' else (FIRST_VALUE, COMMA)
+                if not stack or stack[-1] != opener or state not in closable:
+                    self._fail(f"Unexpected {punct!r}", match.start(1))
+                stack.pop()
+                path.pop()
+                yield ('end_map' if punct == '}' else 'end_array'), None
+                self._end_value()
+            
+            elif punct == ':':
+                if state != COLON:
+                    self._fail("Unexpected ':'", match.start(1))
+                self._state = VALUE
+            
+            else:
+                if state != COMMA:
+                    self._fail("Unexpected ','", match.start(1))
+                self._state = KEY if stack[-1] == '{' else VALUE
+        
+        self._buffer = buffer[pos:]
+        self._offset += pos
+    
+    def _fail(self, message, index):
+        raise JSONStreamError(message, self._offset + index)
+    
+    def _end_value(self):
+        if self._stack:
+            self._state = COMMA
+        else:
+            # A complete top-level value; another may follow
+            self.values += 1
+            self._state = VALUE
+
+
+def _walk(value, path):
+    """Yield the (event, value) pairs of a decoded value, maintaining path."""
+    if isinstance(value, Pairs) or isinstance(value, dict):
+        yield 'start_map', None
+        path.append(None)
+        for key, item in (value if isinstance(value, Pairs) else value.items()):
+            path[-1] = key
+            yield 'map_key', key
+            if isinstance(item, (list, dict)):
+                yield from _walk(item, path)
+            else:
+                yield _scalar(item)
+        path.pop()
+        yield 'end_map', None
+    elif isinstance(value, list):
+        yield 'start_array', None
+        path.append(-1)
+        for item in value:
+            path[-1] += 1
+            if isinstance(item, (list, dict)):
+                yield from _walk(item, path)
+            else:
+                yield _scalar(item)
+        path.pop()
+        yield 'end_array', None
+    else:
+        yield _scalar(value)
+
+
+def _scalar(value):
+    if isinstance(value, str):
+        return 'string', value
+    if value is None:
+        return 'null', None
+    if value is True or value is False:
+        return 'boolean', value
+    return 'number', value
+
+
+def events(chunks):
+    """
+    Parse text chunks into (path, event, value) triples.
+    
+    path is the tokenizer's live list (see JSONTokenizer).
+    """
+    tokenizer = JSONTokenizer()
+    path = tokenizer.path
+    for chunk in chunks:
+        for event, value in tokenizer.feed(chunk):
+            yield path, event, value
+    for event, value in tokenizer.close():
+        yield path, event, value
+
+
+def object_events(value, multiple=False):
+    """
+    Produce the events of an already parsed value, so the same queries
+    run on small documents held in memory.
+    
+    Args:
+        value: Parsed JSON
+        multiple (bool): value is a list of top-level documents (NDJSON)
+    """
+    path = []
+    for document in (value if multiple else [value]):
+        for event, item in _walk(document, path):
+            yield path, event, item
+
+
+def count_keys(stream, name):
+    """Count how often name occurs as an object key (values are not counted)."""
+    return sum(1 for _, event, value in stream if event == 'map_key' and value == name)
+
+
+def sum_field(stream, name):
+    """
+    Sum the numbers stored under key name, at any depth.
+    
+    Integers are added exactly and floats with math.fsum, so the total
+    does not depend on the order of the values.
+    
+    Returns:
+        tuple: (total, count of numbers summed); total is an int unless
+            a float was summed
+    """
+    integers = 0
+    count = 0
+    seen_float = False
+    
+    def floats():
+        nonlocal integers, count, seen_float
+        for path, event, value in stream:
+            if event == 'number' and path and path[-1] == name:
+                count += 1
+                if isinstance(value, int):
+                    integers += value
+                else:
+                    seen_float = True
+                    yield value
+    
+    fractional = math.fsum(floats())
+    return (integers + fractional if seen_float else integers), count
+
+
+def list_paths(stream, limit=MAX_PATHS):
+    """
+    Count values by path, with array indices collapsed to [].
+    
+    Returns:
+        dict: Path (e.g. '.logs[].user.id') to occurrences, in order of
+            first appearance; at most limit distinct paths are kept
+    """
+    counts = {}
+    for path, event, _ in stream:
+        if event in ('map_key', 'end_map', 'end_array'):
+            continue
+        key = ''.join(f'.{part}' if isinstance(part, str) else '[]' for part in path) or '.'
+        if key in counts:
+            counts[key] += 1
+        elif len(counts) < limit:
+            counts[key] = 1
+    return counts
+
+
+def preview(stream, limit):
+    """
+    Render the stream as indented JSON, stopping at limit characters.
+    
+    The output matches json.dumps(value, indent=2)[:limit]; documents of
+    a multi-value stream are separated by newlines.
+    """
+    parts = []
+    length = 0
+    counts = []
+    after_key = False
+    for _, event, value in stream:
+        if event == 'end_map' or event == 'end_array':
+            count = counts.pop()
+            close = '}' if event == 'end_map' else ']'
+            part = '\n' + '  ' * len(counts) + close if count else close
+        else:
+            if after_key:
+                part = ''
+                after_key = False
+            elif counts:
+                part = (',\n' if counts[-1] else '\n') + '  ' * len(counts)
+                counts[-1] += 1
+            else:
+                part = '\n' if parts else ''
+            if event == 'map_key':
+                part += json.dumps(value) + ': '
+                after_key = True
+            elif event == 'start_map' or event == 'start_array':
+                part += '{' if event == 'start_map' else '['
+                counts.append(0)
+            else:
+                part += json.dumps(value)
+        parts.append(part)
+        length += len(part)
+        if length >= limit:
+            break
+    return ''.join(parts)[:limit]
+
+
+class JSONSource:
+    """
+    A JSON or NDJSON document too large to hold as objects, read in
+    chunks by every query that needs it.
+    
+    Reads from a file when there is one, so the source stays usable after
+    the upload's buffer is released; otherwise from a bytes object.
+    """
+    def __init__(self, path=None, data=None):
+        self.path = path
+        self.data = data
+    
+    def blocks(self, size=CHUNK_BYTES):
+        """Yield the raw bytes, size at a time."""
+        if self.path is not None:
+            with open(self.path, 'rb') as f:
+                yield from iter(lambda: f.read(size), b'')
+        else:
+            view = memoryview(self.data)
+            for start in range(0, len(view), size):
+                yield view[start:start + size]
+    
+    def events(self):
+        """Stream (path, event, value) triples over the whole document."""
+        return events(text_chunks(self.blocks()))
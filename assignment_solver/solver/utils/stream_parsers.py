@@ -0,0 +1,131 @@
+import codecs
+import csv
+import struct
+
+
+class CSVStreamParser:
+    """
+    Counts CSV records and keeps the header and first rows, fed in chunks.
+    
+    Records are split on newlines outside double quotes, so quoted fields
+    containing line breaks are counted once.
+    """
+    def __init__(self, sample_rows=20, encoding='utf-8'):
+        self.sample_rows = sample_rows
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._partial = ''
+        self._sample_text = []
+        self.records = 0
+    
+    def feed(self, data):
+        # The carried-over partial always starts a record, outside quotes
+        text = self._partial + self._decoder.decode(data)
+        if '"' not in text:
+            # Fast path: no quoting, every newline ends a record
+            end = text.rfind('\n') + 1
+            if len(self._sample_text) <= self.sample_rows and end:
+                self._sample_text.extend(text[:end - 1].split('\n')[:self.sample_rows + 1])
+            self.records += text.count('\n')
+            self._partial = text[end:]
+            return
+        
+        lines = text.split('\n')
+        self._partial = lines.pop()
+        in_quotes = False
+        record = []
+        for line in lines:
+            record.append(line)
+            if line.count('"') % 2:
+                in_quotes = not in_quotes
+            if not in_quotes:
+                self.records += 1
+                if len(self._sample_text) <= self.sample_rows:
+                    self._sample_text.append('\n'.join(record))
+                record = []
+        if record:
+            self._partial = '\n'.join(record + [self._partial])
+    
+    def close(self):
+        tail = self._partial + self._decoder.decode(b'', final=True)
+        if tail.strip():
+            self.records += 1
+            if len(self._sample_text) <= self.sample_rows:
+                self._sample_text.append(tail)
+        self._partial = ''
+    
+    def summary(self):
+        rows = list(csv.reader(line.rstrip('\r') for line in self._sample_text if line))
+        return {
+            'kind': 'csv',
+            'header': rows[0] if rows else [],
+            'rows': max(0, self.records - 1),
+            'sample': rows[1:self.sample_rows + 1],
+        }
+
+
+class ZipDirectoryParser:
+    """
+    Lists the members of a zip archive from its central directory.
+    
+    The central directory sits at the end of the archive, so only a rolling
+    window over the last max_directory bytes is kept while streaming.
+    """
+    EOCD = b'PK\x05\x06'
+    ENTRY = struct.Struct('<4s6H3L5H2L')
+    
+    def __init__(self, max_directory=4 * 1024 * 1024):
+        self.max_directory = max_directory
+        self._tail = bytearray()
+        self.total = 0
+        self.members = None
+        self.error = None
+    
+    def feed(self, data):
+        self.total += len(data)
+        self._tail += data
+        excess = len(self._tail) - self.max_directory
+        if excess > 0:
+            del self._tail[:excess]
+    
+    def close(self):
+        tail = bytes(self._tail)
+        self._tail = bytearray()
+        end = tail.rfind(self.EOCD)
+        if end < 0 or len(tail) - end < 22:
+            self.error = "End of central directory not found"
+            return
+        count, size, offset = struct.unpack('<H2L', tail[end + 10:end + 20])
+        start = offset - (self.total - len(tail))
+        if offset == 0xFFFFFFFF or start < 0 or start + size > end:
+            self.error = "Central directory not available"
+            return
+        
+        members = []
+        pos = start
+        for _ in range(count):
+            fields = self.ENTRY.unpack_from(tail, pos)
+            if fields[0] != b'PK\x01\x02':
+                self.error = "Corrupt central directory"
+                return
+            name_length, extra_length, comment_length = fields[10], fields[11], fields[12]
+            name = tail[pos + 46:pos + 46 + name_length]
+            members.append({
+                'name': name.decode('utf-8' if fields[3] & 0x800 else 'cp437'),
+                'compressed_size': fields[8],
+                'size': fields[9],
+                'method': fields[4],
+            })
+            pos += 46 + name_length + extra_length + comment_length
+        self.members = members
+    
+    def summary(self):
+        summary = {'kind': 'zip', 'members': self.members}
+        if self.error:
+            summary['error'] = self.error
+        return summary
+
+
+PARSERS = {
+    'csv': CSVStreamParser,
+    'zip': ZipDirectoryParser,
+}
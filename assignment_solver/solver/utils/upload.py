@@ -0,0 +1,301 @@
+import hashlib
+import io
+import logging
+import mmap
+import os
+import re
+import shutil
+import tempfile
+from .encoding import decode_bytes
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes needed to sniff a type from content
+SNIFF_BYTES = 512
+
+# Leading bytes that identify a format regardless of the file name
+SIGNATURES = [
+    (re.compile(rb'PK\x03\x04|PK\x05\x06'), 'zip'),
+    (re.compile(rb'SQLite format 3\x00'), 'sqlite'),
+    (re.compile(rb'\x1f\x8b\x08'), 'gzip'),
+    (re.compile(rb'BZh[1-9]1AY&SY'), 'bz2'),
+    (re.compile(rb'\xfd7zXZ\x00'), 'xz'),
+    (re.compile(rb'%PDF-'), 'pdf'),
+    (re.compile(rb'\x89PNG\r\n\x1a\n|\xff\xd8\xff|GIF8[79]a|RIFF....WEBP', re.DOTALL), 'image'),
+]
+
+# python-magic MIME types for content the table and extension miss
+MIME_TYPES = {
+    'application/zip': 'zip',
+    'application/gzip': 'gzip',
+    'application/x-gzip': 'gzip',
+    'application/x-bzip2': 'bz2',
+    'application/x-xz': 'xz',
+    'application/x-sqlite3': 'sqlite',
+    'application/vnd.sqlite3': 'sqlite',
+    'application/json': 'json',
+    'text/csv': 'csv',
+    'text/html': 'html',
+    'text/markdown': 'markdown',
+}
+
+_magic = None
+
+EXTENSIONS = {
+    '.zip': 'zip',
+    '.csv': 'csv',
+    '.json': 'json',
+    '.jsonl': 'json',
+    '.ndjson': 'json',
+    '.txt': 'text',
+    '.log': 'text',
+    '.html': 'html',
+    '.htm': 'html',
+    '.md': 'markdown',
+    '.markdown': 'markdown',
+    '.db': 'sqlite',
+    '.sqlite': 'sqlite',
+    '.sqlite3': 'sqlite',
+}
+
+
+def _magic_kind(head):
+    """Classify head with python-magic, if it is installed."""
+    global _magic
+    
+    if _magic is None:
+        try:
+            import magic
+            _magic = magic.Magic(mime=True)
+        except (ImportError, OSError) as e:
+            logger.debug(f"python-magic unavailable, using the built-in signature table: {str(e)}")
+            _magic = False
+    if not _magic:
+        return None
+    mime = _magic.from_buffer(head)
+    return MIME_TYPES.get(mime) or ('text' if mime.startswith('text/') else None)
+
+
+def _text_kind(head):
+    """Recognise plain-text content: JSON, HTML or generic text."""
+    if not head or b'\x00' in head:
+        return None
+    try:
+        text = head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        if e.start < len(head) - 4:
+            return None
+        text = head[:e.start].decode('utf-8')
+    stripped = text.lstrip('\ufeff \t\r\n')
+    if stripped[:1] in ('{', '['):
+        return 'json'
+    if re.match(r'(?i)<(!doctype html|html|head|body)\b', stripped):
+        return 'html'
+    return 'text'
+
+
+def sniff(head, name=''):
+    """
+    Detect a file type from its content and name.
+    
+    Binary signatures win, then the file extension, then python-magic when
+    it is installed, then a plain-text check on the leading bytes.
+    
+    Args:
+        head (bytes): Leading bytes of the file (SNIFF_BYTES is plenty)
+        name (str): File name
+    
+    Returns:
+        str: File type, 'unknown' if nothing matches
+    """
+    for signature, kind in SIGNATURES:
+        if signature.match(head):
+            return kind
+    kind = EXTENSIONS.get(os.path.splitext(name)[1].lower())
+    if kind is None and head:
+        kind = _magic_kind(head) or _text_kind(head)
+    return kind or 'unknown'
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Seekable binary file object over a buffer, for APIs that want a file
+    (pandas, zipfile) without copying the whole upload into a BytesIO.
+    """
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._pos = 0
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def tell(self):
+        return self._pos
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+    
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else min(len(self._view), self._pos + size)
+        data = self._view[self._pos:end].tobytes()
+        self._pos = max(self._pos, end)
+        return data
+    
+    def readall(self):
+        return self.read()
+    
+    def readinto(self, b):
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+    
+    def close(self):
+        self._view.release()
+        super().close()
+
+
+class Upload:
+    """
+    An uploaded file, ingested in a single pass.
+    
+    Small uploads are used in place through a memoryview over Django's
+    in-memory buffer; uploads Django spooled to disk are memory-mapped from
+    its temporary file. SHA-256 and the sniffed type are computed in the
+    same pass, and nothing is copied into a temp directory unless a
+    consumer asks for path().
+    
+    Files received through StreamingUploadHandler already carry their
+    digest, type and streaming parse summary, which are reused as-is.
+    """
+    def __init__(self, name, buffer, path=None, sha256=None, kind=None, summary=None):
+        self.name = name
+        self.buffer = memoryview(buffer).cast('B')
+        self.size = len(self.buffer)
+        self.sha256 = sha256 or hashlib.sha256(self.buffer).hexdigest()
+        self.kind = kind or sniff(self.head(SNIFF_BYTES), name)
+        self.summary = summary
+        self._path = path
+        self._spill_dir = None
+        self._mmap = None
+        self._decoded = None
+    
+    @classmethod
+    def from_file(cls, file):
+        """
+        Wrap a Django UploadedFile without copying its bytes where possible.
+        
+        Args:
+            file (UploadedFile): The uploaded file
+        
+        Returns:
+            Upload: Ingested upload; close() it when done
+        """
+        name = os.path.basename(file.name or 'upload')
+        streamed = {
+            'sha256': getattr(file, 'sha256', None),
+            'kind': getattr(file, 'sniffed_type', None),
+            'summary': getattr(file, 'stream_summary', None),
+        }
+        if hasattr(file, 'temporary_file_path'):
+            path = file.temporary_file_path()
+            if os.path.getsize(path) == 0:
+                return cls(name, b'', path, **streamed)
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            upload = cls(name, mapped, path, **streamed)
+            upload._mmap = mapped
+            return upload
+        
+        raw = getattr(file, 'file', None)
+        if isinstance(raw, io.BytesIO):
+            return cls(name, raw.getbuffer(), **streamed)
+        
+        data = bytearray()
+        for chunk in file.chunks():
+            data += chunk
+        return cls(name, data, **streamed)
+    
+    @classmethod
+    def from_path(cls, path):
+        """
+        Memory-map a file that is already on disk.
+        """
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return cls(os.path.basename(path), b'', path)
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        upload = cls(os.path.basename(path), mapped, path)
+        upload._mmap = mapped
+        return upload
+    
+    def head(self, size):
+        """Return the first size bytes."""
+        return self.buffer[:size].tobytes()
+    
+    def open(self):
+        """Return a seekable binary file object over the bytes."""
+        return BufferReader(self.buffer)
+    
+    def text(self, encoding='utf-8', errors='strict'):
+        """Decode the whole upload."""
+        return str(self.buffer, encoding, errors)
+    
+    def decode(self):
+        """
+        Decode the upload with its detected encoding, once.
+        
+        Returns:
+            Decoded: Text, encoding and detection method, shared by every
+                caller
+        """
+        if self._decoded is None:
+            self._decoded = decode_bytes(self.buffer)
+        return self._decoded
+    
+    @property
+    def disk_path(self):
+        """Path of the bytes on disk if they are already there, else None."""
+        return self._path
+    
+    def path(self):
+        """
+        Return a filesystem path to the bytes, writing them out on first use.
+        
+        Only consumers that cannot read from memory (e.g. sqlite3) should
+        call this.
+        """
+        if self._path is None:
+            self._spill_dir = tempfile.mkdtemp(prefix='upload-')
+            self._path = os.path.join(self._spill_dir, self.name)
+            with open(self._path, 'wb') as destination:
+                destination.write(self.buffer)
+        return self._path
+    
+    def close(self):
+        """Release the buffer and remove any spilled copy."""
+        self._decoded = None
+        self.buffer.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Still referenced by a reader; unmapped when that is collected
+                pass
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+            self._path = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
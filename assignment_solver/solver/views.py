@@ -1,7 +1,13 @@
+from django.conf import settings
 from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework.decorators import api_view, parser_classes
 from rest_framework.parsers import MultiPartParser
+from .services.answer_cache import get_answer_cache
+from .services.rate_limiter import get_outbound_limiter
 from .services.request_handler import RequestHandler
+from .services.resilience import Deadline, DeadlineExceeded
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,11 +29,70 @@ def api_endpoint(request):
         if file:
             logger.info(f"Received file: {file.name}, size: {file.size} bytes")
         
-        handler = RequestHandler()
-        result = handler.process_request(question, file)
+        handler = RequestHandler.shared()
+        deadline = Deadline(settings.REQUEST_DEADLINE)
+        result = handler.process_request(question, file, deadline=deadline)
         
         return JsonResponse(result)
     
+    except DeadlineExceeded as e:
+        logger.error(f"Request timed out: {str(e)}")
+        return JsonResponse({"error": str(e)}, status=504)
+    
+    except Exception as e:
+        logger.error(f"Error processing request: {str(e)}")
+        return JsonResponse({"error": f"An error occurred: {str(e)}"}, status=500)
+
+
+@api_view(['GET'])
+def cache_stats(request):
+    """
+    Report answer cache hit/miss counters for this worker process.
+    """
+    cache = get_answer_cache()
+    if cache is None:
+        return JsonResponse({"enabled": False})
+    return JsonResponse({"enabled": True, **cache.stats()})
+
+
+@api_view(['GET'])
+def aiproxy_stats(request):
+    """
+    Report AI Proxy admission counters and queue times for this worker process.
+    """
+    return JsonResponse(get_outbound_limiter().stats())
+
+
+@csrf_exempt
+@require_POST
+async def async_api_endpoint(request):
+    """
+    Async variant of api_endpoint, served through asgi.py.
+    
+    The AI Proxy call is awaited instead of blocking a worker thread, so a
+    single process can hold many in-flight LLM requests.
+    """
+    try:
+        question = request.POST.get('question')
+        file = request.FILES.get('file')
+        
+        if not question:
+            return JsonResponse({"error": "No question provided"}, status=400)
+        
+        logger.info(f"Received question: {question}")
+        if file:
+            logger.info(f"Received file: {file.name}, size: {file.size} bytes")
+        
+        handler = RequestHandler.shared()
+        deadline = Deadline(settings.REQUEST_DEADLINE)
+        result = await handler.aprocess_request(question, file, deadline=deadline)
+        
+        return JsonResponse(result)
+    
+    except DeadlineExceeded as e:
+        logger.error(f"Request timed out: {str(e)}")
+        return JsonResponse({"error": str(e)}, status=504)
+    
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}")
         return JsonResponse({"error": f"An error occurred: {str(e)}"}, status=500)
\ No newline at end of file